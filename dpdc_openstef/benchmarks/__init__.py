@@ -0,0 +1 @@
+"""Reproducible benchmarks of the forecasting service and its HTTP routes"""
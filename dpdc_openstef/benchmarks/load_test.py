@@ -0,0 +1,342 @@
+"""
+Load-testing harness for the FastAPI app
+
+Simulates `--concurrency` users that each send requests one after another, drawn from
+a weighted mix of scenarios. The app is driven either in-process (default: synthetic
+data and small models in a temporary workspace, like the benchmarks) or as a running
+server (`--url`). Reports throughput, p50/p95/p99 latency and error rate per scenario,
+and the lag of the event loop sampled every 50 ms.
+
+In-process, the app shares the event loop with the simulated users, so the lag shows
+how long the app blocks its loop. Against a server the lag is the one of the load
+generator and only tells whether it kept up.
+
+Scenarios: dashboard (GET /api/dashboard/data, 7 days), health (GET /api/dashboard/health,
+7 days), data_input_read (GET /api/data-input), realtime (POST /api/generate-forecast),
+backtest (POST /api/forecast-multiple) and data_input (POST /api/data-input, re-submits
+yesterday's values).
+
+Usage (from the dpdc_openstef directory, needs httpx):
+    python -m benchmarks.load_test --concurrency 20 --duration 30 --mix dashboard=80,realtime=15,data_input=5
+    python -m benchmarks.load_test --url http://localhost:8000 --models my_model --mix dashboard=90,backtest=10
+"""
+import argparse
+import asyncio
+import json
+import math
+import os
+import platform
+import random
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+from benchmarks.run_benchmarks import (
+    DEFAULT_SEED, RESULTS_DIR, build_master_dataset, enter_workspace, git_revision, import_httpx,
+    train_benchmark_models,
+)
+from services.master_data import write_master_data
+from services.model_service import DHAKA_TZ, TRAINING_DATA_PATH
+
+# Interval of the event loop lag probe in seconds
+LOOP_LAG_INTERVAL = 0.05
+# Days covered by the dashboard scenarios
+DASHBOARD_DAYS = 7
+DEFAULT_MIX = "dashboard=80,realtime=15,data_input=5"
+
+
+def percentile(ordered: List[float], q: float) -> float:
+    """Nearest-rank percentile of sorted values, 0 for no values"""
+    if not ordered:
+        return 0.0
+    return ordered[max(math.ceil(q / 100 * len(ordered)) - 1, 0)]
+
+
+def latency_summary(samples: List[float]) -> Dict[str, float]:
+    """p50/p95/p99/max/mean of latencies in seconds"""
+    ordered = sorted(samples)
+    return {
+        "p50": round(percentile(ordered, 50), 6),
+        "p95": round(percentile(ordered, 95), 6),
+        "p99": round(percentile(ordered, 99), 6),
+        "max": round(ordered[-1], 6) if ordered else 0.0,
+        "mean": round(statistics.fmean(ordered), 6) if ordered else 0.0,
+    }
+
+
+def parse_mix(spec: str) -> Dict[str, float]:
+    """
+    Parse a request mix such as "dashboard=80,realtime=15,data_input=5"
+
+    Raises:
+        ValueError: If a scenario is unknown or a weight is not a positive number
+    """
+    mix = {}
+    for item in spec.split(","):
+        name, _, weight = item.strip().partition("=")
+        if name not in SCENARIOS:
+            raise ValueError(f"Unknown scenario '{name}', choose from {', '.join(SCENARIOS)}")
+        try:
+            mix[name] = float(weight)
+        except ValueError:
+            raise ValueError(f"Invalid weight for scenario '{name}': '{weight}'")
+        if mix[name] <= 0:
+            raise ValueError(f"Weight of scenario '{name}' must be positive")
+    return mix
+
+
+def _dashboard_range(context: Dict[str, Any]) -> Dict[str, str]:
+    end = context["yesterday"]
+    return {"start_date": str(end - timedelta(days=DASHBOARD_DAYS - 1)), "end_date": str(end)}
+
+
+# Scenario name -> function returning (method, path, httpx request arguments) from the run context
+SCENARIOS = {
+    "dashboard": lambda context: ("GET", "/api/dashboard/data", {"params": _dashboard_range(context)}),
+    "health": lambda context: ("GET", "/api/dashboard/health", {"params": _dashboard_range(context)}),
+    "data_input_read": lambda context: ("GET", "/api/data-input", {"params": {"date": str(context["yesterday"])}}),
+    "realtime": lambda context: ("POST", "/api/generate-forecast", {"data": {
+        "date": str(context["today"]),
+        "model_names": ",".join(context["models"]),
+        "holiday": 0,
+        "holiday_type": 0,
+        "nation_event": 0,
+    }}),
+    "backtest": lambda context: ("POST", "/api/forecast-multiple", {"data": {
+        "date": str(context["yesterday"]),
+        "model_names": ",".join(context["models"]),
+    }}),
+    "data_input": lambda context: ("POST", "/api/data-input", {"data": context["data_input_form"]}),
+}
+
+
+class ScenarioStats:
+    """Latencies and failures of one scenario"""
+
+    def __init__(self):
+        self.latencies: List[float] = []
+        self.errors = 0
+        self.error_samples: Dict[str, int] = {}
+
+    def record(self, latency: float, error: Optional[str] = None) -> None:
+        self.latencies.append(latency)
+        if error is not None:
+            self.errors += 1
+            self.error_samples[error] = self.error_samples.get(error, 0) + 1
+
+    def report(self, elapsed: float) -> Dict[str, Any]:
+        count = len(self.latencies)
+        return {
+            "requests": count,
+            "errors": self.errors,
+            "error_rate": round(self.errors / count, 4) if count else 0.0,
+            "throughput_rps": round(count / elapsed, 3) if elapsed else 0.0,
+            "latency_seconds": latency_summary(self.latencies),
+            "error_samples": dict(sorted(self.error_samples.items(), key=lambda item: -item[1])[:5]),
+        }
+
+
+async def _send(client, request: Tuple[str, str, Dict[str, Any]]) -> Optional[str]:
+    """Send one request and return an error description, None on success"""
+    method, path, kwargs = request
+    try:
+        response = await client.request(method, path, **kwargs)
+    except Exception as e:
+        return type(e).__name__
+    if response.status_code >= 400:
+        return f"HTTP {response.status_code}"
+    return None
+
+
+async def _simulate_user(
+    client,
+    requests: Dict[str, Tuple[str, str, Dict[str, Any]]],
+    mix: Dict[str, float],
+    stats: Dict[str, ScenarioStats],
+    rng: random.Random,
+    deadline: float,
+    budget: List[int]
+) -> None:
+    """Send requests drawn from the mix until the deadline or the shared request budget is reached"""
+    names, weights = list(mix), list(mix.values())
+    while time.perf_counter() < deadline and budget[0] != 0:
+        budget[0] -= 1
+        name = rng.choices(names, weights)[0]
+        started = time.perf_counter()
+        error = await _send(client, requests[name])
+        stats[name].record(time.perf_counter() - started, error)
+
+
+async def _monitor_loop_lag(samples: List[float], stop: asyncio.Event) -> None:
+    """Record how much later than scheduled the event loop wakes up a sleeping task"""
+    while not stop.is_set():
+        started = time.perf_counter()
+        await asyncio.sleep(LOOP_LAG_INTERVAL)
+        samples.append(max(time.perf_counter() - started - LOOP_LAG_INTERVAL, 0.0))
+
+
+async def run_load_test(args: argparse.Namespace, workspace: Optional[Path]) -> Dict[str, Any]:
+    """Prepare the target, run the simulated users and return the report"""
+    httpx = import_httpx()
+    mix = parse_mix(args.mix)
+    now = datetime.now(DHAKA_TZ)
+    context = {"today": now.date(), "yesterday": now.date() - timedelta(days=1)}
+
+    if args.url:
+        client = httpx.AsyncClient(
+            base_url=args.url,
+            timeout=args.timeout,
+            limits=httpx.Limits(max_connections=args.concurrency, max_keepalive_connections=args.concurrency),
+        )
+        context["models"] = args.models or []
+    else:
+        app = enter_workspace(workspace, args.log_level, args.seed)
+        dataset = build_master_dataset(args.history_days, context["today"], now.hour, args.seed)
+        write_master_data(dataset, Path(TRAINING_DATA_PATH))
+        context["models"] = args.models or [f"bench_model_{i + 1}" for i in range(args.model_count)]
+        await train_benchmark_models(
+            context["models"], context["today"] - timedelta(days=args.history_days - 1), context["yesterday"]
+        )
+        client = httpx.AsyncClient(
+            transport=httpx.ASGITransport(app=app), base_url="http://load-test", timeout=args.timeout
+        )
+
+    if {"realtime", "backtest"} & set(mix) and not context["models"]:
+        raise SystemExit("The realtime and backtest scenarios need --models when testing a server")
+
+    async with client:
+        if "data_input" in mix:
+            # Re-submit yesterday's values as they are, so the writes do not change the data
+            response = await client.get("/api/data-input", params={"date": str(context["yesterday"])})
+            response.raise_for_status()
+            context["data_input_form"] = {
+                "date": str(context["yesterday"]),
+                "hourly_data": json.dumps(response.json()["data"]),
+            }
+
+        requests = {name: SCENARIOS[name](context) for name in mix}
+        for name in mix:
+            for _ in range(args.warmup_requests):
+                await _send(client, requests[name])
+
+        print(f"Running {args.concurrency} users for {args.duration}s, mix {args.mix}")
+        stats = {name: ScenarioStats() for name in mix}
+        lag_samples: List[float] = []
+        stop = asyncio.Event()
+        monitor = asyncio.create_task(_monitor_loop_lag(lag_samples, stop))
+        budget = [args.requests if args.requests else -1]
+
+        started = time.perf_counter()
+        deadline = started + args.duration
+        await asyncio.gather(*[
+            _simulate_user(client, requests, mix, stats, random.Random(args.seed + i), deadline, budget)
+            for i in range(args.concurrency)
+        ])
+        elapsed = time.perf_counter() - started
+        stop.set()
+        await monitor
+
+    all_stats = ScenarioStats()
+    for scenario in stats.values():
+        all_stats.latencies.extend(scenario.latencies)
+        all_stats.errors += scenario.errors
+        for error, count in scenario.error_samples.items():
+            all_stats.error_samples[error] = all_stats.error_samples.get(error, 0) + count
+
+    return {
+        "meta": {
+            "started_at": datetime.now(timezone.utc).isoformat(),
+            **git_revision(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpu_count": os.cpu_count(),
+            "target": args.url or "in-process",
+            "concurrency": args.concurrency,
+            "duration_seconds": round(elapsed, 3),
+            "mix": mix,
+            "models": context["models"],
+            "history_days": None if args.url else args.history_days,
+            "seed": args.seed,
+        },
+        "scenarios": {name: scenario.report(elapsed) for name, scenario in stats.items()},
+        "total": all_stats.report(elapsed),
+        "event_loop_lag_seconds": latency_summary(lag_samples),
+    }
+
+
+def print_report(report: Dict[str, Any]) -> None:
+    """Print the per-scenario table and the event loop lag"""
+    print(f"\n{'scenario':<16}{'requests':>9}{'errors':>8}{'req/s':>9}{'p50 ms':>9}{'p95 ms':>9}{'p99 ms':>9}{'max ms':>9}")
+    rows = list(report["scenarios"].items()) + [("total", report["total"])]
+    for name, row in rows:
+        latency = row["latency_seconds"]
+        print(
+            f"{name:<16}{row['requests']:>9}{row['error_rate']:>8.1%}{row['throughput_rps']:>9.1f}"
+            f"{latency['p50'] * 1000:>9.1f}{latency['p95'] * 1000:>9.1f}{latency['p99'] * 1000:>9.1f}{latency['max'] * 1000:>9.1f}"
+        )
+    lag = report["event_loop_lag_seconds"]
+    where = "app" if report["meta"]["target"] == "in-process" else "load generator"
+    print(
+        f"\nEvent loop lag ({where}): p50 {lag['p50'] * 1000:.1f} ms, p95 {lag['p95'] * 1000:.1f} ms, "
+        f"p99 {lag['p99'] * 1000:.1f} ms, max {lag['max'] * 1000:.1f} ms"
+    )
+    for name, row in rows:
+        if row["error_samples"]:
+            print(f"Errors of {name}: {row['error_samples']}")
+
+
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Load-test the app with concurrent users and a request mix")
+    parser.add_argument("--url", help="Base URL of a running server (default: drive the app in-process)")
+    parser.add_argument("--concurrency", type=int, default=10, help="Number of simulated users")
+    parser.add_argument("--duration", type=float, default=30.0, help="Test duration in seconds")
+    parser.add_argument("--requests", type=int, help="Stop after this many requests in total")
+    parser.add_argument("--mix", default=DEFAULT_MIX, help=f"Weighted scenarios, e.g. {DEFAULT_MIX}")
+    parser.add_argument("--models", nargs="+", help="Model names for realtime/backtest (required with --url)")
+    parser.add_argument("--model-count", type=int, default=2, help="Models trained and used in-process")
+    parser.add_argument("--history-days", type=int, default=365, help="History of the in-process synthetic dataset")
+    parser.add_argument("--warmup-requests", type=int, default=1, help="Untimed requests per scenario before the test")
+    parser.add_argument("--timeout", type=float, default=60.0, help="Request timeout in seconds")
+    parser.add_argument("--seed", type=int, default=DEFAULT_SEED, help="Seed of the data and the request sequence")
+    parser.add_argument("--output", type=Path, help="Report file (default: benchmarks/results/load_<time>_<commit>.json)")
+    parser.add_argument("--workspace", type=Path, help="In-process data and models directory (default: temporary)")
+    parser.add_argument("--log-level", default="WARNING", help="Log level of the in-process app")
+    return parser.parse_args(argv)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    args = parse_args(argv)
+    try:
+        parse_mix(args.mix)
+    except ValueError as e:
+        raise SystemExit(str(e))
+
+    started_at = datetime.now(timezone.utc)
+    output = (args.output or RESULTS_DIR / f"load_{started_at:%Y%m%dT%H%M%S}_{git_revision()['git_commit']}.json").resolve()
+    workspace = None
+    if not args.url:
+        workspace = (args.workspace or Path(tempfile.mkdtemp(prefix="dpdc_load_test_"))).resolve()
+    cwd = os.getcwd()
+
+    try:
+        report = asyncio.run(run_load_test(args, workspace))
+    finally:
+        os.chdir(cwd)
+        if workspace is not None and args.workspace is None:
+            shutil.rmtree(workspace, ignore_errors=True)
+
+    print_report(report)
+    output.parent.mkdir(parents=True, exist_ok=True)
+    with open(output, "w") as file:
+        json.dump(report, file, indent=4)
+    print(f"\nReport written to {output}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,433 @@
+"""
+Benchmark suite for ModelService and the HTTP routes
+
+Every run builds fixed synthetic master datasets and small pre-trained models in a
+scratch workspace, so the results depend neither on the real data and models nor on
+the network (Meteostat is replaced by synthetic weather). Measured per history length,
+and per number of models for the forecasts:
+
+    - ModelService.forecast_from_mulitple_models (backtest of yesterday)
+    - ModelService.generate_realtime_forecast (today, from the current hour)
+    - ModelService.train_model_with_hyperparams
+    - GET /api/dashboard/data and GET /api/dashboard/health (last 30 days)
+    - POST /api/data-input (24 hours of yesterday)
+
+"Today" and the current hour are frozen at BENCHMARK_ANCHOR, so every run measures the
+same inputs whenever it is started. Results are written as JSON so runs of different
+commits on the same machine can be compared with --compare; runs with another anchor
+are refused.
+
+Usage (from the dpdc_openstef directory, the HTTP benchmarks need httpx):
+    python -m benchmarks.run_benchmarks
+    python -m benchmarks.run_benchmarks --history-days 90 730 --model-counts 1 5 --repeats 10
+    python -m benchmarks.run_benchmarks --compare benchmarks/results/<baseline>.json
+"""
+import argparse
+import asyncio
+import json
+import math
+import os
+import platform
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import date, datetime, timedelta, timezone
+from pathlib import Path
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+
+APP_DIR = Path(__file__).resolve().parents[1]
+RESULTS_DIR = APP_DIR / "benchmarks" / "results"
+sys.path.insert(0, str(APP_DIR))
+
+from benchmarks.synthetic_data import DEFAULT_SEED, generate_master_data, generate_weather
+from services.master_data import write_master_data
+from services.model_service import DHAKA_TZ, TRAINING_DATA_PATH, ModelService
+from services.weather_service import get_weather_service
+from utils.logger import setup_logging
+
+# Small models: the benchmark measures the service around the model, not xgboost
+BENCHMARK_HYPERPARAMS = {"n_estimators": 20, "max_depth": 3, "learning_rate": 0.3, "early_stopping_rounds": 5}
+# Days of history the forecast models are trained on
+MODEL_TRAINING_DAYS = 60
+# Longest date range accepted by /api/dashboard/data
+DASHBOARD_RANGE_DAYS = 30
+# Fixed "now" of every run (Dhaka time): the datasets end on this day and the realtime
+# forecasts start at this hour, so runs of different commits measure the same inputs
+BENCHMARK_ANCHOR = datetime(2025, 6, 15, 14, tzinfo=DHAKA_TZ)
+# Modules whose `datetime.now()` is frozen at BENCHMARK_ANCHOR during a run
+CLOCK_MODULES = ("services.model_service", "services.weather_service", "services.forecast_scheduler", "routes.data_input")
+
+
+def build_master_dataset(history_days: int, last_day: date, current_hour: int, seed: int = DEFAULT_SEED) -> pd.DataFrame:
+    """
+    Synthetic master dataset of `history_days` days ending with `last_day`
+
+    Hours of `last_day` from `current_hour` on have no load yet, like the real data
+    during the day.
+
+    Args:
+        history_days: Number of days in the dataset
+        last_day: Last day of the dataset (normally today in Dhaka)
+        current_hour: First hour of `last_day` without actual load
+        seed: Seed of the synthetic data
+
+    Returns:
+        DataFrame in the master-data layout indexed by hourly UTC timestamps
+    """
+    first_day = last_day - timedelta(days=history_days - 1)
+    frame = generate_master_data(str(first_day), history_days, seed=seed)
+    not_yet_measured = frame.index >= pd.Timestamp(last_day, tz="UTC") + pd.Timedelta(hours=current_hour)
+    frame.loc[not_yet_measured, ["load", "forecasted_load"]] = np.nan
+    return frame
+
+
+def summarize(samples: List[float]) -> Dict[str, float]:
+    """Summary statistics of timing samples in seconds"""
+    ordered = sorted(samples)
+    return {
+        "min": round(ordered[0], 6),
+        "median": round(statistics.median(ordered), 6),
+        "mean": round(statistics.fmean(ordered), 6),
+        "p95": round(ordered[max(math.ceil(0.95 * len(ordered)) - 1, 0)], 6),
+        "max": round(ordered[-1], 6),
+        "stdev": round(statistics.stdev(ordered), 6) if len(ordered) > 1 else 0.0,
+    }
+
+
+class BenchmarkRun:
+    """Collects the timings of one benchmark run"""
+
+    def __init__(self, repeats: int, warmup: int):
+        self.repeats = repeats
+        self.warmup = warmup
+        self.results: List[Dict[str, Any]] = []
+
+    async def measure(
+        self,
+        name: str,
+        params: Dict[str, Any],
+        func: Callable[[], Awaitable[Any]],
+        repeats: Optional[int] = None,
+        warmup: Optional[int] = None
+    ) -> None:
+        """
+        Time func() `repeats` times after `warmup` untimed calls and record the result.
+        A failing benchmark is recorded with its error and does not stop the run.
+        """
+        repeats = self.repeats if repeats is None else repeats
+        warmup = self.warmup if warmup is None else warmup
+        label = " ".join([name] + [f"{key}={value}" for key, value in params.items()])
+
+        samples = []
+        try:
+            for _ in range(warmup):
+                await func()
+            for _ in range(repeats):
+                started = time.perf_counter()
+                await func()
+                samples.append(time.perf_counter() - started)
+        except Exception as e:
+            print(f"{label}: FAILED ({e})")
+            self.results.append({"name": name, "params": params, "error": str(e)})
+            return
+
+        stats = summarize(samples)
+        print(f"{label}: median {stats['median']:.4f}s, p95 {stats['p95']:.4f}s")
+        self.results.append({
+            "name": name,
+            "params": params,
+            "repeats": repeats,
+            "stats": stats,
+            "samples": [round(sample, 6) for sample in samples],
+        })
+
+
+def _check_response(response) -> None:
+    """Raise if an HTTP benchmark request did not succeed"""
+    if response.status_code >= 400:
+        raise RuntimeError(f"HTTP {response.status_code}: {response.text[:200]}")
+
+
+def data_input_payload(dataset: pd.DataFrame, day: date) -> Dict[str, str]:
+    """Form fields of a POST /api/data-input request re-submitting the rows of one day"""
+    hourly_data = [
+        {
+            "timestamp": f"{timestamp:%Y-%m-%d %H:%M:%S}+00:00",
+            "load": row["load"],
+            "forecasted_load": row["forecasted_load"],
+            "is_holiday": int(row["is_holiday"]),
+            "holiday_type": int(row["holiday_type"]),
+            "national_event_type": int(row["national_event_type"]),
+        }
+        for timestamp, row in dataset.loc[str(day)].iterrows()
+    ]
+    return {"date": str(day), "hourly_data": json.dumps(hourly_data)}
+
+
+def import_httpx():
+    """Import httpx, which drives the app over HTTP, with a clear error if it is missing"""
+    try:
+        import httpx
+    except ImportError:
+        raise SystemExit("The HTTP benchmarks need httpx: pip install httpx")
+    return httpx
+
+
+def enter_workspace(workspace: Path, log_level: str, seed: int = DEFAULT_SEED):
+    """
+    Make `workspace` the working directory of the application and import the app there
+
+    The application resolves its data and model paths relative to the working
+    directory, and mounts ./static on import. Meteostat is replaced by synthetic
+    weather, used by the data input route and realtime forecasts.
+
+    Returns:
+        The FastAPI app
+    """
+    (workspace / "static").mkdir(parents=True, exist_ok=True)
+    (workspace / "trained_models").mkdir(parents=True, exist_ok=True)
+    os.chdir(workspace)
+    import main
+
+    setup_logging(log_level=log_level, log_file="logs/app.log")
+
+    def fetch_synthetic_weather(start_date: datetime, end_date: datetime) -> pd.DataFrame:
+        start = start_date.replace(hour=0, minute=0, second=0, microsecond=0, tzinfo=None)
+        end = end_date.replace(hour=23, minute=0, second=0, microsecond=0, tzinfo=None)
+        return generate_weather(pd.date_range(start, end, freq="h"), seed)
+    get_weather_service().get_weather_for_range = fetch_synthetic_weather
+
+    return main.app
+
+
+class _AnchoredDatetime(datetime):
+    """datetime whose now() is BENCHMARK_ANCHOR"""
+
+    @classmethod
+    def now(cls, tz=None):
+        anchor = BENCHMARK_ANCHOR.astimezone(tz) if tz is not None else BENCHMARK_ANCHOR.astimezone().replace(tzinfo=None)
+        return cls.combine(anchor.date(), anchor.timetz())
+
+
+def freeze_clock() -> None:
+    """Make the application see BENCHMARK_ANCHOR as the current time"""
+    for name in CLOCK_MODULES:
+        sys.modules[name].datetime = _AnchoredDatetime
+
+
+def anchor_params() -> Dict[str, Any]:
+    """Anchor date and hour of the run, recorded in the results and checked by --compare"""
+    return {"anchor_date": str(BENCHMARK_ANCHOR.date()), "anchor_hour": BENCHMARK_ANCHOR.hour}
+
+
+async def train_benchmark_models(model_names: List[str], first_day: date, last_day: date) -> None:
+    """Train the small forecast models of `model_names` that do not exist yet in the workspace"""
+    for name in model_names:
+        if name not in ModelService.get_trained_models():
+            train_start = max(first_day, last_day - timedelta(days=MODEL_TRAINING_DAYS - 1))
+            print(f"Training {name} on {train_start} to {last_day}")
+            await ModelService.train_model_with_hyperparams(
+                "xgb", name, str(train_start), str(last_day), dict(BENCHMARK_HYPERPARAMS)
+            )
+
+
+async def run_benchmarks(args: argparse.Namespace, workspace: Path) -> BenchmarkRun:
+    """Build the datasets and models in `workspace` and run all benchmarks"""
+    httpx = import_httpx()
+    app = enter_workspace(workspace, args.log_level, args.seed)
+    freeze_clock()
+
+    today = BENCHMARK_ANCHOR.date()
+    yesterday = today - timedelta(days=1)
+    model_names = [f"bench_model_{i + 1}" for i in range(max(args.model_counts))]
+    run = BenchmarkRun(repeats=args.repeats, warmup=args.warmup)
+
+    client = httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://benchmark")
+    async with client:
+        for history_days in sorted(args.history_days):
+            print(f"\nDataset with {history_days} days of history")
+            dataset = build_master_dataset(history_days, today, BENCHMARK_ANCHOR.hour, args.seed)
+            write_master_data(dataset, Path(TRAINING_DATA_PATH))
+            first_day = today - timedelta(days=history_days - 1)
+
+            # Forecast models are trained once, on the first dataset
+            await train_benchmark_models(model_names, first_day, yesterday)
+
+            params = {"history_days": history_days}
+            await run.measure(
+                "train_model_with_hyperparams", params,
+                lambda: ModelService.train_model_with_hyperparams(
+                    "xgb", "bench_train", str(first_day), str(yesterday), dict(BENCHMARK_HYPERPARAMS)
+                ),
+                repeats=args.train_repeats, warmup=0
+            )
+
+            for model_count in sorted(args.model_counts):
+                names = model_names[:model_count]
+                model_params = {"history_days": history_days, "models": model_count}
+                await run.measure(
+                    "forecast_from_mulitple_models", model_params,
+                    lambda: ModelService.forecast_from_mulitple_models(names, str(yesterday))
+                )
+                await run.measure(
+                    "generate_realtime_forecast", model_params,
+                    lambda: ModelService.generate_realtime_forecast(names, str(today))
+                )
+
+            range_params = {
+                "start_date": str(max(first_day, yesterday - timedelta(days=DASHBOARD_RANGE_DAYS - 1))),
+                "end_date": str(yesterday),
+            }
+
+            async def get_dashboard_data():
+                _check_response(await client.get("/api/dashboard/data", params=range_params))
+
+            async def get_dashboard_health():
+                _check_response(await client.get("/api/dashboard/health", params=range_params))
+
+            data_input_form = data_input_payload(dataset, yesterday)
+
+            async def post_data_input():
+                response = await client.post("/api/data-input", data=data_input_form)
+                _check_response(response)
+
+            await run.measure("GET /api/dashboard/data", params, get_dashboard_data)
+            await run.measure("GET /api/dashboard/health", params, get_dashboard_health)
+            # Rewrites the master data, so it runs last on each dataset
+            await run.measure("POST /api/data-input", params, post_data_input)
+
+    return run
+
+
+def compare_results(results: List[Dict[str, Any]], baseline_path: Path, threshold: float) -> int:
+    """
+    Print the median of every benchmark next to the baseline run
+
+    Args:
+        results: Results of the current run
+        baseline_path: JSON file of an earlier run
+        threshold: Slowdown in percent from which a benchmark is flagged
+
+    Returns:
+        Number of flagged benchmarks
+
+    Raises:
+        ValueError: If the baseline ran with another anchor date or hour, and so on other inputs
+    """
+    with open(baseline_path) as file:
+        report = json.load(file)
+    baseline_anchor = {key: report.get("meta", {}).get(key) for key in anchor_params()}
+    if baseline_anchor != anchor_params():
+        raise ValueError(
+            f"{baseline_path} was measured with anchor {baseline_anchor}, this run with {anchor_params()}; "
+            "the datasets differ, so the runs cannot be compared"
+        )
+    baseline = {
+        (result["name"], json.dumps(result["params"], sort_keys=True)): result
+        for result in report["results"]
+    }
+
+    regressions = 0
+    print(f"\nComparison with {baseline_path} (median seconds)")
+    for result in results:
+        label = " ".join([result["name"]] + [f"{key}={value}" for key, value in result["params"].items()])
+        previous = baseline.get((result["name"], json.dumps(result["params"], sort_keys=True)))
+        if previous is None or "stats" not in previous or "stats" not in result:
+            print(f"  {label:<70} n/a")
+            continue
+        before, after = previous["stats"]["median"], result["stats"]["median"]
+        change = (after - before) / before * 100 if before else 0.0
+        flag = "  REGRESSION" if change > threshold else ""
+        regressions += bool(flag)
+        print(f"  {label:<70} {before:9.4f} -> {after:9.4f} ({change:+6.1f}%){flag}")
+    return regressions
+
+
+def git_revision() -> Dict[str, Any]:
+    """Commit and dirty flag of the working tree, if it is a git checkout"""
+    try:
+        commit = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=APP_DIR, capture_output=True, text=True, check=True
+        ).stdout.strip()
+        status = subprocess.run(
+            ["git", "status", "--porcelain", "--untracked-files=no"], cwd=APP_DIR, capture_output=True, text=True, check=True
+        ).stdout
+        return {"git_commit": commit, "git_dirty": bool(status.strip())}
+    except (OSError, subprocess.CalledProcessError):
+        return {"git_commit": "unknown", "git_dirty": None}
+
+
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Benchmark ModelService and the HTTP routes on synthetic data")
+    parser.add_argument("--history-days", type=int, nargs="+", default=[90, 365],
+                        help="History lengths of the synthetic datasets in days")
+    parser.add_argument("--model-counts", type=int, nargs="+", default=[1, 3],
+                        help="Numbers of models per forecast request")
+    parser.add_argument("--repeats", type=int, default=5, help="Timed calls per benchmark")
+    parser.add_argument("--warmup", type=int, default=1, help="Untimed calls before the timed ones")
+    parser.add_argument("--train-repeats", type=int, default=1, help="Timed training runs per dataset")
+    parser.add_argument("--seed", type=int, default=DEFAULT_SEED, help="Seed of the synthetic data")
+    parser.add_argument("--output", type=Path, help="Result file (default: benchmarks/results/<time>_<commit>.json)")
+    parser.add_argument("--compare", type=Path, help="Result file of an earlier run to compare with")
+    parser.add_argument("--threshold", type=float, default=10.0,
+                        help="Slowdown in percent flagged as regression by --compare")
+    parser.add_argument("--workspace", type=Path, help="Directory for data and models (default: temporary, removed afterwards)")
+    parser.add_argument("--log-level", default="WARNING", help="Log level of the application during the run")
+    return parser.parse_args(argv)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    args = parse_args(argv)
+    started_at = datetime.now(timezone.utc)
+    workspace = (args.workspace or Path(tempfile.mkdtemp(prefix="dpdc_benchmark_"))).resolve()
+    output = (args.output or RESULTS_DIR / f"{started_at:%Y%m%dT%H%M%S}_{git_revision()['git_commit']}.json").resolve()
+    compare = args.compare.resolve() if args.compare else None
+    cwd = os.getcwd()
+
+    try:
+        run = asyncio.run(run_benchmarks(args, workspace))
+    finally:
+        os.chdir(cwd)
+        if args.workspace is None:
+            shutil.rmtree(workspace, ignore_errors=True)
+
+    report = {
+        "meta": {
+            "started_at": started_at.isoformat(),
+            "duration_seconds": round((datetime.now(timezone.utc) - started_at).total_seconds(), 3),
+            **git_revision(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpu_count": os.cpu_count(),
+            "seed": args.seed,
+            **anchor_params(),
+            "history_days": sorted(args.history_days),
+            "model_counts": sorted(args.model_counts),
+            "repeats": args.repeats,
+            "warmup": args.warmup,
+            "train_repeats": args.train_repeats,
+        },
+        "results": run.results,
+    }
+    output.parent.mkdir(parents=True, exist_ok=True)
+    with open(output, "w") as file:
+        json.dump(report, file, indent=4)
+    print(f"\nResults written to {output}")
+
+    if compare is not None:
+        try:
+            compare_results(run.results, compare, args.threshold)
+        except ValueError as e:
+            print(f"\nNot compared: {e}")
+            return 1
+    return 1 if any("error" in result for result in run.results) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,261 @@
+"""
+Vectorized generator of synthetic master datasets for scale testing
+
+Produces hourly data of any length in the master-data schema with daily, weekly and
+yearly seasonality, Bangladeshi public holidays, load that follows the weather and
+configurable gaps. Everything is computed with NumPy on whole arrays, so decades of
+data or many series take seconds.
+
+Usage (from the dpdc_openstef directory):
+    python -m benchmarks.synthetic_data --days 10000 --output static/synthetic_10x.csv
+    python -m benchmarks.synthetic_data --days 1000 --series 100 --output data/feeder.parquet
+"""
+import argparse
+import os
+import sys
+from pathlib import Path
+from typing import Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+APP_DIR = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(APP_DIR))
+
+from services.master_data import MASTER_COLUMNS, write_master_data
+from services.weather_service import WEATHER_COLUMNS
+
+DEFAULT_SEED = 42
+
+# Public holidays on fixed dates: (month, day) -> holiday_type code used in the master data
+FIXED_HOLIDAYS = {
+    (2, 21): 2,    # Language Martyrs' Day
+    (3, 26): 3,    # Independence Day
+    (4, 14): 5,    # Bengali New Year
+    (5, 1): 6,     # May Day
+    (8, 15): 11,   # National Mourning Day
+    (12, 16): 16,  # Victory Day
+    (12, 25): 17,  # Christmas
+}
+# Holidays following the lunar calendar: (first day in 2023, length in days, holiday_type)
+LUNAR_HOLIDAYS = [
+    ("2023-04-21", 3, 4),  # Eid ul-Fitr
+    ("2023-06-28", 4, 8),  # Eid ul-Adha
+]
+LUNAR_YEAR_DAYS = 354.367
+# Relative load on holidays; the Eid holidays empty the city
+HOLIDAY_LOAD_FACTOR = {4: 0.65, 8: 0.7}
+DEFAULT_HOLIDAY_LOAD_FACTOR = 0.85
+
+
+def _smooth_noise(rng: np.random.Generator, size: int, correlation_hours: float) -> np.ndarray:
+    """Standard normal noise correlated over roughly `correlation_hours` (exponential kernel)"""
+    kernel = np.exp(-np.arange(int(3 * correlation_hours) + 1) / correlation_hours)
+    noise = np.convolve(rng.standard_normal(size + len(kernel) - 1), kernel, mode="valid")
+    return noise / np.sqrt(np.sum(kernel ** 2))
+
+
+def holiday_calendar(index: pd.DatetimeIndex) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Public holidays on an hourly index
+
+    Args:
+        index: Hourly timestamps
+
+    Returns:
+        Tuple of (is_holiday, holiday_type) integer arrays
+    """
+    holiday_type = np.zeros(len(index), dtype=int)
+    month_day = index.month.to_numpy() * 100 + index.day.to_numpy()
+    for (month, day), code in FIXED_HOLIDAYS.items():
+        holiday_type[month_day == month * 100 + day] = code
+
+    days = index.normalize().tz_localize(None).to_numpy().astype("datetime64[D]").astype(np.int64)
+    for first_day, length, code in LUNAR_HOLIDAYS:
+        first = np.datetime64(first_day, "D").astype(np.int64)
+        # Days since the nearest earlier occurrence of the holiday
+        offset = np.mod(days - first, LUNAR_YEAR_DAYS)
+        holiday_type[offset < length] = code
+
+    return (holiday_type > 0).astype(int), holiday_type
+
+
+def generate_weather(index: pd.DatetimeIndex, seed: int = DEFAULT_SEED) -> pd.DataFrame:
+    """
+    Hourly Dhaka-like weather in the master-data weather columns
+
+    Temperature has a yearly cycle peaking in April/May and a daily cycle peaking in the
+    afternoon, humidity and rain peak in the monsoon, and the sky condition code follows
+    rain and humidity.
+
+    Args:
+        index: Hourly timestamps
+        seed: Seed of the random noise; the same seed and index give the same values
+
+    Returns:
+        DataFrame with `WEATHER_COLUMNS` on the given index
+    """
+    rng = np.random.default_rng(seed)
+    size = len(index)
+    day_of_year = index.dayofyear.to_numpy()
+    hours = index.hour.to_numpy()
+
+    warm_season = np.cos(2 * np.pi * (day_of_year - 130) / 365.25)
+    monsoon = np.clip(np.cos(2 * np.pi * (day_of_year - 210) / 365.25), 0, None)
+    daily = np.sin(2 * np.pi * (hours - 8) / 24)
+
+    temp = 26.5 + 4.5 * warm_season + 3.5 * daily * (1 - 0.5 * monsoon) + 1.2 * _smooth_noise(rng, size, 36)
+    rhum = np.clip(72 + 15 * monsoon - 12 * daily + 6 * _smooth_noise(rng, size, 12), 15, 100)
+    rain = rng.random(size) < 0.02 + 0.2 * monsoon
+    prcp = np.where(rain, rng.exponential(2.5, size), 0.0)
+    wdir = np.mod(np.where(monsoon > 0.3, 180, 340) + rng.normal(0, 40, size), 360)
+    coco = np.select([rain, rhum > 85, rhum > 70], [7, 3, 2], default=1)
+
+    return pd.DataFrame({
+        "temp": temp.round(1),
+        "dwpt": (temp - (100 - rhum) / 5).round(1),
+        "rhum": rhum.round(0),
+        "prcp": prcp.round(1),
+        "wdir": wdir.round(0),
+        "wspd": rng.gamma(2.0, 1.0 + monsoon, size).round(1),
+        "pres": (1008 + 6 * -warm_season + rng.normal(0, 1.2, size)).round(1),
+        "coco": coco,
+    }, index=index)[WEATHER_COLUMNS]
+
+
+def generate_master_data(
+    start: str,
+    days: int,
+    base_load: float = 1200.0,
+    growth_per_year: float = 0.05,
+    missing_hour_rate: float = 0.0,
+    gap_count: int = 0,
+    max_gap_hours: int = 48,
+    seed: int = DEFAULT_SEED,
+    weather_seed: Optional[int] = None
+) -> pd.DataFrame:
+    """
+    Generate an hourly dataset in the master-data schema
+
+    Load = base load x yearly growth x daily profile (evening peak) x weekend dip
+    (Friday, Saturday) x holiday dip x cooling demand above 24 degC, with correlated
+    noise. `forecasted_load` is the load with a few percent forecast error.
+
+    Args:
+        start: First day, 'YYYY-MM-DD'
+        days: Number of days to generate
+        base_load: Average load level in MW at the start
+        growth_per_year: Relative yearly load growth
+        missing_hour_rate: Fraction of single hours dropped at random
+        gap_count: Number of multi-hour gaps (outages) dropped
+        max_gap_hours: Maximum length of a gap in hours
+        seed: Seed of the load noise and gaps
+        weather_seed: Seed of the weather, defaults to `seed`. Series of one city share it
+
+    Returns:
+        DataFrame with `MASTER_COLUMNS` indexed by hourly UTC timestamps, without the
+        rows that fall into gaps
+    """
+    rng = np.random.default_rng(seed)
+    index = pd.date_range(pd.Timestamp(start, tz="UTC"), periods=days * 24, freq="h", name="date_time")
+    frame = generate_weather(index, seed if weather_seed is None else weather_seed)
+    size = len(index)
+
+    hours = index.hour.to_numpy()
+    years = (index - index[0]).total_seconds().to_numpy() / (365.25 * 24 * 3600)
+    is_holiday, holiday_type = holiday_calendar(index)
+
+    daily_profile = 1 + 0.18 * np.cos(2 * np.pi * (hours - 19.5) / 24) + 0.06 * np.cos(4 * np.pi * (hours - 2) / 24)
+    weekday_factor = np.array([1.0, 1.0, 1.0, 1.0, 0.88, 0.94, 1.0])[index.dayofweek.to_numpy()]
+    holiday_factor = np.where(is_holiday == 1, DEFAULT_HOLIDAY_LOAD_FACTOR, 1.0)
+    for code, factor in HOLIDAY_LOAD_FACTOR.items():
+        holiday_factor[holiday_type == code] = factor
+    cooling = 1 + 0.025 * np.clip(frame["temp"].to_numpy() - 24, 0, None)
+    noise = 1 + 0.03 * _smooth_noise(rng, size, 24) + 0.01 * rng.standard_normal(size)
+
+    load = base_load * (1 + growth_per_year) ** years * daily_profile * weekday_factor * holiday_factor * cooling * noise
+    frame["load"] = load.round(0)
+    frame["forecasted_load"] = (load * (1 + 0.04 * rng.standard_normal(size))).round(0)
+    frame["is_holiday"] = is_holiday
+    frame["holiday_type"] = holiday_type
+    frame["national_event_type"] = 0
+
+    keep = rng.random(size) >= missing_hour_rate
+    for gap_start, gap_length in zip(rng.integers(0, size, gap_count), rng.integers(1, max_gap_hours + 1, gap_count)):
+        keep[gap_start:gap_start + gap_length] = False
+
+    return frame.loc[keep, MASTER_COLUMNS]
+
+
+def write_dataset(df: pd.DataFrame, path: Path) -> None:
+    """
+    Write a dataset to the storage format given by the file suffix
+
+    `.csv` uses the master CSV layout (see `write_master_data`); `.parquet` and
+    `.feather` need pyarrow. The file is replaced atomically in every format.
+
+    Args:
+        df: DataFrame indexed by timestamp in the master column layout
+        path: Target file
+
+    Raises:
+        ValueError: If the suffix is not a supported format
+    """
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    if path.suffix == ".csv":
+        write_master_data(df, path)
+        return
+
+    tmp_path = path.with_suffix(path.suffix + ".tmp")
+    if path.suffix == ".parquet":
+        df.to_parquet(tmp_path)
+    elif path.suffix == ".feather":
+        df.reset_index(names="date_time").to_feather(tmp_path)
+    else:
+        raise ValueError(f"Unsupported dataset format: {path.suffix} (use .csv, .parquet or .feather)")
+    os.replace(tmp_path, path)
+
+
+def parse_args(argv=None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Generate synthetic hourly datasets in the master-data schema")
+    parser.add_argument("--start", default="2015-01-01", help="First day, YYYY-MM-DD")
+    parser.add_argument("--days", type=int, required=True, help="Number of days per series")
+    parser.add_argument("--series", type=int, default=1, help="Number of series (feeders); one file each")
+    parser.add_argument("--base-load", type=float, default=1200.0, help="Average load of the first series in MW")
+    parser.add_argument("--growth-per-year", type=float, default=0.05, help="Relative yearly load growth")
+    parser.add_argument("--missing-hour-rate", type=float, default=0.0, help="Fraction of single hours left out")
+    parser.add_argument("--gaps", type=int, default=0, help="Number of multi-hour gaps per series")
+    parser.add_argument("--max-gap-hours", type=int, default=48, help="Maximum gap length in hours")
+    parser.add_argument("--seed", type=int, default=DEFAULT_SEED, help="Seed; series i uses seed + i")
+    parser.add_argument("--output", type=Path, required=True,
+                        help="Output file (.csv, .parquet or .feather); with several series _<i> is appended to the name")
+    return parser.parse_args(argv)
+
+
+def main(argv=None) -> None:
+    args = parse_args(argv)
+    scales = np.random.default_rng(args.seed).uniform(0.2, 1.5, args.series)
+    scales[0] = 1.0
+
+    for i in range(args.series):
+        df = generate_master_data(
+            args.start,
+            args.days,
+            base_load=args.base_load * scales[i],
+            growth_per_year=args.growth_per_year,
+            missing_hour_rate=args.missing_hour_rate,
+            gap_count=args.gaps,
+            max_gap_hours=args.max_gap_hours,
+            seed=args.seed + i,
+            weather_seed=args.seed,
+        )
+        path = args.output
+        if args.series > 1:
+            path = path.with_name(f"{path.stem}_{i + 1}{path.suffix}")
+        write_dataset(df, path)
+        print(f"Wrote {len(df)} rows to {path}")
+
+
+if __name__ == "__main__":
+    main()
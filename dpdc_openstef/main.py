@@ -1,10 +1,19 @@
-from fastapi import FastAPI
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse
 from fastapi.staticfiles import StaticFiles
+import asyncio
 import logging
+import time
 
 # Import routers
-from routes import train_model, forecast_multiple, data_input, dashboard, backtesting
+from routes import train_model, forecast_multiple, data_input, dashboard, backtesting, batch, jobs, models, health, metrics, profiling
 # from routes import forecast  # Disabled
+from services.forecast_scheduler import forecast_scheduler
+from services.metrics import http_request_seconds
+from services.model_catalog import sync_catalog
+from services.profiling import PROFILED_ROUTES, RequestProfile, is_profiling_authorized
+from services.warmup import run_warmup
+from services.weather_service import run_weather_prefetch
 from utils.logger import setup_logging
 
 # Setup logging once at startup
@@ -15,16 +24,82 @@ logger = logging.getLogger(__name__)
 app = FastAPI(title="DPDC OpenSTEF")
 
 
-# @app.on_event("startup")
-# async def startup_event():
-#     """Log application startup"""
-#     logger.info("DPDC OpenSTEF application started successfully")
+@app.on_event("startup")
+async def startup_event():
+    """Log application startup and start background tasks"""
+    # Import heavy modules, load data and models and warm them up; /health/ready reports completion
+    app.state.warmup_task = asyncio.create_task(run_warmup())
+    # Reconcile the model catalogue with trained_models/ before the first model list is requested
+    app.state.catalog_sync_task = asyncio.create_task(_sync_model_catalog())
+    # Keep today's and tomorrow's weather cached for the realtime forecast path
+    app.state.weather_prefetch_task = asyncio.create_task(run_weather_prefetch())
+    # Keep realtime forecasts of the production models precomputed
+    forecast_scheduler.start()
+    logger.info("DPDC OpenSTEF application started successfully")
 
 
-# @app.on_event("shutdown")
-# async def shutdown_event():
-#     """Log application shutdown"""
-#     logger.info("DPDC OpenSTEF application shutting down")
+async def _sync_model_catalog() -> None:
+    """Run the catalogue sync off the event loop; on failure the first listing retries it"""
+    try:
+        await asyncio.to_thread(sync_catalog)
+    except Exception as e:
+        logger.warning("Model catalogue sync at startup failed: %s", e)
+
+
+@app.on_event("shutdown")
+async def shutdown_event():
+    """Stop background tasks and log application shutdown"""
+    app.state.warmup_task.cancel()
+    app.state.weather_prefetch_task.cancel()
+    app.state.catalog_sync_task.cancel()
+    forecast_scheduler.stop()
+    logger.info("DPDC OpenSTEF application shutting down")
+
+
+@app.middleware("http")
+async def record_request_latency(request: Request, call_next):
+    """Record the latency of every request per route template, e.g. /api/data-input/weather-backfill/{job_id}"""
+    started = time.perf_counter()
+    status = 500
+    try:
+        response = await call_next(request)
+        status = response.status_code
+        return response
+    finally:
+        route = request.scope.get("route")
+        http_request_seconds.observe(
+            time.perf_counter() - started,
+            method=request.method,
+            route=getattr(route, "path", "other"),
+            status=str(status)
+        )
+
+
+@app.middleware("http")
+async def profile_request(request: Request, call_next):
+    """
+    Profile a single request when an administrator asks for it with the headers
+    `X-Profile: 1` and `X-Admin-Token`. The profile is stored under logs/profiles and
+    the top cumulative functions are returned in the X-Profile-* response headers.
+    """
+    if request.headers.get("X-Profile") != "1" or request.url.path not in PROFILED_ROUTES:
+        return await call_next(request)
+    if not is_profiling_authorized(request.headers.get("X-Admin-Token")):
+        return JSONResponse(status_code=403, content={"error": "Profiling is disabled or the admin token is invalid"})
+
+    try:
+        profile = RequestProfile(request.url.path)
+        with profile:
+            response = await call_next(request)
+    except RuntimeError as e:
+        return JSONResponse(status_code=409, content={"error": str(e)})
+
+    path = await asyncio.to_thread(profile.save)
+    top = profile.summary(top_n=5)["top_cumulative"]
+    response.headers["X-Profile-Id"] = profile.profile_id
+    response.headers["X-Profile-Path"] = str(path)
+    response.headers["X-Profile-Top"] = "; ".join(f"{row['function']}={row['cumulative_time']:.3f}s" for row in top)
+    return response
 
 
 # Mount static files
@@ -35,8 +110,14 @@ app.include_router(train_model.router, tags=["Train Model"])
 # app.include_router(forecast.router, tags=["Forecast"])  # Disabled
 app.include_router(forecast_multiple.router, tags=["Forecast Multiple"])
 app.include_router(backtesting.router, tags=["Backtesting"])
+app.include_router(batch.router, tags=["Batch"])
+app.include_router(jobs.router, tags=["Jobs"])
+app.include_router(models.router, tags=["Models"])
 app.include_router(data_input.router, tags=["Data Input"])
 app.include_router(dashboard.router, tags=["Dashboard"])
+app.include_router(health.router, tags=["Health"])
+app.include_router(metrics.router, tags=["Metrics"])
+app.include_router(profiling.router, tags=["Admin"])
 
 
 if __name__ == "__main__":
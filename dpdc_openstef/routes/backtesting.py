@@ -1,9 +1,13 @@
 """Backtesting routes"""
 from fastapi import APIRouter, Request, Form
-from fastapi.responses import HTMLResponse, JSONResponse
+from fastapi.responses import HTMLResponse, JSONResponse, StreamingResponse
 from fastapi.templating import Jinja2Templates
+from typing import Optional
+import asyncio
 import logging
+from services.memory_budget import MemoryBudgetExceeded
 from services.model_service import ModelService
+from utils.sse import SSE_HEADERS, stream_events
 
 logger = logging.getLogger(__name__)
 
@@ -19,7 +23,7 @@ async def backtesting_page(request: Request):
         {
             "request": request,
             "active_page": "backtesting",
-            "available_models": ModelService.get_trained_models()
+            "available_models": await asyncio.to_thread(ModelService.get_trained_models)
         },
     )
 
@@ -28,16 +32,53 @@ async def backtesting_page(request: Request):
 async def forecast_multiple(
     date: str = Form(...),
     model_names: str = Form(...),  # Comma-separated list of model names
+    series_id: Optional[str] = Form(None),
 ):
     """API endpoint for forecasting from multiple models (backtesting)."""
     model_names_list = [name.strip() for name in model_names.split(',') if name.strip()]
 
-    logger.info(f"Forecast Multiple request - Models: {model_names_list}, Date: {date}")
+    logger.info("Forecast Multiple request - Models: %s, Date: %s, Series: %s", model_names_list, date, series_id)
 
-    forecast_result = await ModelService.forecast_from_mulitple_models(model_names_list, date)
+    try:
+        forecast_result = await ModelService.forecast_from_mulitple_models(model_names_list, date, series_id)
+    except MemoryBudgetExceeded as e:
+        logger.error("Forecast Multiple rejected: %s", e)
+        return JSONResponse(status_code=503, content={"error": str(e)})
 
-    logger.info(f"Forecast completed successfully for {len(model_names_list)} models")
+    logger.info("Forecast completed successfully for %s models", len(model_names_list))
 
     return JSONResponse(forecast_result)
 
 
+@router.post("/api/forecast-multiple/stream")
+async def forecast_multiple_stream(
+    date: str = Form(...),
+    model_names: str = Form(...),  # Comma-separated list of model names
+    series_id: Optional[str] = Form(None),
+):
+    """
+    Streaming variant of /api/forecast-multiple (Server-Sent Events).
+
+    Sends an `actual_loads` event, one `model` (or `model_error`) event per model as soon
+    as its forecast is ready, and a final `summary` event.
+    """
+    model_names_list = [name.strip() for name in model_names.split(',') if name.strip()]
+
+    logger.info("Forecast Multiple stream request - Models: %s, Date: %s, Series: %s", model_names_list, date, series_id)
+
+    events = ModelService.stream_forecast_from_mulitple_models(model_names_list, date, series_id)
+    try:
+        # Prepare the data before the stream starts so input errors get a proper status code
+        first_event = await events.__anext__()
+    except (ValueError, KeyError) as e:
+        logger.error("Validation error in forecast_multiple_stream: %s", e)
+        return JSONResponse(status_code=400, content={"error": str(e)})
+    except FileNotFoundError as e:
+        logger.error("File not found error in forecast_multiple_stream: %s", e)
+        return JSONResponse(status_code=404, content={"error": str(e)})
+
+    return StreamingResponse(
+        stream_events(events, first_event),
+        media_type="text/event-stream",
+        headers=SSE_HEADERS
+    )
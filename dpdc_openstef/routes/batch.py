@@ -0,0 +1,97 @@
+"""Multi-series batch training and forecasting routes"""
+from fastapi import APIRouter, BackgroundTasks, Form
+from fastapi.responses import JSONResponse
+from typing import Optional
+import asyncio
+import json
+import logging
+from services.batch_jobs import (
+    create_batch_forecast_job,
+    create_batch_training_job,
+    get_batch_job,
+    parse_series_ids,
+    run_batch_forecast,
+    run_batch_training,
+)
+from services.master_data import list_series
+from services.model_catalog import model_names
+
+logger = logging.getLogger(__name__)
+
+router = APIRouter()
+
+
+@router.get("/api/series")
+async def get_series():
+    """API endpoint listing the load series with a data file and their trained models"""
+    return JSONResponse({
+        "series": [
+            {"series_id": series_id, "models": await asyncio.to_thread(model_names, series_id)}
+            for series_id in list_series()
+        ]
+    })
+
+
+@router.post("/api/batch/train")
+async def start_batch_training(
+    background_tasks: BackgroundTasks,
+    series_ids: str = Form(...),  # Comma-separated list of series ids
+    model: str = Form(...),
+    training_data_start_date: str = Form(...),
+    training_data_end_date: str = Form(...),
+    hyperparams: str = Form(...),
+    name_template: str = Form("{series_id}_{model}"),
+    training_profile: Optional[str] = Form(None)  # 'full' or 'lean', defaults to TRAINING_PROFILE
+):
+    """API endpoint for training one model per series in the background"""
+    try:
+        job_id = create_batch_training_job(
+            parse_series_ids(series_ids),
+            model,
+            training_data_start_date,
+            training_data_end_date,
+            json.loads(hyperparams),
+            name_template,
+            training_profile
+        )
+    except ValueError as e:
+        logger.error("Invalid batch training request: %s", e)
+        return JSONResponse(status_code=400, content={"detail": str(e)})
+
+    background_tasks.add_task(run_batch_training, job_id)
+    logger.info("Batch training job %s queued for %s series", job_id, len(get_batch_job(job_id)["series"]))
+
+    return JSONResponse(status_code=202, content=get_batch_job(job_id))
+
+
+@router.post("/api/batch/forecast")
+async def start_batch_forecast(
+    background_tasks: BackgroundTasks,
+    series_ids: str = Form(...),  # Comma-separated list of series ids
+    date: str = Form(...),
+    model_names: Optional[str] = Form(None)  # Comma-separated; defaults to each series' own models
+):
+    """API endpoint for backtesting the models of many series in the background"""
+    model_names_list = [name.strip() for name in (model_names or "").split(',') if name.strip()]
+    try:
+        # Looks up the models of every series in the catalogue
+        job_id = await asyncio.to_thread(
+            create_batch_forecast_job, parse_series_ids(series_ids), date, model_names_list or None
+        )
+    except ValueError as e:
+        logger.error("Invalid batch forecast request: %s", e)
+        return JSONResponse(status_code=400, content={"detail": str(e)})
+
+    background_tasks.add_task(run_batch_forecast, job_id)
+    logger.info("Batch forecast job %s queued for %s series", job_id, len(get_batch_job(job_id)["series"]))
+
+    return JSONResponse(status_code=202, content=get_batch_job(job_id))
+
+
+@router.get("/api/batch/{job_id}")
+async def get_batch_status(job_id: str):
+    """API endpoint for polling the status and results of a batch job"""
+    job = get_batch_job(job_id)
+    if job is None:
+        return JSONResponse(status_code=404, content={"detail": f"Unknown batch job: {job_id}"})
+    return JSONResponse(job)
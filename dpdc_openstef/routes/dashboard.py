@@ -93,7 +93,7 @@ async def get_dashboard_data(
     except ValueError as ve:
         return JSONResponse(status_code=400, content={"detail": f"Invalid date format: {str(ve)}"})
     except Exception as e:
-        logger.error(f"Error fetching dashboard data: {e}")
+        logger.error("Error fetching dashboard data: %s", e)
         return JSONResponse(status_code=500, content={"detail": str(e)})
 
 
@@ -189,5 +189,5 @@ async def check_dashboard_health(
         })
 
     except Exception as e:
-        logger.error(f"Error checking dashboard health: {e}")
+        logger.error("Error checking dashboard health: %s", e)
         return JSONResponse(status_code=500, content={"detail": str(e)})
@@ -1,14 +1,26 @@
 """Data Input routes"""
-from fastapi import APIRouter, Request, Form
+from fastapi import APIRouter, BackgroundTasks, Request, Form
 from fastapi.responses import HTMLResponse, JSONResponse
 from fastapi.templating import Jinja2Templates
+import asyncio
 import json
 import logging
+import shutil
 import pandas as pd
 from datetime import datetime, timedelta
 import os
 from pathlib import Path
-from services.weather_service import get_weather_for_date
+from typing import Any, Dict, List, Tuple
+from services.forecast_scheduler import DHAKA_TZ, forecast_scheduler
+from services.master_data import (
+    MASTER_COLUMNS,
+    master_data_lock,
+    read_master_data,
+    update_master_rows,
+    write_master_data,
+)
+from services.weather_backfill import create_backfill_job, get_backfill_job, run_backfill_job
+from services.weather_service import WEATHER_COLUMNS, get_weather_for_date
 
 logger = logging.getLogger(__name__)
 
@@ -28,7 +40,7 @@ async def data_input_page(request: Request):
 @router.get("/api/data-input")
 async def get_data_input(date: str):
     """API endpoint for fetching predicted and actual data for a specific date"""
-    logger.info(f"Fetching data input for date: {date}")
+    logger.info("Fetching data input for date: %s", date)
     
     try:
         # Read the CSV file
@@ -79,12 +91,12 @@ async def get_data_input(date: str):
                 "national_event_type": national_event_type
             })
         
-        logger.debug(f"Retrieved {len(hourly_data)} hourly records for date: {date}")
+        logger.debug("Retrieved %s hourly records for date: %s", len(hourly_data), date)
         
         return JSONResponse({"date": date, "data": hourly_data})
     
     except Exception as e:
-        logger.error(f"Error fetching data for date {date}: {str(e)}")
+        logger.error("Error fetching data for date %s: %s", date, e)
         # Return default values if error occurs
         hourly_data = []
         selected_date = pd.to_datetime(date)
@@ -111,166 +123,34 @@ async def update_data_input(
     try:
         data_list = json.loads(hourly_data)
         
-        logger.info(f"Updating data for date: {date} with {len(data_list)} records")
-        logger.debug(f"Hourly data: {data_list}")
+        logger.info("Updating data for date: %s with %s records", date, len(data_list))
+        logger.debug("Hourly data: %s", data_list)
         
         # Extract common values from the first data point
         is_holiday = data_list[0]['is_holiday']
         holiday_type = data_list[0]['holiday_type']
         national_event_type = data_list[0]['national_event_type']
         
-        # Create a backup first
-        import shutil
-        backup_path = CSV_FILE_PATH.with_suffix('.csv.bak')
-        if CSV_FILE_PATH.exists():
-            shutil.copy2(CSV_FILE_PATH, backup_path)
-        
-        # Read all lines from the CSV file
-        with open(CSV_FILE_PATH, 'r', encoding='utf-8') as f:
-            lines = f.readlines()
-        
-        # Keep track of which timestamps we're updating
-        timestamps_to_update = {hour_data['timestamp']: hour_data for hour_data in data_list}
-        timestamps_found = set()
-        
-        records_updated = 0
-        records_created = 0
-        
-        # Fetch weather data for the date (needed for both updates and creates)
+        # Fetch weather data for the date (needed for both updates and creates), off the event loop
         selected_date = pd.to_datetime(date)
         try:
-            weather_data = get_weather_for_date(selected_date)
-            logger.info(f"Fetched weather data for {date}: {len(weather_data)} hours")
+            weather_data = await asyncio.to_thread(get_weather_for_date, selected_date)
+            logger.info("Fetched weather data for %s: %s hours", date, len(weather_data))
         except Exception as e:
-            logger.error(f"Failed to fetch weather data for {date}: {e}")
+            logger.error("Failed to fetch weather data for %s: %s", date, e)
             # Use default empty weather data
             weather_data = [{'temp': 0, 'dwpt': 0, 'rhum': 0, 'prcp': 0, 'wdir': 0, 'wspd': 0, 'pres': 0, 'coco': 0} for _ in range(24)]
         
-        # Process existing lines and update matching timestamps
-        updated_lines = []
-        header_line = lines[0] if lines else "date_time,load,is_holiday,holiday_type,national_event_type,temp,dwpt,rhum,prcp,wdir,wspd,pres,coco,forecasted_load\n"
-        updated_lines.append(header_line)
+        # The read-modify-write cycle holds the master data lock; run it off the event loop
+        records_updated, records_created = await asyncio.to_thread(
+            _apply_hourly_data, data_list, weather_data, is_holiday, holiday_type, national_event_type
+        )
         
-        # Parse all existing data lines (excluding header and malformed lines)
-        existing_data = []
-        for i, line in enumerate(lines[1:], 1):  # Skip header
-            line = line.strip()
-            if not line:  # Skip empty lines
-                continue
-                
-            parts = line.split(',')
-            if len(parts) < 14:  # Skip malformed lines
-                logger.warning(f"Skipping malformed line {i}: {line}")
-                continue
-            
-            line_timestamp = parts[0]
-            
-            # Check if this line's timestamp matches one we need to update
-            if line_timestamp in timestamps_to_update:
-                hour_data = timestamps_to_update[line_timestamp]
-                timestamps_found.add(line_timestamp)
-                
-                # Get the hour from timestamp to fetch corresponding weather data
-                try:
-                    timestamp_obj = pd.to_datetime(line_timestamp)
-                    hour = timestamp_obj.hour
-                    weather_hour = weather_data[hour] if hour < len(weather_data) else weather_data[0]
-                    
-                    # Update columns: load, is_holiday, holiday_type, national_event_type, weather data, forecasted_load
-                    parts[1] = str(hour_data['load'])  # load
-                    parts[2] = str(is_holiday)  # is_holiday
-                    parts[3] = str(holiday_type)  # holiday_type
-                    parts[4] = str(national_event_type)  # national_event_type
-                    parts[5] = str(weather_hour['temp'])  # temp
-                    parts[6] = str(weather_hour['dwpt'])  # dwpt
-                    parts[7] = str(weather_hour['rhum'])  # rhum
-                    parts[8] = str(weather_hour['prcp'])  # prcp
-                    parts[9] = str(weather_hour['wdir'])  # wdir
-                    parts[10] = str(weather_hour['wspd'])  # wspd
-                    parts[11] = str(weather_hour['pres'])  # pres
-                    parts[12] = str(weather_hour['coco'])  # coco
-                    parts[13] = str(hour_data['forecasted_load'])  # forecasted_load
-                    records_updated += 1
-                except Exception as e:
-                    logger.error(f"Error updating weather data for timestamp {line_timestamp}: {e}")
-                    # Keep original parts if weather update fails
-            
-            # Store the line with its timestamp for sorting
-            try:
-                timestamp_obj = pd.to_datetime(line_timestamp)
-                existing_data.append({
-                    'timestamp': timestamp_obj,
-                    'timestamp_str': line_timestamp,
-                    'line': ','.join(parts) + '\n'
-                })
-            except Exception as e:
-                logger.warning(f"Could not parse timestamp '{line_timestamp}': {e}")
-                # Still keep the line but with a fallback timestamp
-                existing_data.append({
-                    'timestamp': pd.Timestamp.max,  # Put unparseable lines at the end
-                    'timestamp_str': line_timestamp,
-                    'line': ','.join(parts) + '\n'
-                })
-        
-        # Find timestamps that weren't found in the file (need to be created)
-        timestamps_to_create = set(timestamps_to_update.keys()) - timestamps_found
-        
-        if timestamps_to_create:
-            # Create new rows for missing timestamps (weather data already fetched above)
-            for timestamp_str in timestamps_to_create:
-                hour_data = timestamps_to_update[timestamp_str]
-                
-                try:
-                    timestamp_obj = pd.to_datetime(timestamp_str)
-                    hour = timestamp_obj.hour
-                    
-                    # Get weather data for this specific hour
-                    weather_hour = weather_data[hour] if hour < len(weather_data) else weather_data[0]
-                    
-                    # Create row with weather data
-                    new_row = (
-                        f"{timestamp_str},"
-                        f"{hour_data['load']},"
-                        f"{is_holiday},"
-                        f"{holiday_type},"
-                        f"{national_event_type},"
-                        f"{weather_hour['temp']},"
-                        f"{weather_hour['dwpt']},"
-                        f"{weather_hour['rhum']},"
-                        f"{weather_hour['prcp']},"
-                        f"{weather_hour['wdir']},"
-                        f"{weather_hour['wspd']},"
-                        f"{weather_hour['pres']},"
-                        f"{weather_hour['coco']},"
-                        f"{hour_data['forecasted_load']}\n"
-                    )
-                    
-                    existing_data.append({
-                        'timestamp': timestamp_obj,
-                        'timestamp_str': timestamp_str,
-                        'line': new_row
-                    })
-                    records_created += 1
-                except Exception as e:
-                    logger.error(f"Could not parse new timestamp '{timestamp_str}': {e}")
-        
-        # Sort all data by timestamp to maintain chronological order
-        existing_data.sort(key=lambda x: x['timestamp'])
+        logger.info("Data updated successfully for %s. Updated: %s, Created: %s", date, records_updated, records_created)
         
-        # Build the final lines list
-        for data in existing_data:
-            updated_lines.append(data['line'])
-        
-        # Write the updated lines back to the file
-        with open(CSV_FILE_PATH, 'w', encoding='utf-8') as f:
-            f.writelines(updated_lines)
-        
-        # Remove backup file after successful update
-        if backup_path.exists():
-            backup_path.unlink()
-            logger.debug(f"Removed backup file: {backup_path}")
-        
-        logger.info(f"Data updated successfully for {date}. Updated: {records_updated}, Created: {records_created}")
+        # New actuals for today change the realtime forecasts, recompute them right away
+        if date == datetime.now(DHAKA_TZ).strftime('%Y-%m-%d'):
+            forecast_scheduler.request_refresh()
         
         return JSONResponse({
             "status": "success",
@@ -279,16 +159,117 @@ async def update_data_input(
         })
     
     except Exception as e:
-        logger.error(f"Error updating data for date {date}: {str(e)}")
-        # Restore from backup if it exists
-        backup_path = CSV_FILE_PATH.with_suffix('.csv.bak')
-        if backup_path.exists():
-            import shutil
-            shutil.copy2(backup_path, CSV_FILE_PATH)
-            logger.info("Restored CSV from backup due to error")
-        
+        logger.error("Error updating data for date %s: %s", date, e)
         return JSONResponse({
             "status": "error",
             "message": f"Failed to update data: {str(e)}",
             "records_updated": 0
-        }, status_code=500)
\ No newline at end of file
+        }, status_code=500)
+
+
+def _apply_hourly_data(
+    data_list: List[Dict[str, Any]],
+    weather_data: List[Dict[str, Any]],
+    is_holiday: int,
+    holiday_type: int,
+    national_event_type: int
+) -> Tuple[int, int]:
+    """
+    Write hourly loads, day flags and weather into the master CSV, creating missing hours
+    
+    The whole cycle holds the master data lock. The file is replaced atomically by
+    `write_master_data`, so readers never parse a half-written file; the backup taken
+    under the lock is moved back into place if the update fails.
+    
+    Returns:
+        Tuple of (records_updated, records_created)
+    """
+    backup_path = CSV_FILE_PATH.with_suffix('.csv.bak')
+    with master_data_lock:
+        if CSV_FILE_PATH.exists():
+            shutil.copy2(CSV_FILE_PATH, backup_path)
+        try:
+            if CSV_FILE_PATH.exists():
+                master = read_master_data(CSV_FILE_PATH)
+                # Rows whose timestamp does not parse are kept as they are, at the end of the file
+                timestamps = pd.to_datetime(master.index, utc=True, errors='coerce')
+                unparsed = master[timestamps.isna()]
+                if len(unparsed):
+                    logger.warning("Keeping %s rows with unparseable timestamps at the end of the file", len(unparsed))
+                master = master[timestamps.notna()].set_axis(timestamps[timestamps.notna()].rename('date_time'))
+                master = master[~master.index.duplicated(keep='first')]
+            else:
+                master = pd.DataFrame(columns=MASTER_COLUMNS, index=pd.DatetimeIndex([], tz='UTC', name='date_time'))
+                unparsed = master
+            
+            rows = []
+            for hour_data in data_list:
+                try:
+                    timestamp = pd.to_datetime(hour_data['timestamp'])
+                except Exception as e:
+                    logger.error("Could not parse timestamp '%s': %s", hour_data['timestamp'], e)
+                    continue
+                # Weather of the matching hour of the day
+                weather_hour = weather_data[timestamp.hour] if timestamp.hour < len(weather_data) else weather_data[0]
+                rows.append({
+                    'date_time': timestamp,
+                    'load': hour_data['load'],
+                    'is_holiday': is_holiday,
+                    'holiday_type': holiday_type,
+                    'national_event_type': national_event_type,
+                    **{column: weather_hour[column] for column in WEATHER_COLUMNS},
+                    'forecasted_load': hour_data['forecasted_load'],
+                })
+            updates = pd.DataFrame(rows, columns=['date_time'] + MASTER_COLUMNS).set_index('date_time')
+            updates = updates[~updates.index.duplicated(keep='last')]
+            
+            existing = updates.index.isin(master.index)
+            records_updated = int(existing.sum())
+            records_created = len(updates) - records_updated
+            
+            columns = [column for column in MASTER_COLUMNS if column in master.columns]
+            update_master_rows(master, updates.loc[existing, columns])
+            if records_created:
+                new_rows = updates[~existing].reindex(columns=master.columns)
+                master = pd.concat([master, new_rows]).sort_index()
+            
+            write_master_data(pd.concat([master, unparsed]) if len(unparsed) else master, CSV_FILE_PATH)
+        except Exception:
+            if backup_path.exists():
+                os.replace(backup_path, CSV_FILE_PATH)
+                logger.info("Restored CSV from backup due to error")
+            raise
+        finally:
+            if backup_path.exists():
+                backup_path.unlink()
+                logger.debug("Removed backup file: %s", backup_path)
+    return records_updated, records_created
+
+
+@router.post("/api/data-input/weather-backfill")
+async def start_weather_backfill(
+    background_tasks: BackgroundTasks,
+    start_date: str = Form(...),
+    end_date: str = Form(...)
+):
+    """API endpoint for backfilling weather columns of the master data over a date range"""
+    try:
+        job_id = create_backfill_job(start_date, end_date)
+    except ValueError as e:
+        logger.error("Invalid weather backfill request: %s", e)
+        return JSONResponse(status_code=400, content={"detail": str(e)})
+    
+    # Runs in the threadpool after the response has been sent
+    background_tasks.add_task(run_backfill_job, job_id)
+    logger.info("Weather backfill job %s queued for %s to %s", job_id, start_date, end_date)
+    
+    return JSONResponse(status_code=202, content=get_backfill_job(job_id))
+
+
+@router.get("/api/data-input/weather-backfill/{job_id}")
+async def get_weather_backfill_status(job_id: str):
+    """API endpoint for polling the status of a weather backfill job"""
+    job = get_backfill_job(job_id)
+    if job is None:
+        return JSONResponse(status_code=404, content={"detail": f"Unknown backfill job: {job_id}"})
+    return JSONResponse(job)
@@ -2,6 +2,7 @@
 from fastapi import APIRouter, Request, Form
 from fastapi.responses import HTMLResponse, JSONResponse
 from fastapi.templating import Jinja2Templates
+import asyncio
 import json
 import logging
 from services.model_service import ModelService
@@ -20,7 +21,7 @@ async def forecast_page(request: Request):
         {
             "request": request, 
             "active_page": "forecast", 
-            "available_models": ModelService.get_trained_models()
+            "available_models": await asyncio.to_thread(ModelService.get_trained_models)
         }
     )
 
@@ -38,14 +39,14 @@ async def forecast(
     """API endpoint for forecasting"""
     weather_dict = json.loads(weather_data)
     
-    logger.info(f"Forecast request - Model: {model_name}, Date: {date}, Hour: {hour}")
-    logger.debug(f"Holiday: {holiday}, Holiday Type: {holiday_type}, Nation Event: {nation_event}")
-    logger.debug(f"Weather Data: {weather_dict}")
+    logger.info("Forecast request - Model: %s, Date: %s, Hour: %s", model_name, date, hour)
+    logger.debug("Holiday: %s, Holiday Type: %s, Nation Event: %s", holiday, holiday_type, nation_event)
+    logger.debug("Weather Data: %s", weather_dict)
 
     # Get forecast result from the model service
     forecast_result = await ModelService.forecast_from_model(model_name, date, hour)
     
-    logger.info(f"Forecast completed successfully for model: {model_name}")
+    logger.info("Forecast completed successfully for model: %s", model_name)
     
     return JSONResponse(forecast_result)
 
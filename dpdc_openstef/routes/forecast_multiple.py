@@ -1,10 +1,13 @@
 """Forecast Multiple Models routes"""
 from fastapi import APIRouter, Request, Form
-from fastapi.responses import HTMLResponse, JSONResponse
+from fastapi.responses import HTMLResponse, JSONResponse, StreamingResponse
 from fastapi.templating import Jinja2Templates
-from typing import List
+from typing import List, Optional
+import asyncio
 import logging
 from services.model_service import ModelService
+from services.forecast_scheduler import forecast_scheduler
+from utils.sse import SSE_HEADERS, stream_events
 
 logger = logging.getLogger(__name__)
 
@@ -20,7 +23,7 @@ async def forecast_multiple_page(request: Request):
         {
             "request": request, 
             "active_page": "forecast-multiple", 
-            "available_models": ModelService.get_trained_models()
+            "available_models": await asyncio.to_thread(ModelService.get_trained_models)
         }
     )
 
@@ -31,32 +34,34 @@ async def generate_forecast(
     model_names: str = Form(...),  # Comma-separated list of model names
     holiday: int = Form(...),
     holiday_type: int = Form(...),
-    nation_event: int = Form(...)
+    nation_event: int = Form(...),
+    series_id: Optional[str] = Form(None)
 ):
     """API endpoint for generating real-time forecasts from current hour to end of day"""
     # Parse the comma-separated model names
     model_names_list = [name.strip() for name in model_names.split(',') if name.strip()]
     
-    logger.info(f"Generate Forecast request - Models: {model_names_list}, Date: {date}")
-    logger.debug(f"Holiday: {holiday}, Holiday Type: {holiday_type}, Nation Event: {nation_event}")
+    logger.info("Generate Forecast request - Models: %s, Date: %s, Series: %s", model_names_list, date, series_id)
+    logger.debug("Holiday: %s, Holiday Type: %s, Nation Event: %s", holiday, holiday_type, nation_event)
 
     try:
-        # Get real-time forecast results from multiple models
-        forecast_result = await ModelService.generate_realtime_forecast(
+        # Get real-time forecast results, precomputed by the scheduler where available
+        forecast_result = await forecast_scheduler.get_realtime_forecast(
             model_names_list, 
             date, 
             holiday, 
             holiday_type, 
-            nation_event
+            nation_event,
+            series_id
         )
         
-        logger.info(f"Real-time forecast completed successfully for {len(model_names_list)} models")
+        logger.info("Real-time forecast completed successfully for %s models", len(model_names_list))
         
         return JSONResponse(forecast_result)
     
     except ValueError as e:
         # Handle validation errors (e.g., wrong date, empty model list)
-        logger.error(f"Validation error in generate_forecast: {str(e)}")
+        logger.error("Validation error in generate_forecast: %s", e)
         return JSONResponse(
             status_code=400,
             content={"error": str(e)}
@@ -64,7 +69,7 @@ async def generate_forecast(
     
     except FileNotFoundError as e:
         # Handle missing files
-        logger.error(f"File not found error in generate_forecast: {str(e)}")
+        logger.error("File not found error in generate_forecast: %s", e)
         return JSONResponse(
             status_code=404,
             content={"error": str(e)}
@@ -72,8 +77,59 @@ async def generate_forecast(
     
     except Exception as e:
         # Handle any other unexpected errors
-        logger.error(f"Unexpected error in generate_forecast: {str(e)}", exc_info=True)
+        logger.error("Unexpected error in generate_forecast: %s", e, exc_info=True)
         return JSONResponse(
             status_code=500,
             content={"error": f"An unexpected error occurred: {str(e)}"}
         )
+
+
+@router.post("/api/generate-forecast/stream")
+async def generate_forecast_stream(
+    date: str = Form(...),
+    model_names: str = Form(...),  # Comma-separated list of model names
+    holiday: int = Form(...),
+    holiday_type: int = Form(...),
+    nation_event: int = Form(...),
+    series_id: Optional[str] = Form(None)
+):
+    """
+    Streaming variant of /api/generate-forecast (Server-Sent Events).
+    
+    Sends a `context` event with the historical loads, one `model` event per model as soon
+    as its forecast is ready (precomputed models first), and a final `summary` event.
+    """
+    model_names_list = [name.strip() for name in model_names.split(',') if name.strip()]
+    
+    logger.info("Generate Forecast stream request - Models: %s, Date: %s, Series: %s", model_names_list, date, series_id)
+    logger.debug("Holiday: %s, Holiday Type: %s, Nation Event: %s", holiday, holiday_type, nation_event)
+
+    events = forecast_scheduler.stream_realtime_forecast(
+        model_names_list, 
+        date, 
+        holiday, 
+        holiday_type, 
+        nation_event,
+        series_id
+    )
+    try:
+        # Validate the request before the stream starts so errors get a proper status code
+        first_event = await events.__anext__()
+    except ValueError as e:
+        logger.error("Validation error in generate_forecast_stream: %s", e)
+        return JSONResponse(status_code=400, content={"error": str(e)})
+    except FileNotFoundError as e:
+        logger.error("File not found error in generate_forecast_stream: %s", e)
+        return JSONResponse(status_code=404, content={"error": str(e)})
+    except Exception as e:
+        logger.error("Unexpected error in generate_forecast_stream: %s", e, exc_info=True)
+        return JSONResponse(
+            status_code=500,
+            content={"error": f"An unexpected error occurred: {str(e)}"}
+        )
+
+    return StreamingResponse(
+        stream_events(events, first_event),
+        media_type="text/event-stream",
+        headers=SSE_HEADERS
+    )
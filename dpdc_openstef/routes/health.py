@@ -0,0 +1,20 @@
+"""Health and readiness routes"""
+from fastapi import APIRouter
+from fastapi.responses import JSONResponse
+
+from services.warmup import get_warmup_status, is_ready
+
+router = APIRouter()
+
+
+@router.get("/health/live")
+async def liveness():
+    """Liveness probe: the process is up and serving requests."""
+    return JSONResponse({"status": "alive"})
+
+
+@router.get("/health/ready")
+async def readiness():
+    """Readiness probe: 200 once the warm-up finished, 503 while it is still running."""
+    status = get_warmup_status()
+    return JSONResponse(status_code=200 if is_ready() else 503, content=status)
@@ -0,0 +1,99 @@
+"""Routes that queue training and forecast jobs for the worker processes"""
+from fastapi import APIRouter, Form
+from fastapi.responses import JSONResponse
+from typing import Any, Dict, Optional
+import asyncio
+import json
+import logging
+from services.job_queue import enqueue_job, get_job, list_jobs
+from services.master_data import normalize_series_id
+from services.model_service import normalize_training_profile
+
+logger = logging.getLogger(__name__)
+
+router = APIRouter()
+
+
+async def _enqueue(kind: str, payload: Dict[str, Any]) -> JSONResponse:
+    """Queue a job and return its status with 202, or 400 if the request is invalid"""
+    try:
+        if payload.get("series_id") is not None:
+            payload["series_id"] = normalize_series_id(payload["series_id"])
+        if kind == "train":
+            payload["training_profile"] = normalize_training_profile(payload.get("training_profile"))
+        job_id = await asyncio.to_thread(enqueue_job, kind, payload)
+    except ValueError as e:
+        logger.error("Invalid %s job request: %s", kind, e)
+        return JSONResponse(status_code=400, content={"detail": str(e)})
+    return JSONResponse(status_code=202, content=await asyncio.to_thread(get_job, job_id))
+
+
+@router.post("/api/jobs/train")
+async def queue_training(
+    model: str = Form(...),
+    custom_name: str = Form(...),
+    training_data_start_date: str = Form(...),
+    training_data_end_date: str = Form(...),
+    hyperparams: str = Form(...),
+    series_id: Optional[str] = Form(None),
+    training_profile: Optional[str] = Form(None)
+):
+    """API endpoint for queueing a training job (same fields as /api/train)"""
+    return await _enqueue("train", {
+        "model": model,
+        "custom_name": custom_name,
+        "training_data_start_date": training_data_start_date,
+        "training_data_end_date": training_data_end_date,
+        "hyperparams_dict": json.loads(hyperparams),
+        "series_id": series_id,
+        "training_profile": training_profile,
+    })
+
+
+@router.post("/api/jobs/backtest")
+async def queue_backtest(
+    date: str = Form(...),
+    model_names: str = Form(...),  # Comma-separated list of model names
+    series_id: Optional[str] = Form(None)
+):
+    """API endpoint for queueing a backtest job (same fields as /api/forecast-multiple)"""
+    return await _enqueue("backtest", {
+        "custom_names": [name.strip() for name in model_names.split(',') if name.strip()],
+        "date": date,
+        "series_id": series_id,
+    })
+
+
+@router.post("/api/jobs/realtime")
+async def queue_realtime_forecast(
+    date: str = Form(...),
+    model_names: str = Form(...),  # Comma-separated list of model names
+    holiday: int = Form(0),
+    holiday_type: int = Form(0),
+    nation_event: int = Form(0),
+    series_id: Optional[str] = Form(None)
+):
+    """API endpoint for queueing a real-time forecast job (same fields as /api/generate-forecast)"""
+    return await _enqueue("realtime", {
+        "custom_names": [name.strip() for name in model_names.split(',') if name.strip()],
+        "date": date,
+        "holiday": holiday,
+        "holiday_type": holiday_type,
+        "nation_event": nation_event,
+        "series_id": series_id,
+    })
+
+
+@router.get("/api/jobs")
+async def get_jobs(status: Optional[str] = None, limit: int = 50):
+    """API endpoint listing the most recent queued jobs, optionally filtered by status"""
+    return JSONResponse({"jobs": await asyncio.to_thread(list_jobs, status, min(max(limit, 1), 500))})
+
+
+@router.get("/api/jobs/{job_id}")
+async def get_job_status(job_id: str):
+    """API endpoint for polling the status and result of a queued job"""
+    job = await asyncio.to_thread(get_job, job_id)
+    if job is None:
+        return JSONResponse(status_code=404, content={"detail": f"Unknown job: {job_id}"})
+    return JSONResponse(job)
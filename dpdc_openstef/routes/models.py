@@ -0,0 +1,69 @@
+"""Trained model management routes"""
+from fastapi import APIRouter, Form
+from fastapi.responses import JSONResponse
+from typing import Optional
+import asyncio
+import logging
+from services.forecast_scheduler import forecast_scheduler
+from services.model_cache import invalidate_model
+from services.model_catalog import query_models, record_model
+from services.model_store import current_version, list_versions, rollback_model, trained_model_names
+
+logger = logging.getLogger(__name__)
+
+router = APIRouter()
+
+
+@router.get("/api/models")
+async def get_models(
+    model: Optional[str] = None,
+    series_id: Optional[str] = None,
+    q: Optional[str] = None,
+    trained_after: Optional[str] = None,
+    trained_before: Optional[str] = None,
+    sort: str = "trained_at",
+    order: str = "desc",
+    limit: int = 50,
+    offset: int = 0
+):
+    """API endpoint listing trained models from the model catalogue with filters, sorting and paging"""
+    try:
+        page = await asyncio.to_thread(
+            query_models, model, series_id, q, trained_after, trained_before, sort, order, limit, offset
+        )
+    except ValueError as e:
+        return JSONResponse(status_code=400, content={"detail": str(e)})
+    return JSONResponse(page)
+
+
+@router.get("/api/models/{custom_name}/versions")
+async def get_model_versions(custom_name: str):
+    """API endpoint listing the published versions of a model, newest first"""
+    if custom_name not in trained_model_names():
+        return JSONResponse(status_code=404, content={"detail": f"Unknown model: {custom_name}"})
+    return JSONResponse({
+        "custom_name": custom_name,
+        "current_version": current_version(custom_name),
+        "versions": list_versions(custom_name)
+    })
+
+
+@router.post("/api/models/{custom_name}/rollback")
+async def rollback(custom_name: str, version: Optional[str] = Form(None)):
+    """API endpoint for serving an earlier version of a model again (default: the previous one)"""
+    if custom_name not in trained_model_names():
+        return JSONResponse(status_code=404, content={"detail": f"Unknown model: {custom_name}"})
+    try:
+        served = await asyncio.to_thread(rollback_model, custom_name, version)
+    except FileNotFoundError as e:
+        return JSONResponse(status_code=404, content={"detail": str(e)})
+    except ValueError as e:
+        return JSONResponse(status_code=400, content={"detail": str(e)})
+
+    invalidate_model(custom_name)
+    await asyncio.to_thread(record_model, custom_name)
+    if custom_name in forecast_scheduler.model_names:
+        # Precomputed forecasts came from the version that was just replaced
+        forecast_scheduler.request_refresh()
+    logger.info("Model %s now serves version %s", custom_name, served)
+    return JSONResponse({"custom_name": custom_name, "current_version": served})
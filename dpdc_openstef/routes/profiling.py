@@ -0,0 +1,20 @@
+"""Admin routes for request profiles"""
+from fastapi import APIRouter, Header
+from fastapi.responses import JSONResponse
+from typing import Optional
+
+from services.profiling import is_profiling_authorized, load_profile_summary
+
+router = APIRouter()
+
+
+@router.get("/api/admin/profiles/{profile_id}")
+async def get_profile(profile_id: str, x_admin_token: Optional[str] = Header(None)):
+    """Return the top cumulative functions of a stored request profile."""
+    if not is_profiling_authorized(x_admin_token):
+        return JSONResponse(status_code=403, content={"error": "Profiling is disabled or the admin token is invalid"})
+
+    summary = load_profile_summary(profile_id)
+    if summary is None:
+        return JSONResponse(status_code=404, content={"error": f"Profile {profile_id} not found"})
+    return JSONResponse(summary)
@@ -2,9 +2,12 @@
 from fastapi import APIRouter, Request, Form
 from fastapi.responses import HTMLResponse, JSONResponse
 from fastapi.templating import Jinja2Templates
+from typing import Optional
 import json
 import logging
-from services.model_service import ModelService
+from services.master_data import normalize_series_id
+from services.memory_budget import MemoryBudgetExceeded
+from services.model_service import ModelService, normalize_training_profile
 
 logger = logging.getLogger(__name__)
 
@@ -24,30 +27,46 @@ async def train_model(
     custom_name: str = Form(...),
     training_data_start_date: str = Form(...),
     training_data_end_date: str = Form(...),
-    hyperparams: str = Form(...)
+    hyperparams: str = Form(...),
+    series_id: Optional[str] = Form(None),
+    training_profile: Optional[str] = Form(None)  # 'full' or 'lean', defaults to TRAINING_PROFILE
 ):
     """API endpoint for training model"""
     hyperparams_dict = json.loads(hyperparams)
-    logger.debug(f"Training request received - Model: {model}, Custom Name: {custom_name}")
-    logger.debug(f"Training data period: {training_data_start_date} to {training_data_end_date}")
-    logger.debug(f"Hyperparameters: {hyperparams_dict}")
+    logger.debug("Training request received - Model: %s, Custom Name: %s, Series: %s", model, custom_name, series_id)
+    logger.debug("Training data period: %s to %s", training_data_start_date, training_data_end_date)
+    logger.debug("Hyperparameters: %s", hyperparams_dict)
     
     # Call the new train_model_with_hyperparams function
-    await ModelService.train_model_with_hyperparams(
-        model=model,
-        custom_name=custom_name,
-        training_data_start_date=training_data_start_date,
-        training_data_end_date=training_data_end_date,
-        hyperparams_dict=hyperparams_dict
-    )
+    try:
+        await ModelService.train_model_with_hyperparams(
+            model=model,
+            custom_name=custom_name,
+            training_data_start_date=training_data_start_date,
+            training_data_end_date=training_data_end_date,
+            hyperparams_dict=hyperparams_dict,
+            series_id=series_id,
+            training_profile=training_profile
+        )
+    except ValueError as e:
+        logger.error("Invalid training request: %s", e)
+        return JSONResponse(status_code=400, content={"error": str(e)})
+    except FileNotFoundError as e:
+        logger.error("Training data not found: %s", e)
+        return JSONResponse(status_code=404, content={"error": str(e)})
+    except MemoryBudgetExceeded as e:
+        logger.error("Training rejected: %s", e)
+        return JSONResponse(status_code=503, content={"error": str(e)})
     
-    logger.info(f"Training initiated successfully for {model} model with name '{custom_name}' using data from {training_data_start_date} to {training_data_end_date}")
+    logger.info("Training initiated successfully for %s model with name '%s' using data from %s to %s", model, custom_name, training_data_start_date, training_data_end_date)
     
     return JSONResponse({
         "status": "success",
         "message": f"Training completed for {model} model",
         "model": model,
         "custom_name": custom_name,
+        "series_id": normalize_series_id(series_id),
+        "training_profile": normalize_training_profile(training_profile),
         "training_data_start_date": training_data_start_date,
         "training_data_end_date": training_data_end_date,
         "hyperparameters": hyperparams_dict
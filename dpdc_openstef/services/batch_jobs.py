@@ -0,0 +1,256 @@
+"""Background jobs that train or backtest models for many load series at once"""
+import asyncio
+import logging
+import os
+import time
+import uuid
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional
+
+from services.master_data import normalize_series_id, series_data_path
+from services.model_service import (
+    ModelService,
+    _backtest_model_result,
+    _prepare_backtest,
+    _train_model,
+    normalize_training_profile,
+)
+from services.worker_pool import FORECAST_WORKERS, TRAINING_WORKERS, run_in_training_worker, run_in_worker
+
+logger = logging.getLogger(__name__)
+
+# Maximum number of series a single batch job may cover
+MAX_BATCH_SERIES = 500
+
+# Series of one job processed at a time; defaults to the size of the job's worker pool, so
+# a series' data is only loaded and prepared once the pool can take its work
+BATCH_SERIES_CONCURRENCY = os.getenv("BATCH_SERIES_CONCURRENCY")
+
+# Time a finished job's status (and results) is kept for polling
+BATCH_JOB_TTL_SECONDS = float(os.getenv("BATCH_JOB_TTL_SECONDS", "3600"))
+
+# Status of submitted batch jobs, keyed by job id
+_jobs: Dict[str, Dict[str, Any]] = {}
+
+
+def parse_series_ids(series_ids: str) -> List[str]:
+    """
+    Parse a comma-separated list of series ids, dropping duplicates
+
+    Raises:
+        ValueError: If the list is empty, too long or contains an invalid id
+    """
+    parsed = list(dict.fromkeys(normalize_series_id(part) for part in series_ids.split(",") if part.strip()))
+    if not parsed:
+        raise ValueError("At least one series id is required.")
+    if len(parsed) > MAX_BATCH_SERIES:
+        raise ValueError(f"A batch cannot cover more than {MAX_BATCH_SERIES} series.")
+    missing = [series_id for series_id in parsed if not series_data_path(series_id).exists()]
+    if missing:
+        raise ValueError(f"No data file for series: {', '.join(missing)}")
+    return parsed
+
+
+def create_batch_training_job(
+    series_ids: List[str],
+    model: str,
+    training_data_start_date: str,
+    training_data_end_date: str,
+    hyperparams_dict: Dict[str, Any],
+    name_template: str = "{series_id}_{model}",
+    training_profile: Optional[str] = None
+) -> str:
+    """
+    Validate a batch training request and register a pending job for it.
+
+    Args:
+        series_ids: Series to train a model for, see `parse_series_ids`
+        model: Model type ('xgb' or 'lgb')
+        training_data_start_date: Start date for training data
+        training_data_end_date: End date for training data
+        hyperparams_dict: Hyperparameters shared by all models
+        name_template: Model name per series, may use {series_id} and {model}
+        training_profile: 'full' or 'lean', None for TRAINING_PROFILE
+
+    Returns:
+        Id of the registered job
+
+    Raises:
+        ValueError: If the dates are malformed, the name template or the training profile is invalid
+    """
+    start = datetime.strptime(training_data_start_date, '%Y-%m-%d')
+    end = datetime.strptime(training_data_end_date, '%Y-%m-%d')
+    if end < start:
+        raise ValueError("End date cannot be before start date.")
+    try:
+        names = {series_id: name_template.format(series_id=series_id, model=model) for series_id in series_ids}
+    except (KeyError, IndexError) as e:
+        raise ValueError(f"Invalid name template '{name_template}': unknown field {e}")
+    if len(set(names.values())) != len(names):
+        raise ValueError("The name template must contain {series_id} so every series gets its own model.")
+
+    job_id = _register_job("train", {
+        "model": model,
+        "training_data_start_date": training_data_start_date,
+        "training_data_end_date": training_data_end_date,
+        "hyperparameters": hyperparams_dict,
+        "training_profile": normalize_training_profile(training_profile),
+    }, {series_id: {"custom_name": name} for series_id, name in names.items()})
+    return job_id
+
+
+def create_batch_forecast_job(series_ids: List[str], date: str, model_names: Optional[List[str]] = None) -> str:
+    """
+    Validate a batch backtest request and register a pending job for it.
+
+    Args:
+        series_ids: Series to backtest, see `parse_series_ids`
+        date: Date string in format 'YYYY-MM-DD'
+        model_names: Models to run on every series, None to run the models trained on each series
+
+    Returns:
+        Id of the registered job
+
+    Raises:
+        ValueError: If the date is malformed or a series has no models
+    """
+    datetime.strptime(date, '%Y-%m-%d')
+    series_models = {}
+    for series_id in series_ids:
+        names = model_names or ModelService.get_trained_models(series_id)
+        if not names:
+            raise ValueError(f"No trained models for series '{series_id}'.")
+        series_models[series_id] = {"model_names": list(names)}
+
+    return _register_job("forecast", {"date": date}, series_models)
+
+
+def get_batch_job(job_id: str) -> Optional[Dict[str, Any]]:
+    """Return the status of a batch job, or None if it is unknown or expired"""
+    _evict_finished_jobs()
+    return _jobs.get(job_id)
+
+
+async def run_batch_training(job_id: str) -> None:
+    """
+    Execute a registered batch training job. Intended to run as a background task.
+
+    Up to BATCH_SERIES_CONCURRENCY series (default TRAINING_WORKERS) train at a time in
+    the training worker pool; a failing series does not stop the others.
+
+    Args:
+        job_id: Id returned by `create_batch_training_job`
+    """
+    job = _jobs[job_id]
+    params = job["params"]
+
+    async def train_series(series_id: str, entry: Dict[str, Any]) -> None:
+        await run_in_training_worker(
+            _train_model,
+            params["model"],
+            entry["custom_name"],
+            params["training_data_start_date"],
+            params["training_data_end_date"],
+            dict(params["hyperparameters"]),
+            series_id,
+            params["training_profile"],
+        )
+
+    await _run_job(job, train_series, _series_concurrency(TRAINING_WORKERS))
+
+
+async def run_batch_forecast(job_id: str) -> None:
+    """
+    Execute a registered batch backtest job. Intended to run as a background task.
+
+    The data of each series is loaded and prepared once for all its models when the series
+    starts; up to BATCH_SERIES_CONCURRENCY series (default FORECAST_WORKERS) run at a time
+    and their forecasts share the forecast worker pool.
+
+    Args:
+        job_id: Id returned by `create_batch_forecast_job`
+    """
+    job = _jobs[job_id]
+    date = job["params"]["date"]
+
+    async def forecast_series(series_id: str, entry: Dict[str, Any]) -> None:
+        context = await run_in_worker(_prepare_backtest, date, series_id)
+        entry["actual_loads"] = context["actual_loads"]
+        entry["all_forecasts"] = list(await asyncio.gather(*(
+            run_in_worker(_backtest_model_result, custom_name, context) for custom_name in entry["model_names"]
+        )))
+
+    await _run_job(job, forecast_series, _series_concurrency(FORECAST_WORKERS))
+
+
+def _register_job(kind: str, params: Dict[str, Any], series: Dict[str, Dict[str, Any]]) -> str:
+    """Register a pending batch job with one pending entry per series"""
+    _evict_finished_jobs()
+    job_id = uuid.uuid4().hex
+    _jobs[job_id] = {
+        "job_id": job_id,
+        "kind": kind,
+        "status": "pending",
+        "params": params,
+        "series": {
+            series_id: dict(entry, status="pending", error=None, duration_seconds=None)
+            for series_id, entry in series.items()
+        },
+        "completed": 0,
+        "failed": 0,
+        "error": None,
+        "submitted_at": datetime.now(timezone.utc).isoformat(),
+        "finished_at": None,
+    }
+    return job_id
+
+
+def _series_concurrency(pool_size: int) -> int:
+    """Series a job runs at a time: BATCH_SERIES_CONCURRENCY, else the size of its worker pool"""
+    return max(1, int(BATCH_SERIES_CONCURRENCY or pool_size))
+
+
+def _evict_finished_jobs() -> None:
+    """Drop jobs that finished more than BATCH_JOB_TTL_SECONDS ago"""
+    cutoff = datetime.now(timezone.utc).timestamp() - BATCH_JOB_TTL_SECONDS
+    for job_id, job in list(_jobs.items()):
+        if job["finished_at"] is not None and datetime.fromisoformat(job["finished_at"]).timestamp() < cutoff:
+            del _jobs[job_id]
+
+
+async def _run_job(job: Dict[str, Any], run_series, concurrency: int) -> None:
+    """
+    Run `run_series(series_id, entry)` for every series of a job, at most `concurrency` at a
+    time, and record the outcomes
+    """
+    job["status"] = "running"
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def run_one(series_id: str, entry: Dict[str, Any]) -> None:
+        async with semaphore:
+            entry["status"] = "running"
+            started = time.perf_counter()
+            try:
+                await run_series(series_id, entry)
+                entry["status"] = "completed"
+                job["completed"] += 1
+            except Exception as e:
+                logger.error("Batch %s job %s failed for series %s: %s",
+                             job["kind"], job["job_id"], series_id, e, exc_info=True)
+                entry.update(status="failed", error=str(e))
+                job["failed"] += 1
+            finally:
+                entry["duration_seconds"] = round(time.perf_counter() - started, 3)
+
+    try:
+        await asyncio.gather(*(run_one(series_id, entry) for series_id, entry in job["series"].items()))
+        job["status"] = "completed" if job["failed"] == 0 else "failed"
+        if job["failed"]:
+            job["error"] = f"{job['failed']} of {len(job['series'])} series failed"
+        logger.info("Batch %s job %s finished: %s completed, %s failed",
+                    job["kind"], job["job_id"], job["completed"], job["failed"])
+    except Exception as e:
+        logger.error("Batch %s job %s failed: %s", job["kind"], job["job_id"], e, exc_info=True)
+        job.update(status="failed", error=str(e))
+    finally:
+        job["finished_at"] = datetime.now(timezone.utc).isoformat()
@@ -0,0 +1,135 @@
+"""Process-wide budget of CPU threads for xgboost/lightgbm training and forecasts"""
+import logging
+import math
+import os
+import threading
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Dict, Iterator, Optional
+
+from services.metrics import Gauge
+
+logger = logging.getLogger(__name__)
+
+# Caps the CPUs used below the detected limit, e.g. when other processes share the container
+CPU_LIMIT = os.getenv("CPU_LIMIT")
+
+_CGROUP_ROOT = Path("/sys/fs/cgroup")
+
+
+def available_cpus() -> int:
+    """
+    Number of CPUs this process may use
+
+    The smallest of the CPU_LIMIT setting, the container's cgroup CPU quota (v2
+    `cpu.max` or v1 `cpu.cfs_quota_us`), the CPUs the process is pinned to
+    (`sched_getaffinity`) and the CPU count; at least 1.
+    """
+    limits = [os.cpu_count() or 1]
+    if hasattr(os, "sched_getaffinity"):
+        limits.append(len(os.sched_getaffinity(0)))
+    quota = _cgroup_cpu_quota()
+    if quota is not None:
+        limits.append(quota)
+    if CPU_LIMIT:
+        limits.append(float(CPU_LIMIT))
+    # A quota of 1.5 CPUs keeps two threads busy part of the time; round up
+    return max(1, math.ceil(min(limits)))
+
+
+def _cgroup_cpu_quota() -> Optional[float]:
+    """CPU quota of the container in CPUs, None if unlimited or not in a cgroup"""
+    try:
+        # cgroup v2: "<quota> <period>" or "max <period>"
+        quota, period = (_CGROUP_ROOT / "cpu.max").read_text().split()
+        return None if quota == "max" else int(quota) / int(period)
+    except (OSError, ValueError):
+        pass
+    try:
+        # cgroup v1: quota -1 means unlimited
+        quota = int((_CGROUP_ROOT / "cpu" / "cpu.cfs_quota_us").read_text())
+        period = int((_CGROUP_ROOT / "cpu" / "cpu.cfs_period_us").read_text())
+        return quota / period if quota > 0 and period > 0 else None
+    except (OSError, ValueError):
+        return None
+
+
+class CpuBudget:
+    """
+    Hands out thread counts from a fixed pool of cores, so concurrent xgboost/lightgbm
+    work does not oversubscribe the CPUs
+
+    A task reserves threads for as long as it runs and passes the granted count to
+    its model (`n_jobs`). Trainings get what is free, up to their share and at least
+    one thread. Forecasts always get their fixed, small share (their models are
+    configured with it when loaded); they are short, so the pool may briefly be
+    exceeded while they run, and trainings starting meanwhile get less.
+    """
+
+    def __init__(self, total: int):
+        self.total = total
+        self._reserved: Dict[str, int] = {}
+        self._lock = threading.Lock()
+
+    @property
+    def free(self) -> int:
+        """Threads not reserved by any task"""
+        return max(0, self.total - sum(self._reserved.values()))
+
+    @contextmanager
+    def reserve(self, threads: int, kind: str, exact: bool = False) -> Iterator[int]:
+        """
+        Reserve threads for the duration of a task
+
+        Args:
+            threads: Threads the task would like
+            kind: Kind of task ('training' or 'forecast'), for the metrics
+            exact: Always grant `threads`, also if fewer are free
+
+        Yields:
+            The granted number of threads
+        """
+        with self._lock:
+            granted = threads if exact else max(1, min(threads, self.free))
+            self._reserved[kind] = self._reserved.get(kind, 0) + granted
+        if granted < threads:
+            logger.info("Granted %s of %s %s threads, %s CPUs busy", granted, threads, kind, self.total - self.free)
+        try:
+            yield granted
+        finally:
+            with self._lock:
+                self._reserved[kind] -= granted
+
+    def reserved(self, kind: str) -> int:
+        """Threads currently reserved by tasks of a kind"""
+        return self._reserved.get(kind, 0)
+
+
+def with_thread_budget(model_kwargs: Optional[Dict[str, Any]], threads: int) -> Dict[str, Any]:
+    """
+    Copy of a model's kwargs with its thread count set to a budget
+
+    `n_jobs` is the thread count of openstef's xgb, lgb and xgb_quantile models; other
+    model types ignore it. An explicit, smaller `n_jobs` is kept.
+    """
+    model_kwargs = dict(model_kwargs or {})
+    requested = model_kwargs.get("n_jobs")
+    if isinstance(requested, int) and 0 < requested < threads:
+        threads = requested
+    model_kwargs["n_jobs"] = threads
+    return model_kwargs
+
+
+cpu_budget = CpuBudget(available_cpus())
+
+Gauge("cpu_budget_threads", "CPU threads available to model training and forecasts", callback=lambda: cpu_budget.total)
+Gauge(
+    "cpu_budget_training_threads_reserved",
+    "CPU threads currently reserved by model trainings",
+    callback=lambda: cpu_budget.reserved("training"),
+)
+Gauge(
+    "cpu_budget_forecast_threads_reserved",
+    "CPU threads currently reserved by forecasts",
+    callback=lambda: cpu_budget.reserved("forecast"),
+)
@@ -0,0 +1,274 @@
+"""Background scheduler that keeps realtime forecasts of production models precomputed"""
+import asyncio
+import logging
+import os
+import time
+from datetime import datetime, timedelta, timezone
+from typing import Any, AsyncIterator, Dict, List, Optional, Tuple
+
+from services.master_data import DEFAULT_SERIES_ID, normalize_series_id
+from services.metrics import cache_requests
+from services.model_service import ModelService
+from services.model_store import served_version_key
+
+logger = logging.getLogger(__name__)
+
+DHAKA_TZ = timezone(timedelta(hours=6))
+
+# Comma-separated names of the models whose realtime forecasts are precomputed
+PRODUCTION_MODELS = [name.strip() for name in os.getenv("PRODUCTION_MODELS", "").split(",") if name.strip()]
+# Seconds after the top of the hour to wait for new actuals before recomputing
+FORECAST_REFRESH_DELAY_SECONDS = float(os.getenv("FORECAST_REFRESH_DELAY_SECONDS", "120"))
+
+# (holiday, holiday_type, nation_event) flags the scheduled forecasts are computed with
+DEFAULT_FLAGS = (0, 0, 0)
+
+
+class ForecastScheduler:
+    """
+    Recomputes realtime forecasts for a fixed set of models at the top of every hour
+    and whenever new actuals are written, and serves them to the realtime endpoint.
+    """
+
+    def __init__(self, model_names: List[str], refresh_delay_seconds: float = FORECAST_REFRESH_DELAY_SECONDS):
+        self.model_names = model_names
+        self.refresh_delay_seconds = refresh_delay_seconds
+        # Latest precomputed result: key (date, hour, flags), the served version of each model
+        # it was computed with and the realtime forecast payload
+        self._key: Optional[Tuple[str, int, Tuple[int, int, int]]] = None
+        self._versions: Dict[str, Optional[str]] = {}
+        self._result: Optional[Dict[str, Any]] = None
+        self._computed_at: Optional[str] = None
+        self._refresh_requested = asyncio.Event()
+        self._task: Optional[asyncio.Task] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+
+    def start(self) -> None:
+        """Start the scheduling loop on the running event loop"""
+        if not self.model_names:
+            logger.info("No production models configured, realtime forecast scheduler disabled")
+            return
+        self._loop = asyncio.get_running_loop()
+        self._task = asyncio.create_task(self._run())
+        logger.info("Realtime forecast scheduler started for models: %s", self.model_names)
+
+    def stop(self) -> None:
+        """Cancel the scheduling loop"""
+        if self._task is not None:
+            self._task.cancel()
+
+    def request_refresh(self) -> None:
+        """
+        Drop the current result and recompute as soon as possible, e.g. after new actuals
+        landed. May be called from worker threads.
+        """
+        self._key = None
+        self._result = None
+        if self._loop is None:
+            return
+        try:
+            on_loop = asyncio.get_running_loop() is self._loop
+        except RuntimeError:
+            on_loop = False
+        if on_loop:
+            self._refresh_requested.set()
+        else:
+            self._loop.call_soon_threadsafe(self._refresh_requested.set)
+
+    async def get_realtime_forecast(
+        self,
+        custom_names: List[str],
+        date: str,
+        holiday: int = 0,
+        holiday_type: int = 0,
+        nation_event: int = 0,
+        series_id: Optional[str] = None
+    ) -> Dict[str, Any]:
+        """
+        Serve a realtime forecast, using precomputed results where available.
+
+        Models covered by the current precomputed result are returned from memory; only the
+        remaining models are computed on demand with `ModelService.generate_realtime_forecast`.
+
+        Args:
+            custom_names: List of trained model names
+            date: Date string in format 'YYYY-MM-DD' (must be today's date in Dhaka timezone)
+            holiday: Holiday indicator (0 or 1)
+            holiday_type: Type of holiday (default 0)
+            nation_event: National event indicator (default 0)
+            series_id: Load series to forecast, None for the default series. Only the
+                default series is precomputed
+
+        Returns:
+            Dict in the format of `ModelService.generate_realtime_forecast`, with an extra
+            `precomputed_models` list naming the models served from the schedule
+        """
+        result, precomputed = self._precomputed_for(custom_names, date, holiday, holiday_type, nation_event, series_id)
+        to_compute = [name for name in custom_names if name not in precomputed]
+
+        if not to_compute:
+            logger.info("Serving precomputed realtime forecast for %s (computed at %s)", custom_names, self._computed_at)
+            return {
+                "current_hour": result["current_hour"],
+                "historical_actual": result["historical_actual"],
+                "historical_forecasted": result["historical_forecasted"],
+                "model_forecasts": [precomputed[name] for name in custom_names],
+                "precomputed_models": list(custom_names)
+            }
+
+        logger.info("Computing realtime forecast on demand for %s, precomputed: %s", to_compute, list(precomputed))
+        computed = await ModelService.generate_realtime_forecast(
+            to_compute, date, holiday, holiday_type, nation_event, series_id
+        )
+        computed_by_name = {model["custom_name"]: model for model in computed["model_forecasts"]}
+        computed["model_forecasts"] = [
+            precomputed[name] if name in precomputed else computed_by_name[name]
+            for name in custom_names
+        ]
+        computed["precomputed_models"] = list(precomputed)
+        return computed
+
+    async def stream_realtime_forecast(
+        self,
+        custom_names: List[str],
+        date: str,
+        holiday: int = 0,
+        holiday_type: int = 0,
+        nation_event: int = 0,
+        series_id: Optional[str] = None
+    ) -> AsyncIterator[Tuple[str, Dict[str, Any]]]:
+        """
+        Streaming variant of `get_realtime_forecast`.
+
+        Precomputed models are yielded immediately, the remaining models as they finish
+        via `ModelService.stream_realtime_forecast`.
+
+        Yields:
+            The events of `ModelService.stream_realtime_forecast`; the summary event carries
+            an extra `precomputed_models` list
+        """
+        started = time.perf_counter()
+        result, precomputed = self._precomputed_for(custom_names, date, holiday, holiday_type, nation_event, series_id)
+        to_compute = [name for name in custom_names if name not in precomputed]
+
+        if to_compute or result is None:
+            logger.info("Streaming realtime forecast on demand for %s, precomputed: %s", to_compute, list(precomputed))
+            events = ModelService.stream_realtime_forecast(to_compute, date, holiday, holiday_type, nation_event, series_id)
+            # The context event also validates the request before anything is sent
+            event, context = await events.__anext__()
+        else:
+            logger.info("Serving precomputed realtime forecast for %s (computed at %s)", custom_names, self._computed_at)
+            events = None
+            event, context = "context", {
+                "current_hour": result["current_hour"],
+                "historical_actual": result["historical_actual"],
+                "historical_forecasted": result["historical_forecasted"]
+            }
+        yield event, context
+
+        for name in precomputed:
+            yield "model", precomputed[name]
+
+        summary = {"completed": [], "failed": []}
+        if events is not None:
+            async for event, data in events:
+                if event == "summary":
+                    summary = data
+                else:
+                    yield event, data
+
+        yield "summary", {
+            "completed": list(precomputed) + summary["completed"],
+            "failed": summary["failed"],
+            "precomputed_models": list(precomputed),
+            "elapsed_seconds": round(time.perf_counter() - started, 3)
+        }
+
+    def _precomputed_for(
+        self,
+        custom_names: List[str],
+        date: str,
+        holiday: int,
+        holiday_type: int,
+        nation_event: int,
+        series_id: Optional[str] = None
+    ) -> Tuple[Optional[Dict[str, Any]], Dict[str, Dict[str, Any]]]:
+        """
+        Return the current precomputed result if it matches the request, and its usable models
+        by name: those whose served version is still the one they were computed with
+        """
+        current_hour = datetime.now(DHAKA_TZ).hour
+        key = (date, current_hour, (holiday, holiday_type, nation_event))
+        is_default_series = normalize_series_id(series_id) == DEFAULT_SERIES_ID
+        result = self._result if is_default_series and self._key == key else None
+
+        precomputed = {}
+        if result is not None:
+            precomputed = {
+                model["custom_name"]: model
+                for model in result["model_forecasts"]
+                if model["custom_name"] in custom_names and "error" not in model
+            }
+            # Models may be retrained or rolled back by another process (worker.py, another
+            # server worker) that cannot reach this scheduler
+            stale = [name for name in precomputed if _served_version(name) != self._versions.get(name)]
+            if stale:
+                logger.info("Precomputed forecasts of %s are from a replaced model version", stale)
+                for name in stale:
+                    del precomputed[name]
+                self._refresh_requested.set()
+        cache_requests.inc(len(precomputed), cache="precomputed_forecast", result="hit")
+        cache_requests.inc(len(custom_names) - len(precomputed), cache="precomputed_forecast", result="miss")
+        return result, precomputed
+
+    async def refresh(self) -> None:
+        """Recompute the realtime forecasts of all production models for the current Dhaka hour"""
+        now = datetime.now(DHAKA_TZ)
+        date = now.strftime('%Y-%m-%d')
+        key = (date, now.hour, DEFAULT_FLAGS)
+
+        logger.info("Precomputing realtime forecasts for %s at %s hour %s", self.model_names, date, now.hour)
+        # Taken before forecasting: a version published meanwhile makes the result stale
+        versions = {name: _served_version(name) for name in self.model_names}
+        result = await ModelService.generate_realtime_forecast(self.model_names, date, *DEFAULT_FLAGS)
+
+        self._key = key
+        self._versions = versions
+        self._result = result
+        self._computed_at = datetime.now(timezone.utc).isoformat()
+        logger.info("Precomputed realtime forecasts stored for %s hour %s", date, now.hour)
+
+    async def _run(self) -> None:
+        """Refresh once at startup, then at the top of every hour or when a refresh is requested"""
+        while True:
+            try:
+                await self.refresh()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error("Scheduled realtime forecast failed: %s", e, exc_info=True)
+
+            try:
+                await asyncio.wait_for(self._refresh_requested.wait(), timeout=self._seconds_until_next_run())
+                logger.info("Realtime forecast refresh requested")
+            except asyncio.TimeoutError:
+                pass
+            self._refresh_requested.clear()
+
+    def _seconds_until_next_run(self) -> float:
+        """Seconds until the next top of the hour plus the configured delay for actuals to land"""
+        now = datetime.now(DHAKA_TZ)
+        next_run = now.replace(minute=0, second=0, microsecond=0) + timedelta(hours=1, seconds=self.refresh_delay_seconds)
+        return (next_run - now).total_seconds()
+
+
+def _served_version(custom_name: str) -> Optional[str]:
+    """Served version of a model, None if it has none"""
+    try:
+        return served_version_key(custom_name)
+    except FileNotFoundError:
+        return None
+
+
+# Create a singleton instance
+forecast_scheduler = ForecastScheduler(PRODUCTION_MODELS)
@@ -0,0 +1,230 @@
+"""Durable SQLite queue of training and forecast jobs executed by worker processes (see worker.py)"""
+import json
+import logging
+import os
+import sqlite3
+import time
+import uuid
+from contextlib import closing
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+# Queue database shared by the web processes and the workers; must be on a local disk
+JOB_QUEUE_DB = Path(os.getenv("JOB_QUEUE_DB", "jobs/job_queue.db"))
+# A running job whose worker has not sent a heartbeat for this long is considered lost
+JOB_HEARTBEAT_TIMEOUT_SECONDS = float(os.getenv("JOB_HEARTBEAT_TIMEOUT_SECONDS", "120"))
+# Number of times a lost job is handed to a worker before it is marked failed
+JOB_MAX_ATTEMPTS = int(os.getenv("JOB_MAX_ATTEMPTS", "3"))
+
+# Required and optional payload fields of each job kind; the fields are the
+# keyword arguments of the ModelService method the job runs
+JOB_KINDS = {
+    "train": (
+        ("model", "custom_name", "training_data_start_date", "training_data_end_date", "hyperparams_dict"),
+        ("series_id", "training_profile"),
+    ),
+    "backtest": (("custom_names", "date"), ("series_id",)),
+    "realtime": (("custom_names", "date"), ("holiday", "holiday_type", "nation_event", "series_id")),
+}
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    job_id TEXT PRIMARY KEY,
+    kind TEXT NOT NULL,
+    payload TEXT NOT NULL,
+    status TEXT NOT NULL,
+    result TEXT,
+    error TEXT,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    worker_id TEXT,
+    submitted_at TEXT NOT NULL,
+    started_at TEXT,
+    finished_at TEXT,
+    heartbeat_at REAL
+);
+CREATE INDEX IF NOT EXISTS jobs_status_submitted ON jobs (status, submitted_at);
+"""
+
+
+def _connect() -> sqlite3.Connection:
+    """Open a connection to the queue database, creating it on first use"""
+    JOB_QUEUE_DB.parent.mkdir(parents=True, exist_ok=True)
+    connection = sqlite3.connect(JOB_QUEUE_DB, timeout=30, isolation_level=None)
+    connection.row_factory = sqlite3.Row
+    # WAL lets the web processes read job status while a worker writes
+    connection.execute("PRAGMA journal_mode=WAL")
+    connection.executescript(_SCHEMA)
+    return connection
+
+
+def _now() -> str:
+    return datetime.now(timezone.utc).isoformat()
+
+
+def _to_job(row: sqlite3.Row) -> Dict[str, Any]:
+    """Convert a jobs row to the status dict returned by the API"""
+    job = dict(row)
+    job["payload"] = json.loads(job["payload"])
+    job["result"] = json.loads(job["result"]) if job["result"] is not None else None
+    del job["heartbeat_at"]
+    return job
+
+
+def enqueue_job(kind: str, payload: Dict[str, Any]) -> str:
+    """
+    Validate a job and add it to the queue.
+
+    Args:
+        kind: One of JOB_KINDS ('train', 'backtest' or 'realtime')
+        payload: Keyword arguments of the ModelService method the job runs
+
+    Returns:
+        Id of the queued job
+
+    Raises:
+        ValueError: If the kind is unknown or the payload misses or has unknown fields
+    """
+    if kind not in JOB_KINDS:
+        raise ValueError(f"Unknown job kind '{kind}', expected one of: {', '.join(JOB_KINDS)}")
+    required, optional = JOB_KINDS[kind]
+    missing = [field for field in required if payload.get(field) in (None, "", [])]
+    if missing:
+        raise ValueError(f"Missing {kind} job fields: {', '.join(missing)}")
+    unknown = set(payload) - set(required) - set(optional)
+    if unknown:
+        raise ValueError(f"Unknown {kind} job fields: {', '.join(sorted(unknown))}")
+
+    job_id = uuid.uuid4().hex
+    with closing(_connect()) as connection:
+        connection.execute(
+            "INSERT INTO jobs (job_id, kind, payload, status, submitted_at) VALUES (?, ?, ?, 'pending', ?)",
+            (job_id, kind, json.dumps(payload), _now()),
+        )
+    logger.info("Queued %s job %s", kind, job_id)
+    return job_id
+
+
+def get_job(job_id: str) -> Optional[Dict[str, Any]]:
+    """Return the status (and result once completed) of a job, or None if it is unknown"""
+    with closing(_connect()) as connection:
+        row = connection.execute("SELECT * FROM jobs WHERE job_id = ?", (job_id,)).fetchone()
+    return _to_job(row) if row is not None else None
+
+
+def list_jobs(status: Optional[str] = None, limit: int = 50) -> List[Dict[str, Any]]:
+    """Most recently submitted jobs, optionally only those with the given status"""
+    query = "SELECT * FROM jobs"
+    params: List[Any] = []
+    if status:
+        query += " WHERE status = ?"
+        params.append(status)
+    query += " ORDER BY submitted_at DESC LIMIT ?"
+    params.append(limit)
+    with closing(_connect()) as connection:
+        return [_to_job(row) for row in connection.execute(query, params).fetchall()]
+
+
+def claim_next_job(worker_id: str) -> Optional[Dict[str, Any]]:
+    """
+    Atomically take the oldest pending job for a worker.
+
+    The write transaction makes concurrent worker processes claim different jobs.
+
+    Returns:
+        The claimed job, or None if the queue is empty
+    """
+    with closing(_connect()) as connection:
+        connection.execute("BEGIN IMMEDIATE")
+        try:
+            row = connection.execute(
+                "SELECT * FROM jobs WHERE status = 'pending' ORDER BY submitted_at LIMIT 1"
+            ).fetchone()
+            if row is None:
+                connection.execute("COMMIT")
+                return None
+            connection.execute(
+                "UPDATE jobs SET status = 'running', worker_id = ?, attempts = attempts + 1, "
+                "started_at = ?, heartbeat_at = ? WHERE job_id = ?",
+                (worker_id, _now(), time.time(), row["job_id"]),
+            )
+            connection.execute("COMMIT")
+        except BaseException:
+            connection.execute("ROLLBACK")
+            raise
+    job = _to_job(row)
+    job.update(status="running", worker_id=worker_id, attempts=job["attempts"] + 1)
+    return job
+
+
+def heartbeat(job_id: str, worker_id: str) -> bool:
+    """
+    Record that the worker running a job is still alive
+
+    Returns:
+        False if the job is no longer running on this worker (requeued or finished)
+    """
+    with closing(_connect()) as connection:
+        return connection.execute(
+            "UPDATE jobs SET heartbeat_at = ? WHERE job_id = ? AND worker_id = ? AND status = 'running'",
+            (time.time(), job_id, worker_id),
+        ).rowcount > 0
+
+
+def complete_job(job_id: str, worker_id: str, result: Any) -> bool:
+    """
+    Store the result of a finished job
+
+    Returns:
+        False if the job is no longer running on this worker; its result is then discarded
+    """
+    with closing(_connect()) as connection:
+        return connection.execute(
+            "UPDATE jobs SET status = 'completed', result = ?, finished_at = ? "
+            "WHERE job_id = ? AND worker_id = ? AND status = 'running'",
+            (json.dumps(result), _now(), job_id, worker_id),
+        ).rowcount > 0
+
+
+def fail_job(job_id: str, worker_id: str, error: str) -> bool:
+    """
+    Mark a job failed with the given error message
+
+    Returns:
+        False if the job is no longer running on this worker; it is then left as it is
+    """
+    with closing(_connect()) as connection:
+        return connection.execute(
+            "UPDATE jobs SET status = 'failed', error = ?, finished_at = ? "
+            "WHERE job_id = ? AND worker_id = ? AND status = 'running'",
+            (error, _now(), job_id, worker_id),
+        ).rowcount > 0
+
+
+def requeue_stale_jobs(timeout_seconds: float = JOB_HEARTBEAT_TIMEOUT_SECONDS) -> int:
+    """
+    Hand running jobs of crashed workers back to the queue.
+
+    Jobs that already used up JOB_MAX_ATTEMPTS are marked failed instead.
+
+    Returns:
+        Number of jobs requeued or failed
+    """
+    cutoff = time.time() - timeout_seconds
+    with closing(_connect()) as connection:
+        connection.execute("BEGIN IMMEDIATE")
+        failed = connection.execute(
+            "UPDATE jobs SET status = 'failed', error = 'Worker lost too many times', finished_at = ? "
+            "WHERE status = 'running' AND heartbeat_at < ? AND attempts >= ?",
+            (_now(), cutoff, JOB_MAX_ATTEMPTS),
+        ).rowcount
+        requeued = connection.execute(
+            "UPDATE jobs SET status = 'pending', worker_id = NULL WHERE status = 'running' AND heartbeat_at < ?",
+            (cutoff,),
+        ).rowcount
+        connection.execute("COMMIT")
+    if failed or requeued:
+        logger.warning("Requeued %s and failed %s jobs of lost workers", requeued, failed)
+    return failed + requeued
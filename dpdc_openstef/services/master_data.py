@@ -0,0 +1,336 @@
+"""Access helpers for the master load/weather dataset"""
+import hashlib
+import json
+import logging
+import os
+import re
+import shutil
+import threading
+import uuid
+from collections import OrderedDict
+from pathlib import Path
+from typing import List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from services.metrics import cache_requests
+
+logger = logging.getLogger(__name__)
+
+# Copy-on-write lets per-request frames share the cached master data: slices and column
+# replacements are views until something writes to them (always on from pandas 3).
+# The option is global on pandas 2: it also applies inside openstef, whose training and
+# forecast pipelines (openstef 3.4, pandas 2.2) give identical results with it on. It
+# cannot be scoped to this module: openstef writing to a returned view outside the scope
+# would write through to the shared cache.
+if int(pd.__version__.split('.')[0]) < 3:
+    pd.options.mode.copy_on_write = True
+
+MASTER_DATA_PATH = Path("static/master_data_with_forecasted.csv")
+
+# Load series (feeders, substations) besides the system-wide series in MASTER_DATA_PATH.
+# Each series is one CSV in the master layout: static/series/<series_id>.csv
+DEFAULT_SERIES_ID = "dpdc"
+SERIES_DATA_DIR = Path("static/series")
+_SERIES_ID_PATTERN = re.compile(r"^[A-Za-z0-9_-]{1,64}$")
+
+# Column order of the master CSV file
+MASTER_COLUMNS = [
+    "load", "is_holiday", "holiday_type", "national_event_type",
+    "temp", "dwpt", "rhum", "prcp", "wdir", "wspd", "pres", "coco",
+    "forecasted_load",
+]
+
+# The parsed master data is published as one memory-mapped .npy file per column, so the
+# worker processes of one server (uvicorn --workers N) share a single copy in the page
+# cache instead of each holding its own parsed frame. Set MASTER_DATA_MMAP=0 to disable.
+MASTER_DATA_MMAP = os.getenv("MASTER_DATA_MMAP", "1") == "1"
+SHARED_DATA_DIR = Path(os.getenv("SHARED_DATA_DIR", "cache/master_data"))
+
+# Parsed data files kept in memory at once, least recently used first out; batch jobs
+# read one file per series
+MASTER_DATA_CACHE_SIZE = int(os.getenv("MASTER_DATA_CACHE_SIZE", "8"))
+
+# Serialises read-modify-write cycles on the master CSV (data input, weather backfill)
+master_data_lock = threading.RLock()
+
+# Parsed data shared by all requests, keyed by file path: ((mtime_ns, size) of the parsed file, frame)
+_cache_lock = threading.Lock()
+_cache: "OrderedDict[str, Tuple[Tuple[int, int], pd.DataFrame]]" = OrderedDict()
+
+
+def normalize_series_id(series_id: Optional[str]) -> str:
+    """
+    Return the series id to use for a request, DEFAULT_SERIES_ID if none was given
+
+    Raises:
+        ValueError: If the id contains anything but letters, digits, '_' and '-'
+    """
+    series_id = (series_id or "").strip() or DEFAULT_SERIES_ID
+    if not _SERIES_ID_PATTERN.match(series_id):
+        raise ValueError(f"Invalid series id '{series_id}': use up to 64 letters, digits, '_' or '-'")
+    return series_id
+
+
+def series_data_path(series_id: Optional[str] = None) -> Path:
+    """
+    Path of the master data file of a series
+
+    Args:
+        series_id: Series id, None for the default series
+
+    Returns:
+        MASTER_DATA_PATH for the default series, SERIES_DATA_DIR/<series_id>.csv otherwise
+
+    Raises:
+        ValueError: If the series id is invalid
+    """
+    series_id = normalize_series_id(series_id)
+    if series_id == DEFAULT_SERIES_ID:
+        return MASTER_DATA_PATH
+    return SERIES_DATA_DIR / f"{series_id}.csv"
+
+
+def list_series() -> List[str]:
+    """Ids of all series with a data file, the default series first"""
+    series = [DEFAULT_SERIES_ID] if MASTER_DATA_PATH.exists() else []
+    if SERIES_DATA_DIR.is_dir():
+        series.extend(sorted(
+            path.stem for path in SERIES_DATA_DIR.glob("*.csv")
+            if _SERIES_ID_PATTERN.match(path.stem) and path.stem != DEFAULT_SERIES_ID
+        ))
+    return series
+
+
+def read_master_data(path: Path = MASTER_DATA_PATH) -> pd.DataFrame:
+    """
+    Read the master dataset indexed by its UTC `date_time` column
+
+    Args:
+        path: Path to the master CSV file
+
+    Returns:
+        DataFrame indexed by timezone-aware timestamps
+    """
+    return pd.read_csv(path, index_col=0, parse_dates=True)
+
+
+def write_master_data(df: pd.DataFrame, path: Path = MASTER_DATA_PATH) -> None:
+    """
+    Atomically replace the master CSV with the given frame.
+
+    The frame is written to a temporary file next to the target and moved into
+    place, so readers never observe a half-written file.
+
+    Args:
+        df: DataFrame indexed by timestamp in the master column layout
+        path: Path to the master CSV file
+    """
+    path = Path(path)
+    tmp_path = path.with_suffix(path.suffix + ".tmp")
+    df.to_csv(tmp_path, index_label="date_time")
+    os.replace(tmp_path, path)
+    logger.info("Master data written to %s (%s rows)", path, len(df))
+
+
+def update_master_rows(master: pd.DataFrame, rows: pd.DataFrame) -> None:
+    """
+    Overwrite the values of existing rows of a master frame in place.
+
+    Columns parsed as integers (e.g. `dwpt`, `rhum` or the holiday flags) stay integer
+    while all new values are whole numbers and are converted to float otherwise: pandas 3
+    refuses to store floats in an int64 column and pandas 2 upcasts it with a warning.
+
+    Args:
+        master: Frame to update
+        rows: New values, indexed by timestamps present in `master`, with a subset of its columns
+    """
+    for column in rows.columns:
+        values = pd.to_numeric(rows[column])
+        if pd.api.types.is_integer_dtype(master[column].dtype):
+            if values.notna().all() and (values == values.round()).all():
+                values = values.astype(master[column].dtype)
+            else:
+                master[column] = master[column].astype(float)
+        master.loc[rows.index, column] = values.to_numpy()
+
+
+def get_master_data(path: Path = MASTER_DATA_PATH) -> pd.DataFrame:
+    """
+    Return the prepared master dataset, parsing the CSV only when it changed on disk.
+
+    The frame is de-duplicated (first row per timestamp kept), stripped of NaT index
+    values and sorted once at load time. It is shared between requests and must be
+    treated as read-only; derive request frames with `prepare_forecast_input`. The
+    MASTER_DATA_CACHE_SIZE most recently used files stay parsed.
+
+    With MASTER_DATA_MMAP enabled the first process to load a version publishes it to
+    SHARED_DATA_DIR and every process attaches to the memory-mapped columns, so the
+    CSV is parsed once per version for all workers.
+
+    Args:
+        path: Path to the master CSV file
+
+    Returns:
+        DataFrame indexed by unique, sorted, timezone-aware timestamps
+    """
+    key = os.path.abspath(path)
+    version = get_master_data_version(path)
+    with _cache_lock:
+        cached = _cache.get(key)
+        if cached is not None and cached[0] == version:
+            cache_requests.inc(cache="master_data", result="hit")
+            _cache.move_to_end(key)
+            return cached[1]
+
+        cache_requests.inc(cache="master_data", result="miss")
+        frame = _load_shared(path, version) if MASTER_DATA_MMAP else _parse_master_data(path)
+
+        _cache[key] = (version, frame)
+        _cache.move_to_end(key)
+        while len(_cache) > max(1, MASTER_DATA_CACHE_SIZE):
+            _cache.popitem(last=False)
+        logger.info("Master data loaded from %s (%s rows)", path, len(frame))
+        return frame
+
+
+def _parse_master_data(path: Path) -> pd.DataFrame:
+    """Parse the master CSV and de-duplicate, clean and sort its index"""
+    frame = read_master_data(path)
+    frame = frame[frame.index.notna() & ~frame.index.duplicated(keep='first')]
+    if not frame.index.is_monotonic_increasing:
+        frame = frame.sort_index()
+    return frame
+
+
+def _shared_data_dir(path: Path, version: Tuple[int, int]) -> Path:
+    """Directory of the published columns of one version of a data file"""
+    source = hashlib.sha1(os.path.abspath(path).encode()).hexdigest()[:12]
+    return SHARED_DATA_DIR / f"{Path(path).stem}-{source}" / f"{version[0]}-{version[1]}"
+
+
+def _load_shared(path: Path, version: Tuple[int, int]) -> pd.DataFrame:
+    """
+    Attach to the published columns of a data file version, publishing them first if no
+    process has yet. Falls back to the parsed frame if the columns cannot be published.
+    """
+    directory = _shared_data_dir(path, version)
+    if (directory / "meta.json").exists():
+        cache_requests.inc(cache="shared_master_data", result="hit")
+    else:
+        cache_requests.inc(cache="shared_master_data", result="miss")
+        frame = _parse_master_data(path)
+        try:
+            _publish_columns(frame, directory)
+        except (OSError, ValueError, TypeError) as e:
+            logger.warning("Could not publish shared master data to %s: %s", directory, e)
+            return frame
+    return _attach_columns(directory)
+
+
+def _publish_columns(frame: pd.DataFrame, directory: Path) -> None:
+    """
+    Write a frame as one .npy file per column and publish it atomically.
+
+    The files are written to a private temporary directory which is renamed to
+    `directory`; if another process published the same version first, its copy is kept.
+    Older versions of the same file are removed (processes that still map them keep
+    their mapping on POSIX; on Windows the removal is retried on the next publish).
+    """
+    if not isinstance(frame.index, pd.DatetimeIndex):
+        raise ValueError("the index is not a datetime index")
+
+    tmp_dir = directory.parent / f".{directory.name}.{os.getpid()}.{uuid.uuid4().hex}.tmp"
+    tmp_dir.mkdir(parents=True)
+    try:
+        index = frame.index
+        tz = str(index.tz) if index.tz is not None else None
+        if tz is not None:
+            index = index.tz_convert("UTC").tz_localize(None)
+        np.save(tmp_dir / "index.npy", index.to_numpy())
+
+        # Numeric columns are memory-mapped; anything else (rare) is pickled and loaded normally
+        mapped = [
+            column for column in frame.columns
+            if isinstance(frame[column].dtype, np.dtype) and frame[column].dtype.kind in "biuf"
+        ]
+        for position, column in enumerate(mapped):
+            np.save(tmp_dir / f"{position}.npy", frame[column].to_numpy())
+        others = [column for column in frame.columns if column not in mapped]
+        if others:
+            frame[others].to_pickle(tmp_dir / "others.pkl")
+
+        meta = {"columns": list(frame.columns), "mapped": mapped, "index_name": frame.index.name, "tz": tz}
+        with open(tmp_dir / "meta.json", "w") as file:
+            json.dump(meta, file)
+
+        try:
+            os.rename(tmp_dir, directory)
+        except OSError:
+            if not (directory / "meta.json").exists():
+                raise
+            shutil.rmtree(tmp_dir, ignore_errors=True)
+            return
+    except BaseException:
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+        raise
+
+    logger.info("Master data published to %s (%s rows)", directory, len(frame))
+    for stale in directory.parent.iterdir():
+        if stale.name != directory.name and not stale.name.startswith("."):
+            shutil.rmtree(stale, ignore_errors=True)
+
+
+def _attach_columns(directory: Path) -> pd.DataFrame:
+    """Build a frame on the memory-mapped columns of a published version without copying them"""
+    with open(directory / "meta.json") as file:
+        meta = json.load(file)
+
+    index = pd.DatetimeIndex(np.load(directory / "index.npy"), name=meta["index_name"])
+    if meta["tz"] is not None:
+        index = index.tz_localize("UTC").tz_convert(meta["tz"])
+
+    arrays = {
+        # Plain ndarray views on the mappings; the memmap subclass would leak into results
+        column: np.load(directory / f"{position}.npy", mmap_mode="r").view(np.ndarray)
+        for position, column in enumerate(meta["mapped"])
+    }
+    if len(arrays) < len(meta["columns"]):
+        others = pd.read_pickle(directory / "others.pkl")
+        arrays.update({column: others[column].to_numpy() for column in others.columns})
+
+    frame = pd.DataFrame({column: arrays[column] for column in meta["columns"]}, index=index, copy=False)
+    logger.info("Master data attached from %s (%s rows)", directory, len(frame))
+    return frame
+
+
+def get_master_data_version(path: Path = MASTER_DATA_PATH) -> Tuple[int, int]:
+    """Return the (mtime_ns, size) version of the data file, which changes on every write"""
+    stat = os.stat(path)
+    return (stat.st_mtime_ns, stat.st_size)
+
+
+def prepare_forecast_input(
+    data: pd.DataFrame,
+    forecast_index: pd.Index,
+    until: Optional[pd.Timestamp] = None
+) -> pd.DataFrame:
+    """
+    Derive the input frame of a forecast from the shared master data without copying it.
+
+    The rows up to `until` are taken as a slice and only the `load` column is
+    materialised again, with NaN on the hours to forecast. All other columns stay
+    views on `data` thanks to copy-on-write.
+
+    Args:
+        data: Prepared master data (see `get_master_data`)
+        forecast_index: Timestamps whose load is cleared for forecasting
+        until: Last timestamp to keep, None to keep all rows
+
+    Returns:
+        DataFrame to pass to the forecast pipeline
+    """
+    frame = data.loc[:until] if until is not None else data
+    masked_load = frame['load'].mask(frame.index.isin(forecast_index))
+    return frame.assign(load=masked_load)
@@ -0,0 +1,306 @@
+"""Memory admission control of model trainings and forecasts"""
+import json
+import logging
+import os
+import threading
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Dict, Iterator, Optional, Set
+
+from services.metrics import Counter, Gauge
+
+logger = logging.getLogger(__name__)
+
+# Caps the memory below the detected limit, e.g. when other processes share the container
+MEMORY_LIMIT_MB = os.getenv("MEMORY_LIMIT_MB")
+
+# Share of the memory limit running jobs may reserve; the rest is left to the app itself
+# (imported libraries, master data, model and weather caches)
+MEMORY_JOB_FRACTION = float(os.getenv("MEMORY_JOB_FRACTION", "0.6"))
+
+# Time a job waits for running jobs to release memory before it is rejected
+MEMORY_ADMISSION_TIMEOUT_SECONDS = float(os.getenv("MEMORY_ADMISSION_TIMEOUT_SECONDS", "120"))
+
+# Measured peak memory of past jobs, scaling the estimates of future ones
+MEMORY_CALIBRATION_FILE = Path(os.getenv("MEMORY_CALIBRATION_FILE", "cache/memory_calibration.json"))
+
+# Columns openstef derives from the input (lags, calendar, holiday and weather features)
+OPENSTEF_FEATURE_COUNT = 90
+# Copies of the feature frame (rows x features, float64) a job holds at its peak, per job
+# and per fitted model; measured with openstef 3.4 on one to three years of hourly data
+FRAME_COPIES = {"training": 5, "forecast": 3}
+MODEL_FRAME_COPIES = {"training": 2, "forecast": 0}
+JOB_OVERHEAD_BYTES = 16 * 2**20
+
+_CGROUP_ROOT = Path("/sys/fs/cgroup")
+# cgroup v1 reports "no limit" as a huge number
+_UNLIMITED_BYTES = 2**60
+_SAMPLE_INTERVAL_SECONDS = 0.2
+# Weight of a new measurement in the calibration factor of its job kind
+_CALIBRATION_WEIGHT = 0.3
+_MAX_CALIBRATION_FACTOR = 4.0
+
+_MB = 2**20
+
+
+class MemoryBudgetExceeded(RuntimeError):
+    """A job does not fit in the memory left for jobs"""
+
+
+def memory_limit() -> int:
+    """
+    Memory in bytes this process may use
+
+    The smallest of the MEMORY_LIMIT_MB setting, the container's cgroup memory limit
+    (v2 `memory.max` or v1 `memory.limit_in_bytes`) and the physical memory.
+    """
+    limits = [os.sysconf("SC_PAGE_SIZE") * os.sysconf("SC_PHYS_PAGES")]
+    cgroup_limit = _cgroup_memory_limit()
+    if cgroup_limit is not None:
+        limits.append(cgroup_limit)
+    if MEMORY_LIMIT_MB:
+        limits.append(int(float(MEMORY_LIMIT_MB) * _MB))
+    return min(limits)
+
+
+def _cgroup_memory_limit() -> Optional[int]:
+    """Memory limit of the container in bytes, None if unlimited or not in a cgroup"""
+    for path in (_CGROUP_ROOT / "memory.max", _CGROUP_ROOT / "memory" / "memory.limit_in_bytes"):
+        try:
+            value = path.read_text().strip()
+        except OSError:
+            continue
+        if value == "max":
+            return None
+        try:
+            limit = int(value)
+        except ValueError:
+            continue
+        return limit if limit < _UNLIMITED_BYTES else None
+    return None
+
+
+def current_rss() -> Optional[int]:
+    """Resident memory of this process in bytes, None where /proc is not available"""
+    try:
+        with open("/proc/self/statm") as file:
+            return int(file.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError):
+        return None
+
+
+class JobMemory:
+    """Estimated and measured memory of one admitted job"""
+
+    def __init__(self, kind: str, estimated_bytes: int, raw_estimate_bytes: int, rss_start: Optional[int]):
+        self.kind = kind
+        self.estimated_bytes = estimated_bytes
+        self.raw_estimate_bytes = raw_estimate_bytes
+        self.rss_start = rss_start
+        self.peak_rss = rss_start
+        # Whether no other job ran meanwhile, so the RSS growth is this job's own
+        self.solo = True
+
+    def observe(self, rss: Optional[int]) -> None:
+        if rss is not None and self.peak_rss is not None:
+            self.peak_rss = max(self.peak_rss, rss)
+
+    @property
+    def peak_growth_bytes(self) -> Optional[int]:
+        """Peak RSS of the process while the job ran above the RSS at its start"""
+        if self.peak_rss is None:
+            return None
+        return self.peak_rss - self.rss_start
+
+    def summary(self) -> Dict[str, Any]:
+        """Estimate and measurement in MB, for training metadata and logs"""
+        return {
+            "estimated_mb": round(self.estimated_bytes / _MB, 1),
+            "peak_rss_mb": round(self.peak_rss / _MB, 1) if self.peak_rss is not None else None,
+            "peak_growth_mb": round(self.peak_growth_bytes / _MB, 1) if self.peak_rss is not None else None,
+            "ran_alone": self.solo,
+        }
+
+
+class MemoryBudget:
+    """
+    Admits jobs while their estimated memory fits in a fixed budget
+
+    A job's memory is estimated from the rows and columns of its input and its number
+    of models, scaled by a per-kind calibration factor. A job that fits waits (up to
+    MEMORY_ADMISSION_TIMEOUT_SECONDS) until running jobs have released enough of the
+    budget; a job larger than the whole budget, or still waiting after the timeout, is
+    rejected with `MemoryBudgetExceeded`. While jobs run, the process RSS is sampled;
+    the peak growth of jobs that ran alone (after the first of their kind, which also
+    loads the libraries) calibrates the estimates of later jobs.
+    """
+
+    def __init__(self, total: int, calibration_file: Path = MEMORY_CALIBRATION_FILE):
+        self.total = total
+        self.calibration_file = calibration_file
+        self._reserved = 0
+        self._waiting = 0
+        self._active: Set[JobMemory] = set()
+        self._condition = threading.Condition()
+        self._sampler: Optional[threading.Thread] = None
+        self._factors = self._load_factors()
+        self._calibration_seen: Set[str] = set()
+
+    @property
+    def reserved(self) -> int:
+        """Bytes reserved by running jobs"""
+        return self._reserved
+
+    @property
+    def waiting(self) -> int:
+        """Jobs waiting for memory"""
+        return self._waiting
+
+    @contextmanager
+    def admit(
+        self,
+        kind: str,
+        rows: int,
+        features: int,
+        models: int = 1,
+        timeout: float = MEMORY_ADMISSION_TIMEOUT_SECONDS
+    ) -> Iterator[JobMemory]:
+        """
+        Reserve the estimated memory of a job for as long as it runs
+
+        Args:
+            kind: Kind of job ('training' or 'forecast')
+            rows: Rows of the job's input data
+            features: Columns of the job's input data
+            models: Number of models the job fits
+            timeout: Seconds to wait for memory before rejecting the job
+
+        Yields:
+            The job's `JobMemory`; its measurement is complete once the block has exited
+
+        Raises:
+            MemoryBudgetExceeded: If the job is larger than the budget or no memory was
+                released in time
+        """
+        raw_estimate = _raw_estimate(kind, rows, features, models)
+        estimate = int(raw_estimate * self._factors.get(kind, 1.0))
+        size = f"{rows} rows x {features} columns x {models} model(s)"
+        if estimate > self.total:
+            memory_admission_rejections.inc(kind=kind)
+            raise MemoryBudgetExceeded(
+                f"The {kind} job needs an estimated {estimate / _MB:.0f} MB of memory ({size}), more than "
+                f"the {self.total / _MB:.0f} MB available to jobs; use a shorter date range or fewer models"
+            )
+
+        with self._condition:
+            self._waiting += 1
+            try:
+                if not self._condition.wait_for(lambda: self._reserved + estimate <= self.total, timeout):
+                    memory_admission_rejections.inc(kind=kind)
+                    raise MemoryBudgetExceeded(
+                        f"Not enough memory for the {kind} job: it needs an estimated {estimate / _MB:.0f} MB "
+                        f"({size}), but running jobs hold {self._reserved / _MB:.0f} of the "
+                        f"{self.total / _MB:.0f} MB available to jobs; retry later"
+                    )
+            finally:
+                self._waiting -= 1
+            job = JobMemory(kind, estimate, raw_estimate, current_rss())
+            if self._active:
+                job.solo = False
+                for other in self._active:
+                    other.solo = False
+            self._active.add(job)
+            self._reserved += estimate
+            if self._sampler is None and job.rss_start is not None:
+                self._sampler = threading.Thread(target=self._sample, name="memory-sampler", daemon=True)
+                self._sampler.start()
+
+        try:
+            yield job
+        finally:
+            job.observe(current_rss())
+            with self._condition:
+                self._active.discard(job)
+                self._reserved -= estimate
+                self._condition.notify_all()
+            logger.info(
+                "%s job: estimated %.0f MB, peak RSS %s MB", kind.capitalize(), estimate / _MB,
+                job.summary()["peak_rss_mb"],
+            )
+            self._calibrate(job)
+
+    def _sample(self) -> None:
+        """Record the process RSS as peak of all running jobs until none is left"""
+        while True:
+            rss = current_rss()
+            with self._condition:
+                if not self._active:
+                    self._sampler = None
+                    return
+                for job in self._active:
+                    job.observe(rss)
+            time.sleep(_SAMPLE_INTERVAL_SECONDS)
+
+    def _calibrate(self, job: JobMemory) -> None:
+        """Move the factor of the job's kind towards its measured / estimated memory"""
+        # With other jobs running the growth is not this job's alone
+        if not job.solo or job.peak_growth_bytes is None:
+            return
+        # The first job of a kind also imports openstef and the model libraries
+        if job.kind not in self._calibration_seen:
+            self._calibration_seen.add(job.kind)
+            return
+        ratio = job.peak_growth_bytes / job.raw_estimate_bytes
+        with self._condition:
+            factor = (1 - _CALIBRATION_WEIGHT) * self._factors.get(job.kind, 1.0) + _CALIBRATION_WEIGHT * ratio
+            # Memory freed by earlier jobs is reused without growing the RSS, so small
+            # measurements do not prove a job needs less than the base estimate
+            self._factors[job.kind] = min(_MAX_CALIBRATION_FACTOR, max(1.0, factor))
+            factors = dict(self._factors)
+        self._save_factors(factors)
+
+    def _load_factors(self) -> Dict[str, float]:
+        try:
+            with open(self.calibration_file) as file:
+                return {kind: float(factor) for kind, factor in json.load(file).items()}
+        except (OSError, ValueError, AttributeError):
+            return {}
+
+    def _save_factors(self, factors: Dict[str, float]) -> None:
+        try:
+            self.calibration_file.parent.mkdir(parents=True, exist_ok=True)
+            temporary = self.calibration_file.with_suffix(f".{os.getpid()}.tmp")
+            with open(temporary, "w") as file:
+                json.dump(factors, file, indent=4)
+            # Atomic, as worker processes share the file
+            os.replace(temporary, self.calibration_file)
+        except OSError as e:
+            logger.warning("Could not save the memory calibration to %s: %s", self.calibration_file, e)
+
+
+def _raw_estimate(kind: str, rows: int, features: int, models: int) -> int:
+    """Uncalibrated memory estimate of a job in bytes"""
+    frame_bytes = rows * (features + OPENSTEF_FEATURE_COUNT) * 8
+    copies = FRAME_COPIES.get(kind, FRAME_COPIES["training"]) + MODEL_FRAME_COPIES.get(kind, 0) * models
+    return JOB_OVERHEAD_BYTES + frame_bytes * copies
+
+
+memory_budget = MemoryBudget(int(memory_limit() * MEMORY_JOB_FRACTION))
+
+memory_admission_rejections = Counter(
+    "memory_admission_rejections_total",
+    "Jobs rejected because their estimated memory did not fit in the job memory budget",
+    ["kind"],
+)
+Gauge("memory_budget_bytes", "Memory available to model trainings and forecasts", callback=lambda: memory_budget.total)
+Gauge(
+    "memory_budget_reserved_bytes",
+    "Estimated memory of the trainings and forecasts currently running",
+    callback=lambda: memory_budget.reserved,
+)
+Gauge(
+    "memory_admission_waiting",
+    "Jobs waiting for the memory of running jobs to be released",
+    callback=lambda: memory_budget.waiting,
+)
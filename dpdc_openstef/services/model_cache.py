@@ -0,0 +1,155 @@
+"""In-memory cache of deserialized forecast models"""
+import logging
+import pickle
+import threading
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+from services.metrics import cache_requests, forecast_stage_seconds
+from services.model_store import MODEL_FILE, PARENT_DIR, served_version_key, version_dir
+from services.worker_pool import FORECAST_THREADS
+
+logger = logging.getLogger(__name__)
+
+# Loaded models keyed by name: (served version, (pj, model, model_specs))
+_cache: Dict[str, Tuple[Tuple[int, int], Tuple[Any, Any, Any]]] = {}
+_cache_lock = threading.Lock()
+# One lock per model name so different models load in parallel but each only once
+_load_locks: Dict[str, threading.Lock] = {}
+# Native boosters keyed by name: (served version, model or None if the version has no export)
+_native_cache: Dict[str, Tuple[str, Any]] = {}
+
+
+def get_model(custom_name: str) -> Tuple[Any, Any, Any]:
+    """
+    Return the prediction job, model and model specs of a trained model, loading it on first use.
+
+    The model is loaded from the MLflow tracking directory of its served version the
+    same way `create_forecast_pipeline` does, and kept in memory until another version
+    is published or `invalidate_model` is called. Forecasts that already hold the
+    previous version finish with it. Cached models are shared between threads and must
+    only be used for prediction.
+
+    Args:
+        custom_name: Name of the trained model
+
+    Returns:
+        Tuple of (pj, model, model_specs)
+
+    Raises:
+        FileNotFoundError: If the model has not been trained
+    """
+    version = served_version_key(custom_name)
+
+    cached = _cache.get(custom_name)
+    if cached is not None and cached[0] == version:
+        cache_requests.inc(cache="model", result="hit")
+        return cached[1]
+
+    cache_requests.inc(cache="model", result="miss")
+    with _cache_lock:
+        load_lock = _load_locks.setdefault(custom_name, threading.Lock())
+
+    with load_lock:
+        # Another thread may have loaded it while we waited
+        cached = _cache.get(custom_name)
+        if cached is not None and cached[0] == version:
+            return cached[1]
+
+        with forecast_stage_seconds.time(stage="model_load"):
+            loaded = _load_model(custom_name, version)
+        _cache[custom_name] = (version, loaded)
+        return loaded
+
+
+def get_native_model(custom_name: str) -> Optional[Any]:
+    """
+    Return the natively exported booster of a trained model, loading it on first use.
+
+    Cached like `get_model`; versions without a native export are remembered as None so
+    that their forecasts go straight to the MLflow model.
+
+    Args:
+        custom_name: Name of the trained model
+
+    Returns:
+        The `NativeModel`, or None if the served version has no native export
+
+    Raises:
+        FileNotFoundError: If the model has not been trained
+    """
+    from services.native_model import load_native_model
+
+    version = served_version_key(custom_name)
+
+    cached = _native_cache.get(custom_name)
+    if cached is not None and cached[0] == version:
+        cache_requests.inc(cache="native_model", result="hit")
+        return cached[1]
+
+    cache_requests.inc(cache="native_model", result="miss")
+    with _cache_lock:
+        load_lock = _load_locks.setdefault(custom_name, threading.Lock())
+
+    with load_lock:
+        cached = _native_cache.get(custom_name)
+        if cached is not None and cached[0] == version:
+            return cached[1]
+
+        started = time.perf_counter()
+        with forecast_stage_seconds.time(stage="model_load"):
+            native = load_native_model(version_dir(custom_name, None if version.startswith("legacy-") else version))
+        if native is not None:
+            logger.info(
+                "Native model %s (version %s) loaded in %.3fs", custom_name, version, time.perf_counter() - started
+            )
+        _native_cache[custom_name] = (version, native)
+        return native
+
+
+def invalidate_model(custom_name: str) -> None:
+    """Drop a model from the cache, e.g. after it was retrained"""
+    _native_cache.pop(custom_name, None)
+    if _cache.pop(custom_name, None) is not None:
+        logger.info("Model cache invalidated for %s", custom_name)
+
+
+def cached_models() -> List[str]:
+    """Names of the models currently held in memory"""
+    return list(_cache)
+
+
+def _load_model(custom_name: str, version: str) -> Tuple[Any, Any, Any]:
+    """Deserialize the prediction job and the model (lean pickle or latest MLflow model) of a model version"""
+    from openstef.model.serializer import MLflowSerializer
+
+    started = time.perf_counter()
+    # Legacy version keys stand for the unversioned model directory
+    directory = version_dir(custom_name, None if version.startswith("legacy-") else version)
+    with open(directory / "pj.pkl", "rb") as file:
+        pj = pickle.load(file)
+
+    model_file = directory / MODEL_FILE
+    if model_file.exists():
+        # Trained with the lean profile, without an MLflow store
+        with open(model_file, "rb") as file:
+            model, model_specs = pickle.load(file)
+        # Reported as algorithm_type in forecasts, as for models loaded from MLflow
+        model.path = str(model_file)
+    else:
+        # Same model selection as openstef's create_forecast_pipeline
+        prediction_model_pid = pj["id"]
+        if pj.get("alternative_forecast_model_pid"):
+            prediction_model_pid = pj["alternative_forecast_model_pid"]
+
+        mlflow_tracking_uri = str(directory / "mlflow_trained_models")
+        model, model_specs = MLflowSerializer(mlflow_tracking_uri=mlflow_tracking_uri).load_model(
+            experiment_name=str(prediction_model_pid)
+        )
+
+    # Predict with the forecast share of the CPU budget instead of the threads it trained with
+    if hasattr(model, "get_params") and "n_jobs" in model.get_params():
+        model.set_params(n_jobs=FORECAST_THREADS)
+
+    logger.info("Model %s (version %s) loaded in %.2fs", custom_name, version, time.perf_counter() - started)
+    return pj, model, model_specs
@@ -0,0 +1,229 @@
+"""Indexed SQLite catalogue of trained models for fast, filterable model listings"""
+import json
+import logging
+import os
+import sqlite3
+import threading
+from contextlib import closing
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from services.master_data import DEFAULT_SERIES_ID
+from services.model_store import PARENT_DIR, current_version, trained_model_names, version_dir
+
+logger = logging.getLogger(__name__)
+
+# Catalogue database, next to the models it describes
+MODEL_CATALOG_DB = Path(os.getenv("MODEL_CATALOG_DB", f"{PARENT_DIR}/catalog.db"))
+
+# Columns listings may be sorted by
+SORT_COLUMNS = (
+    "custom_name", "model_type", "series_id", "trained_at", "training_data_start_date",
+    "training_data_end_date", "training_duration_seconds", "artifact_bytes", "score",
+)
+MAX_PAGE_SIZE = 500
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS models (
+    custom_name TEXT PRIMARY KEY,
+    version TEXT,
+    model_type TEXT,
+    series_id TEXT NOT NULL,
+    training_data_start_date TEXT,
+    training_data_end_date TEXT,
+    hyperparameters TEXT,
+    trained_at TEXT,
+    training_duration_seconds REAL,
+    artifact_bytes INTEGER,
+    metrics TEXT,
+    score REAL,
+    updated_at TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS models_type ON models (model_type);
+CREATE INDEX IF NOT EXISTS models_series ON models (series_id);
+CREATE INDEX IF NOT EXISTS models_trained_at ON models (trained_at);
+CREATE INDEX IF NOT EXISTS models_score ON models (score);
+"""
+
+# Whether this process already reconciled the catalogue with trained_models/
+_synced = False
+_sync_lock = threading.Lock()
+
+
+def _connect() -> sqlite3.Connection:
+    """Open a connection to the catalogue, creating it on first use"""
+    MODEL_CATALOG_DB.parent.mkdir(parents=True, exist_ok=True)
+    connection = sqlite3.connect(MODEL_CATALOG_DB, timeout=30, isolation_level=None)
+    connection.row_factory = sqlite3.Row
+    connection.execute("PRAGMA journal_mode=WAL")
+    connection.executescript(_SCHEMA)
+    return connection
+
+
+def record_model(custom_name: str) -> Dict[str, Any]:
+    """
+    Add or update the catalogue entry of a model from its served version on disk.
+
+    Called when a training completes and when another version is served.
+
+    Args:
+        custom_name: Name of the trained model
+
+    Returns:
+        The catalogue entry
+    """
+    directory = version_dir(custom_name)
+    try:
+        with open(directory / "training_metadata.json") as file:
+            metadata = json.load(file)
+    except (OSError, ValueError):
+        # Models trained before metadata was written
+        metadata = {}
+
+    metrics = metadata.get("metrics") or {}
+    entry = {
+        "custom_name": custom_name,
+        "version": current_version(custom_name),
+        "model_type": metadata.get("model"),
+        "series_id": metadata.get("series_id") or DEFAULT_SERIES_ID,
+        "training_data_start_date": metadata.get("training_data_start_date"),
+        "training_data_end_date": metadata.get("training_data_end_date"),
+        "hyperparameters": json.dumps(metadata.get("hyperparameters") or {}),
+        "trained_at": metadata.get("trained_at"),
+        "training_duration_seconds": metadata.get("training_duration_seconds"),
+        "artifact_bytes": _directory_size(directory),
+        "metrics": json.dumps(metrics),
+        # Lower is better; the validation error the models are compared on
+        "score": metrics.get("validation_rmse"),
+        "updated_at": datetime.now(timezone.utc).isoformat(),
+    }
+    with closing(_connect()) as connection:
+        connection.execute(
+            f"INSERT OR REPLACE INTO models ({', '.join(entry)}) VALUES ({', '.join('?' * len(entry))})",
+            list(entry.values()),
+        )
+    logger.info("Model catalogue updated for %s", custom_name)
+    return _to_entry(entry)
+
+
+def remove_model(custom_name: str) -> None:
+    """Drop a model from the catalogue"""
+    with closing(_connect()) as connection:
+        connection.execute("DELETE FROM models WHERE custom_name = ?", (custom_name,))
+
+
+def sync_catalog() -> None:
+    """
+    Reconcile the catalogue with trained_models/: add models it does not know yet and
+    drop models whose directory is gone. Runs once per process, before the first query.
+    """
+    global _synced
+    with _sync_lock:
+        if _synced:
+            return
+        on_disk = set(trained_model_names())
+        with closing(_connect()) as connection:
+            known = {row["custom_name"]: row["version"] for row in connection.execute("SELECT custom_name, version FROM models")}
+        for custom_name in on_disk:
+            if custom_name not in known or known[custom_name] != current_version(custom_name):
+                record_model(custom_name)
+        for custom_name in set(known) - on_disk:
+            remove_model(custom_name)
+        _synced = True
+        logger.info("Model catalogue synchronised: %s models", len(on_disk))
+
+
+def query_models(
+    model_type: Optional[str] = None,
+    series_id: Optional[str] = None,
+    search: Optional[str] = None,
+    trained_after: Optional[str] = None,
+    trained_before: Optional[str] = None,
+    sort: str = "trained_at",
+    order: str = "desc",
+    limit: int = 50,
+    offset: int = 0
+) -> Dict[str, Any]:
+    """
+    Filter, sort and page the catalogue.
+
+    Args:
+        model_type: Only models of this type ('xgb', 'lgb', ...)
+        series_id: Only models trained on this series
+        search: Only models whose name contains this text
+        trained_after: Only models trained at or after this ISO date/time
+        trained_before: Only models trained before this ISO date/time
+        sort: Column to sort by, one of SORT_COLUMNS
+        order: 'asc' or 'desc'
+        limit: Page size, at most MAX_PAGE_SIZE
+        offset: Number of models to skip
+
+    Returns:
+        Dict with the total number of matching models and the entries of the page
+
+    Raises:
+        ValueError: If the sort column, order or paging is invalid
+    """
+    if sort not in SORT_COLUMNS:
+        raise ValueError(f"Cannot sort by '{sort}', expected one of: {', '.join(SORT_COLUMNS)}")
+    if order not in ("asc", "desc"):
+        raise ValueError("Order must be 'asc' or 'desc'")
+    if not 1 <= limit <= MAX_PAGE_SIZE or offset < 0:
+        raise ValueError(f"Limit must be between 1 and {MAX_PAGE_SIZE} and offset non-negative")
+
+    sync_catalog()
+    conditions, params = [], []
+    for column, value in (("model_type", model_type), ("series_id", series_id)):
+        if value:
+            conditions.append(f"{column} = ?")
+            params.append(value)
+    if search:
+        conditions.append("custom_name LIKE ? ESCAPE '\\'")
+        params.append("%" + search.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_") + "%")
+    if trained_after:
+        conditions.append("trained_at >= ?")
+        params.append(trained_after)
+    if trained_before:
+        conditions.append("trained_at < ?")
+        params.append(trained_before)
+    where = f" WHERE {' AND '.join(conditions)}" if conditions else ""
+
+    with closing(_connect()) as connection:
+        total = connection.execute(f"SELECT COUNT(*) FROM models{where}", params).fetchone()[0]
+        # Models without a value (e.g. no score) go last in both orders
+        rows = connection.execute(
+            f"SELECT * FROM models{where} ORDER BY {sort} IS NULL, {sort} {order}, custom_name LIMIT ? OFFSET ?",
+            params + [limit, offset],
+        ).fetchall()
+    return {"total": total, "limit": limit, "offset": offset, "models": [_to_entry(dict(row)) for row in rows]}
+
+
+def model_names(series_id: Optional[str] = None) -> List[str]:
+    """Names of the catalogued models, sorted, optionally only those of one series"""
+    sync_catalog()
+    query, params = "SELECT custom_name FROM models", []
+    if series_id is not None:
+        query += " WHERE series_id = ?"
+        params.append(series_id)
+    with closing(_connect()) as connection:
+        return [row["custom_name"] for row in connection.execute(query + " ORDER BY custom_name", params)]
+
+
+def _to_entry(row: Dict[str, Any]) -> Dict[str, Any]:
+    """Decode the JSON columns of a catalogue row"""
+    row["hyperparameters"] = json.loads(row["hyperparameters"] or "{}")
+    row["metrics"] = json.loads(row["metrics"] or "{}")
+    return row
+
+
+def _directory_size(directory: Path) -> int:
+    """Total size of the files below a directory in bytes"""
+    total = 0
+    for root, _, files in os.walk(directory):
+        for name in files:
+            try:
+                total += os.path.getsize(os.path.join(root, name))
+            except OSError:
+                pass
+    return total
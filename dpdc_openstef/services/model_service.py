@@ -1,4 +1,5 @@
 """Service class for model training and forecasting operations"""
+import asyncio
 import numpy as np
 import pandas as pd
 import pickle
@@ -6,30 +7,77 @@ import os
 import json
 import logging
 import shutil
-from pathlib import Path
-from typing import Dict, Any, List, Optional
-from openstef.data_classes.prediction_job import PredictionJobDataClass
-from openstef.pipeline.train_model import train_model_pipeline
-from openstef.pipeline.create_forecast import create_forecast_pipeline
-from utils.dateutils import create_utc_datetime
+import time
+from typing import Dict, Any, AsyncIterator, Callable, List, Optional, Tuple
+from utils.dateutils import create_utc_datetime, hourly_index
 from datetime import datetime, timedelta, timezone
-from services.weather_service import get_weather_for_date
+from services.master_data import (
+    DEFAULT_SERIES_ID,
+    MASTER_COLUMNS,
+    get_master_data,
+    get_master_data_version,
+    normalize_series_id,
+    prepare_forecast_input,
+    series_data_path,
+)
+from services.cpu_budget import cpu_budget, with_thread_budget
+from services.memory_budget import memory_budget
+from services.metrics import forecast_stage_seconds, training_jobs_in_flight
+from services.model_cache import PARENT_DIR, get_model, get_native_model, invalidate_model
+from services.model_catalog import model_names, record_model
+from services.model_store import MODEL_FILE, create_version, discard_version, prediction_job_id, publish_version
+from services.native_model import NATIVE_PREDICT_ENABLED, export_native_model
+from services.single_flight import SingleFlight
+from services.weather_service import WEATHER_COLUMNS, get_weather_for_date_async
+from services.worker_pool import FORECAST_THREADS, TRAINING_THREADS, run_in_training_worker, run_in_worker
 
 # Get logger for this module (configuration is done in main.py)
 logger = logging.getLogger(__name__)
 
-PARENT_DIR = "trained_models"
 TRAINING_DATA_PATH = "./static/master_data_with_forecasted.csv"
+DHAKA_TZ = timezone(timedelta(hours=6))
+
+# In-flight backtest and realtime forecasts, shared by identical concurrent requests
+_forecast_flights = SingleFlight("forecast")
+
+# "full" trains through openstef's MLflow pipeline with its reports and figures; "lean"
+# fits the same model but only stores the model, the prediction job and the metrics
+TRAINING_PROFILES = ("full", "lean")
+TRAINING_PROFILE = os.getenv("TRAINING_PROFILE", "full")
+
+# Model types trained with a drop-in openstef custom regressor that fits the models of
+# all quantiles concurrently instead of one after another
+PARALLEL_QUANTILE_MODELS = {
+    "xgb_quantile": "services.quantile_training.ParallelXGBQuantileOpenstfRegressor",
+}
+
+
+def normalize_training_profile(training_profile: Optional[str]) -> str:
+    """
+    Validate a training profile, defaulting to TRAINING_PROFILE
+    
+    Raises:
+        ValueError: If the profile is unknown
+    """
+    training_profile = (training_profile or TRAINING_PROFILE).strip().lower()
+    if training_profile not in TRAINING_PROFILES:
+        raise ValueError(f"Unknown training profile '{training_profile}', expected one of: {', '.join(TRAINING_PROFILES)}")
+    return training_profile
 
 class ModelService:
     """Service class for handling model training and forecasting operations"""
     
     @staticmethod
-    def get_trained_models() -> List[str]:
-        """Get list of trained model directories"""
-        path = Path(PARENT_DIR)
-        dirs = [d.name for d in path.iterdir() if d.is_dir()]
-        logger.debug(f"Found trained model directories: {dirs}")
+    def get_trained_models(series_id: Optional[str] = None) -> List[str]:
+        """
+        Get list of trained model directories
+        
+        Args:
+            series_id: Only list the models trained on this series, None for all models
+        """
+        # Served from the model catalogue index instead of scanning trained_models/
+        dirs = model_names(normalize_series_id(series_id) if series_id is not None else None)
+        logger.debug("Found trained model directories: %s", dirs)
         return dirs
     
     @staticmethod
@@ -47,9 +95,13 @@ class ModelService:
         Returns:
             Status message
         """
+        # openstef (with mlflow, xgboost and plotly) is imported on first use to keep startup fast
+        from openstef.data_classes.prediction_job import PredictionJobDataClass
+        from openstef.pipeline.train_model import train_model_pipeline
+        
         pd.options.plotting.backend = 'plotly'
         pj = dict(
-            id=101,
+            id=prediction_job_id(DEFAULT_SERIES_ID, custom_name),
             model='xgb',
             forecast_type="demand",
             horizon_minutes=120,
@@ -73,7 +125,7 @@ class ModelService:
         input_data = input_data.drop(columns=["date_time_com", "forecasted_load"])
 
         pd.options.display.max_columns = None
-        logger.debug(f"Input data head:\n{input_data.head()}")
+        logger.debug("Input data head:\n%s", input_data.head())
 
         # Filter data based on provided date range
         start_date = create_utc_datetime(training_data_start_date, 0)
@@ -82,9 +134,9 @@ class ModelService:
         # Filter the input data to the specified date range
         train_data = input_data[(input_data.index >= start_date) & (input_data.index <= end_date)]
 
-        logger.info(f"Training data starting hour: {train_data.head(1).index}")
-        logger.info(f"Training data ending hour: {train_data.tail(1).index}")
-        logger.info(f"Training data filtered from {training_data_start_date} to {training_data_end_date}")
+        logger.info("Training data starting hour: %s", train_data.head(1).index)
+        logger.info("Training data ending hour: %s", train_data.tail(1).index)
+        logger.info("Training data filtered from %s to %s", training_data_start_date, training_data_end_date)
 
         train_data = train_data[~train_data.index.duplicated(keep='first')]
 
@@ -95,9 +147,9 @@ class ModelService:
 
         try:
             os.makedirs(path_to_create, exist_ok=True)
-            logger.info(f"Directory structure '{path_to_create}' created successfully.")
+            logger.info("Directory structure '%s' created successfully.", path_to_create)
         except OSError as e:
-            logger.error(f"Error creating directory structure: {e}")
+            logger.error("Error creating directory structure: %s", e)
         
         # storing pj for using later
         dictionary_path = f"./{PARENT_DIR}/{custom_name}/pj.pkl"
@@ -106,13 +158,16 @@ class ModelService:
 
         mlflow_tracking_uri = f"{PARENT_DIR}/{custom_name}/mlflow_trained_models"
 
-        train_data, validation_data, test_data = train_model_pipeline(
-            pj,
-            train_data,
-            check_old_model_age=False,
-            mlflow_tracking_uri=mlflow_tracking_uri,
-            artifact_folder=f"{PARENT_DIR}/{custom_name}/mlflow_artifacts",
-        )
+        with training_jobs_in_flight.track_in_progress():
+            train_data, validation_data, test_data = train_model_pipeline(
+                pj,
+                train_data,
+                check_old_model_age=False,
+                mlflow_tracking_uri=mlflow_tracking_uri,
+                artifact_folder=f"{PARENT_DIR}/{custom_name}/mlflow_artifacts",
+            )
+        # Forecasts must pick up the retrained model
+        invalidate_model(custom_name)
         return "hello"
     
     @staticmethod
@@ -121,133 +176,39 @@ class ModelService:
         custom_name: str, 
         training_data_start_date: str, 
         training_data_end_date: str, 
-        hyperparams_dict: Dict[str, Any]
+        hyperparams_dict: Dict[str, Any],
+        series_id: Optional[str] = None,
+        training_profile: Optional[str] = None
     ) -> str:
         """
         Train a model with comprehensive hyperparameters
         
+        Training runs in the training worker pool, so the event loop keeps serving
+        other requests meanwhile.
+        
         Args:
             model: Model type ('xgb' or 'lgb')
             custom_name: Custom name for the model
             training_data_start_date: Start date for training data
             training_data_end_date: End date for training data
             hyperparams_dict: Dictionary of hyperparameters
+            series_id: Load series to train on, None for the default series
+            training_profile: 'full' or 'lean', None for TRAINING_PROFILE
             
         Returns:
             Status message
+            
+        Raises:
+            ValueError: If the series id or training profile is invalid
+            FileNotFoundError: If the series has no data file
+            MemoryBudgetExceeded: If the training does not fit in the memory left for jobs
         """
-        pd.options.plotting.backend = 'plotly'
-        
-        # Create PredictionJobDataClass with proper model type and hyperparameters
-        pj_dict = dict(
-            id=101,
-            model=model,  # Use the actual model type from parameter
-            forecast_type="demand",
-            horizon_minutes=120,
-            resolution_minutes=60,
-            name=custom_name,  # Use the custom name
-            save_train_forecasts=True,
-            ignore_existing_models=True,
-            model_kwargs=hyperparams_dict,  # Use all hyperparameters from the dictionary
-            quantiles=[0.1, 0.5, 0.9]
+        series_id = normalize_series_id(series_id)
+        training_profile = normalize_training_profile(training_profile)
+        return await run_in_training_worker(
+            _train_model, model, custom_name, training_data_start_date, training_data_end_date, hyperparams_dict,
+            series_id, training_profile
         )
-        
-        logger.info(f"Creating PredictionJobDataClass with model={model}, name={custom_name}")
-        logger.debug(f"Model kwargs: {hyperparams_dict}")
-        
-        pj = PredictionJobDataClass(**pj_dict)
-        
-        # Load training data from default path
-        input_data = pd.read_csv(TRAINING_DATA_PATH, index_col=0, parse_dates=True)
-        
-        # Drop unnecessary columns if they exist
-        columns_to_drop = []
-        if "date_time_com" in input_data.columns:
-            columns_to_drop.append("date_time_com")
-        if "forecasted_load" in input_data.columns:
-            columns_to_drop.append("forecasted_load")
-        
-        if columns_to_drop:
-            input_data = input_data.drop(columns=columns_to_drop)
-        
-        pd.options.display.max_columns = None
-        logger.debug(f"Input data head:\n{input_data.head()}")
-        
-        # Filter data based on provided date range
-        start_date = create_utc_datetime(training_data_start_date, 0)
-        end_date = create_utc_datetime(training_data_end_date, 23)
-        
-        # Filter the input data to the specified date range
-        train_data = input_data[(input_data.index >= start_date) & (input_data.index <= end_date)]
-        
-        logger.info(f"Training data starting hour: {train_data.head(1).index}")
-        logger.info(f"Training data ending hour: {train_data.tail(1).index}")
-        logger.info(f"Training data filtered from {training_data_start_date} to {training_data_end_date}")
-        
-        # Remove duplicate index values
-        train_data = train_data[~train_data.index.duplicated(keep='first')]
-        
-        # Remove rows with NaT in the index
-        train_data = train_data[train_data.index.notna()]
-        
-        # Create directory structure for saving the model
-        path_to_create = f"./{PARENT_DIR}/{custom_name}/"
-        
-        try:
-            os.makedirs(path_to_create, exist_ok=True)
-            logger.info(f"Directory structure '{path_to_create}' created successfully.")
-        except OSError as e:
-            logger.error(f"Error creating directory structure: {e}")
-            raise
-        
-        # Persist the training dataset file used for training alongside the model artifacts
-        training_data_path = f"./{PARENT_DIR}/{custom_name}/training_data.csv"
-        try:
-            # Copy the physical CSV file instead of re-saving the DataFrame
-            shutil.copy(TRAINING_DATA_PATH, training_data_path)
-            logger.info(f"Training data file copied to {training_data_path}")
-        except Exception as e:
-            logger.error(f"Failed to save training data snapshot: {e}")
-            raise
-        
-        # Store PredictionJob for later use
-        dictionary_path = f"./{PARENT_DIR}/{custom_name}/pj.pkl"
-        with open(dictionary_path, "wb") as file:
-            pickle.dump(pj, file, protocol=pickle.HIGHEST_PROTOCOL)
-        
-        logger.info(f"PredictionJob saved to {dictionary_path}")
-        
-        # Save training metadata to JSON file
-        metadata = {
-            "model": model,
-            "custom_name": custom_name,
-            "training_data_start_date": training_data_start_date,
-            "training_data_end_date": training_data_end_date,
-            "hyperparameters": hyperparams_dict,
-            "trained_at": datetime.now(timezone.utc).isoformat()
-        }
-        
-        metadata_path = f"./{PARENT_DIR}/{custom_name}/training_metadata.json"
-        with open(metadata_path, "w") as file:
-            json.dump(metadata, file, indent=4)
-        
-        logger.info(f"Training metadata saved to {metadata_path}")
-        
-        # Set up MLflow tracking
-        mlflow_tracking_uri = f"{PARENT_DIR}/{custom_name}/mlflow_trained_models"
-        
-        # Train the model
-        logger.info(f"Starting model training for {model} with custom name '{custom_name}'")
-        train_data, validation_data, test_data = train_model_pipeline(
-            pj,
-            train_data,
-            check_old_model_age=False,
-            mlflow_tracking_uri=mlflow_tracking_uri,
-            artifact_folder=f"{PARENT_DIR}/{custom_name}/mlflow_artifacts",
-        )
-        
-        logger.info(f"Model training completed successfully for '{custom_name}'")
-        return "Training completed successfully"
     
     @staticmethod
     async def forecast_from_model(custom_name: str, date: str, hour: int) -> Dict[str, Any]:
@@ -262,39 +223,29 @@ class ModelService:
         Returns:
             Dict containing timestamp, forecast value, and custom_name
         """
-        input_data = pd.read_csv(TRAINING_DATA_PATH, index_col=0, parse_dates=True)
-
+        from openstef.pipeline.create_forecast import create_forecast_pipeline_core
+        
+        # Shared, de-duplicated master data; not copied per request
+        input_data = get_master_data(TRAINING_DATA_PATH)
         
         traing_data_last_index = input_data.index.get_loc(calculate_previous_hr_of_forecast(date, hour))
         # checking if the limit of test data matches our expectation
         test_data = input_data.iloc[traing_data_last_index+1:traing_data_last_index+25]
-        logger.info(f"Test data starting hour: {test_data.head(1).index}")
-        logger.info(f"Test data ending hour: {test_data.tail(1).index}")
+        logger.info("Test data starting hour: %s", test_data.head(1).index)
+        logger.info("Test data ending hour: %s", test_data.tail(1).index)
 
         # Prepare data to make the forecast.
         realised = input_data.loc[test_data.index, 'load'].copy(deep=True)
-        to_forecast_data = input_data.copy(deep=True)
-        to_forecast_data.loc[test_data.index, 'load'] = np.nan  # clear the load data for the part you want to forecast    
+        # clear the load data for the part you want to forecast; only the load column is materialised
+        to_forecast_data = prepare_forecast_input(input_data, test_data.index)
         
-        # Remove duplicate index values from train_data
-        to_forecast_data = to_forecast_data[~to_forecast_data.index.duplicated(keep='first')]
-        # Remove rows with NaT in the index
-        to_forecast_data = to_forecast_data[to_forecast_data.index.notna()]
-        
-        # storing pj for using later
-        dictionary_path = f"./{PARENT_DIR}/{custom_name}/pj.pkl"
-        with open(dictionary_path, "rb") as file:
-            pj = pickle.load(file)
+        # Prediction job and model, deserialized once and kept in memory
+        pj, model, model_specs = get_model(custom_name)
 
-        mlflow_tracking_uri = f"{PARENT_DIR}/{custom_name}/mlflow_trained_models"
-
-        forecast = create_forecast_pipeline(
-            pj,
-            to_forecast_data,
-            mlflow_tracking_uri,
-        )
+        forecast = create_forecast_pipeline_core(pj, to_forecast_data, model, model_specs)
 
-        logger.info(f"Forecast results:\n{forecast}")
+        # Whole frames are only rendered when debug logging is on
+        logger.debug("Forecast results:\n%s", forecast)
 
         # Create the time index using the utility method
         forecast_timestamp = create_utc_datetime(date, hour)
@@ -308,113 +259,57 @@ class ModelService:
             "custom_name": custom_name
         }
         
-        logger.info(f"Returning forecast result: {result}")
+        logger.info("Returning forecast result: %s", result)
         return result
     
     @staticmethod
-    async def forecast_from_mulitple_models(custom_names: List[str], date: str) -> Dict[str, Any]:
+    async def forecast_from_mulitple_models(custom_names: List[str], date: str, series_id: Optional[str] = None) -> Dict[str, Any]:
         """
         Create forecasts from multiple trained models for 24 hours (0-23)
         
         Args:
             custom_names: List of trained model names
             date: Date string in format 'YYYY-MM-DD'
+            series_id: Load series to forecast, None for the default series
             
         Returns:
             Dict with 'all_forecasts' key containing list of model forecasts
         """
-        # Load input data and prepare dataframe with NaN for 24 hours
-        input_data = pd.read_csv(TRAINING_DATA_PATH, index_col=0, parse_dates=True)
+        series_id = normalize_series_id(series_id)
+        # Identical concurrent requests share one computation
+        key = ("backtest", series_id, tuple(custom_names), date, _data_version(series_id))
+        result = await _forecast_flights.run(key, lambda: _run_backtest(custom_names, date, series_id))
+        return dict(result)
+    
+    @staticmethod
+    async def stream_forecast_from_mulitple_models(
+        custom_names: List[str], 
+        date: str, 
+        series_id: Optional[str] = None
+    ) -> AsyncIterator[Tuple[str, Dict[str, Any]]]:
+        """
+        Streaming variant of `forecast_from_mulitple_models`
         
-        # Calculate the start of the 24-hour forecast period (hour 0 of the given date)
-        forecast_start_datetime = create_utc_datetime(date, 0)
-        
-        # Get the index of the hour before the forecast period starts (robust to missing timestamps)
-        traing_data_last_index = get_training_data_last_index(input_data, date)
-        
-        # Get the test data for the forecast date (only available timestamps)
-        test_data = get_test_data_for_date(input_data, date)
-        
-        # Prepare data to make the forecast - set load values to NaN for the 24 hours
-        to_forecast_data = input_data.copy(deep=True)
-        to_forecast_data.loc[test_data.index, 'load'] = np.nan
-        # Drop all data points after the last test_data timestamp
-        if len(test_data) > 0:
-            last_test_timestamp = test_data.index[-1]
-            to_forecast_data = to_forecast_data[to_forecast_data.index <= last_test_timestamp]
-            logger.info(f"Dropped data points after {last_test_timestamp}")
-        
-        # Remove duplicate index values and NaT
-        to_forecast_data = to_forecast_data[~to_forecast_data.index.duplicated(keep='first')]
-        to_forecast_data = to_forecast_data[to_forecast_data.index.notna()]
-        
-        all_forecasts = []
-        
-        # Extract actual load data for the 24 hours (if available)
-        actual_loads = []
-        for hour in range(24):
-            forecast_timestamp = create_utc_datetime(date, hour)
-            # Check if this timestamp exists in the input data
-            if forecast_timestamp in input_data.index:
-                actual_load = input_data.loc[forecast_timestamp, 'load']
-                actual_loads.append({
-                    "timestamp": create_utc_datetime(date, hour, timezone(timedelta(hours=6))).isoformat(),
-                    "load": float(actual_load) if pd.notna(actual_load) else None
-                })
-            else:
-                actual_loads.append({
-                    "timestamp": create_utc_datetime(date, hour, timezone(timedelta(hours=6))).isoformat(),
-                    "load": None
-                })
-        
-        # Loop through each model sequentially
-        for custom_name in custom_names:
-            logger.info(f"Starting forecast for model: {custom_name}")
-            
-            # Get 24-hour forecasts from this model
-            forecast_df = _forecast_24_hours(custom_name, to_forecast_data)
-            
-            # Format the forecasts for all 24 hours
-            model_forecasts = []
-            for hour in range(24):
-                forecast_timestamp = create_utc_datetime(date, hour)
-                
-                # Safely access forecast value with error handling
-                try:
-                    if forecast_timestamp in forecast_df.index and 'forecast' in forecast_df.columns:
-                        forecast_value = forecast_df.loc[forecast_timestamp, 'forecast']
-                        # Check if the value is valid (not NaN)
-                        if pd.notna(forecast_value):
-                            forecast_value = float(forecast_value)
-                        else:
-                            forecast_value = None
-                            logger.warning(f"Forecast value is NaN for {custom_name} at {forecast_timestamp}")
-                    else:
-                        forecast_value = None
-                        logger.warning(f"Forecast timestamp {forecast_timestamp} not found in forecast_df for {custom_name}")
-                except Exception as e:
-                    forecast_value = None
-                    logger.error(f"Error accessing forecast value for {custom_name} at {forecast_timestamp}: {e}")
-                
-                forecast_result = {
-                    "timestamp": create_utc_datetime(date, hour, timezone(timedelta(hours=6))).isoformat(),
-                    "forecast": forecast_value
-                }
-                model_forecasts.append(forecast_result)
+        All models run concurrently in the worker pool and each result is yielded as soon
+        as it is ready, so the first result arrives after the fastest model.
+        
+        Args:
+            custom_names: List of trained model names
+            date: Date string in format 'YYYY-MM-DD'
+            series_id: Load series to forecast, None for the default series
             
-            # Store the model name and its 24-hour forecasts
-            model_result = {
-                "custom_name": custom_name,
-                "model_forecasts": model_forecasts
-            }
-            all_forecasts.append(model_result)
-            logger.info(f"Completed forecast for model: {custom_name}")
+        Yields:
+            (event, data) tuples:
+                - ("actual_loads", {"actual_loads": [...]}) first
+                - ("model", {"custom_name": str, "model_forecasts": [...]}) per finished model
+                - ("model_error", {"custom_name": str, "error": str}) per failed model
+                - ("summary", {"completed": [...], "failed": [...], "elapsed_seconds": float}) last
+        """
+        context = await run_in_worker(_prepare_backtest, date, normalize_series_id(series_id))
+        yield "actual_loads", {"actual_loads": context["actual_loads"]}
         
-        logger.info(f"Completed forecasts for all {len(custom_names)} models")
-        return {
-            "all_forecasts": all_forecasts,
-            "actual_loads": actual_loads
-        }
+        async for event in _stream_model_results(custom_names, _backtest_model_result, context):
+            yield event
     
     @staticmethod
     async def generate_realtime_forecast(
@@ -422,7 +317,8 @@ class ModelService:
         date: str, 
         holiday: int = 0, 
         holiday_type: int = 0, 
-        nation_event: int = 0
+        nation_event: int = 0,
+        series_id: Optional[str] = None
     ) -> Dict[str, Any]:
         """
         Generate real-time forecasts from current Dhaka hour to end of day (hour 23)
@@ -441,6 +337,7 @@ class ModelService:
             holiday: Holiday indicator (0 or 1)
             holiday_type: Type of holiday (default 0)
             nation_event: National event indicator (default 0)
+            series_id: Load series to forecast, None for the default series
             
         Returns:
             Dict with structure:
@@ -459,237 +356,687 @@ class ModelService:
         Raises:
             ValueError: If date is not today's date in Dhaka timezone
         """
-        # Get current Dhaka date and hour
-        dhaka_tz = timezone(timedelta(hours=6))
-        current_dhaka_datetime = datetime.now(dhaka_tz)
-        current_dhaka_date = current_dhaka_datetime.strftime('%Y-%m-%d')
-        current_hour = current_dhaka_datetime.hour
-        
-        logger.info(f"Current Dhaka time: {current_dhaka_datetime}, Date: {current_dhaka_date}, Hour: {current_hour}")
-        
-        # Validate that the selected date is today's date in Dhaka timezone
-        if date != current_dhaka_date:
-            error_msg = (
-                f"Real-time forecasting only works for the current date. "
-                f"Selected date: {date}, Current Dhaka date: {current_dhaka_date}. "
-                f"Please select today's date or use the 'Backtest Models' feature for historical dates."
-            )
-            logger.error(error_msg)
-            raise ValueError(error_msg)
-        
-        # Check if it's too late in the day (hour 23)
-        if current_hour == 23:
-            logger.warning("Current hour is 23. Only one hour remaining to forecast.")
-        
-        # Validate that models list is not empty
-        if not custom_names:
-            error_msg = "At least one model must be selected for forecasting."
-            logger.error(error_msg)
-            raise ValueError(error_msg)
+        series_id = normalize_series_id(series_id)
+        # Identical concurrent requests (e.g. dispatchers at shift change) share one computation
+        key = ("realtime", series_id, tuple(custom_names), date, (holiday, holiday_type, nation_event), _data_version(series_id))
+        result = await _forecast_flights.run(
+            key, lambda: _run_realtime_forecast(custom_names, date, holiday, holiday_type, nation_event, series_id)
+        )
+        return dict(result)
+    
+    @staticmethod
+    async def stream_realtime_forecast(
+        custom_names: List[str], 
+        date: str, 
+        holiday: int = 0, 
+        holiday_type: int = 0, 
+        nation_event: int = 0,
+        series_id: Optional[str] = None
+    ) -> AsyncIterator[Tuple[str, Dict[str, Any]]]:
+        """
+        Streaming variant of `generate_realtime_forecast`
         
-        # Load input data with error handling
-        try:
-            input_data = pd.read_csv(TRAINING_DATA_PATH, index_col=0, parse_dates=True)
-        except FileNotFoundError:
-            error_msg = f"Training data file not found: {TRAINING_DATA_PATH}"
-            logger.error(error_msg)
-            raise FileNotFoundError(error_msg)
-        except Exception as e:
-            error_msg = f"Error loading training data: {e}"
-            logger.error(error_msg)
-            raise Exception(error_msg)
-        
-        # Extract historical actual load (hour 0 to current_hour - 1)
-        historical_actual = []
-        for hour in range(0, current_hour):
-            timestamp = create_utc_datetime(date, hour)
-            if timestamp in input_data.index:
-                load = input_data.loc[timestamp, 'load']
-                if pd.notna(load):
-                    historical_actual.append({
-                        "hour": hour,
-                        "load": float(load)
-                    })
-        
-        logger.info(f"Extracted {len(historical_actual)} historical actual load values (hours 0-{current_hour-1})")
-        
-        # Extract historical forecasted load (hour 0 to current_hour - 1)
-        historical_forecasted = []
-        if 'forecasted_load' in input_data.columns:
-            for hour in range(0, current_hour):
-                timestamp = create_utc_datetime(date, hour)
-                if timestamp in input_data.index:
-                    forecasted_load = input_data.loc[timestamp, 'forecasted_load']
-                    if pd.notna(forecasted_load):
-                        historical_forecasted.append({
-                            "hour": hour,
-                            "load": float(forecasted_load)
-                        })
-        
-        logger.info(f"Extracted {len(historical_forecasted)} historical forecasted load values (hours 0-{current_hour-1})")
-        
-        # Prepare data for forecasting (current_hour to 23)
-        # Get only the timestamps that exist in the data for the forecast period
-        forecast_start = create_utc_datetime(date, current_hour)
-        forecast_end = create_utc_datetime(date, 23)
-        
-        # Filter to get only timestamps within the forecast period that exist in the data
-        test_data = input_data[(input_data.index >= forecast_start) & (input_data.index <= forecast_end)]
-        
-        logger.info(f"Test data contains {len(test_data)} hours from hour {current_hour} to 23 for date {date}")
-        
-        # Check if we need to create missing timestamps
-        expected_hours = list(range(current_hour, 24))
-        existing_hours = [ts.hour for ts in test_data.index]
-        missing_hours = [h for h in expected_hours if h not in existing_hours]
+        All models run concurrently in the worker pool and each result is yielded as soon
+        as it is ready.
         
-        if missing_hours:
-            logger.info(f"Missing {len(missing_hours)} hours in forecast period: {missing_hours}")
-            logger.info(f"Creating missing rows and fetching weather data from Meteostat...")
-            
-            # Fetch weather data for the entire day
-            try:
-                # Convert date string to datetime for weather service
-                date_obj = datetime.strptime(date, '%Y-%m-%d')
-                weather_data = get_weather_for_date(date_obj)
-                logger.info(f"Successfully fetched weather data for {len(weather_data)} hours")
-            except Exception as e:
-                logger.error(f"Error fetching weather data: {e}")
-                # Use default weather values if fetch fails
-                weather_data = [{'temp': 0.0, 'dwpt': 0.0, 'rhum': 0.0, 'prcp': 0.0, 
-                               'wdir': 0.0, 'wspd': 0.0, 'pres': 0.0, 'coco': 0} for _ in range(24)]
-            
-            # Create new rows for missing hours
-            new_rows = []
-            for hour in missing_hours:
-                timestamp = create_utc_datetime(date, hour)
-                weather = weather_data[hour] if hour < len(weather_data) else weather_data[0]
-                
-                # Create a new row with weather data and NaN for load
-                new_row = {
-                    'load': np.nan,
-                    'is_holiday': holiday,
-                    'holiday_type': holiday_type,
-                    'national_event_type': nation_event,
-                    'temp': weather.get('temp', 0.0),
-                    'dwpt': weather.get('dwpt', 0.0),
-                    'rhum': weather.get('rhum', 0.0),
-                    'prcp': weather.get('prcp', 0.0),
-                    'wdir': weather.get('wdir', 0.0),
-                    'wspd': weather.get('wspd', 0.0),
-                    'pres': weather.get('pres', 0.0),
-                    'coco': weather.get('coco', 0),
-                    'forecasted_load': np.nan
-                }
-                
-                # Create a DataFrame with the timestamp as index
-                new_row_df = pd.DataFrame([new_row], index=[timestamp])
-                new_rows.append(new_row_df)
+        Args:
+            custom_names: List of trained model names
+            date: Date string in format 'YYYY-MM-DD' (must be today's date in Dhaka timezone)
+            holiday: Holiday indicator (0 or 1)
+            holiday_type: Type of holiday (default 0)
+            nation_event: National event indicator (default 0)
+            series_id: Load series to forecast, None for the default series
             
-            # Concatenate new rows with input_data
-            if new_rows:
-                input_data = pd.concat([input_data] + new_rows)
-                input_data = input_data.sort_index()  # Sort by timestamp
-                logger.info(f"Added {len(new_rows)} new rows to input_data")
+        Yields:
+            (event, data) tuples:
+                - ("context", {"current_hour", "historical_actual", "historical_forecasted"}) first
+                - ("model", {"custom_name": str, "forecasts": [...]}) per model, with an
+                  "error" key if the model failed
+                - ("summary", {"completed": [...], "failed": [...], "elapsed_seconds": float}) last
                 
-                # Re-filter to get updated test_data
-                test_data = input_data[(input_data.index >= forecast_start) & (input_data.index <= forecast_end)]
-                logger.info(f"Updated test data now contains {len(test_data)} hours")
-        
-        if len(test_data) > 0:
-            logger.info(f"Forecast period starting hour: {test_data.head(1).index[0]}")
-            logger.info(f"Forecast period ending hour: {test_data.tail(1).index[0]}")
-        
-        # Prepare data to make the forecast - set load values to NaN for the forecast period
-        to_forecast_data = input_data.copy(deep=True)
-        to_forecast_data.loc[test_data.index, 'load'] = np.nan
-        
-        # Drop all data points after the last test_data timestamp
-        if len(test_data) > 0:
-            last_test_timestamp = test_data.index[-1]
-            to_forecast_data = to_forecast_data[to_forecast_data.index <= last_test_timestamp]
-            logger.info(f"Prepared forecast data up to {last_test_timestamp}")
-        
-        # Remove duplicate index values and NaT
-        to_forecast_data = to_forecast_data[~to_forecast_data.index.duplicated(keep='first')]
-        to_forecast_data = to_forecast_data[to_forecast_data.index.notna()]
-        
-        # Generate forecasts for each model
-        model_forecasts = []
-        for custom_name in custom_names:
-            logger.info(f"Generating real-time forecast for model: {custom_name}")
-            
+        Raises:
+            ValueError: If date is not today's date in Dhaka timezone
+        """
+        context = await _prepare_realtime_forecast(
+            custom_names, date, holiday, holiday_type, nation_event, normalize_series_id(series_id)
+        )
+        yield "context", {
+            "current_hour": context["current_hour"],
+            "historical_actual": context["historical_actual"],
+            "historical_forecasted": context["historical_forecasted"]
+        }
+        
+        async for event in _stream_model_results(custom_names, _realtime_model_result, context):
+            yield event
+
+
+def _train_model(
+    model: str, 
+    custom_name: str, 
+    training_data_start_date: str, 
+    training_data_end_date: str, 
+    hyperparams_dict: Dict[str, Any],
+    series_id: str,
+    training_profile: str = TRAINING_PROFILE
+) -> str:
+    """Train and store a model, see `ModelService.train_model_with_hyperparams`"""
+    # openstef (with mlflow, xgboost and plotly) is imported on first use to keep startup fast
+    from openstef.data_classes.prediction_job import PredictionJobDataClass
+    
+    if training_profile == "full":
+        # Figures of the training report
+        pd.options.plotting.backend = 'plotly'
+    
+    # Create PredictionJobDataClass with proper model type and hyperparameters
+    pj_dict = dict(
+        id=prediction_job_id(series_id, custom_name),
+        model=PARALLEL_QUANTILE_MODELS.get(model, model),  # Use the actual model type from parameter
+        forecast_type="demand",
+        horizon_minutes=120,
+        resolution_minutes=60,
+        name=custom_name,  # Use the custom name
+        save_train_forecasts=True,
+        ignore_existing_models=True,
+        model_kwargs=hyperparams_dict,  # Use all hyperparameters from the dictionary
+        quantiles=[0.1, 0.5, 0.9]
+    )
+    
+    logger.info("Creating PredictionJobDataClass with model=%s, name=%s", model, custom_name)
+    logger.debug("Model kwargs: %s", hyperparams_dict)
+    
+    pj = PredictionJobDataClass(**pj_dict)
+    
+    # Load the series' training data; the parsed frame is shared with forecasts and
+    # other trainings on the same series and must not be modified in place
+    data_path = series_data_path(series_id)
+    if not data_path.exists():
+        raise FileNotFoundError(f"No data file for series '{series_id}': {data_path}")
+    input_data = get_master_data(data_path)
+    
+    # Drop unnecessary columns if they exist
+    columns_to_drop = []
+    if "date_time_com" in input_data.columns:
+        columns_to_drop.append("date_time_com")
+    if "forecasted_load" in input_data.columns:
+        columns_to_drop.append("forecasted_load")
+    
+    if columns_to_drop:
+        input_data = input_data.drop(columns=columns_to_drop)
+    
+    pd.options.display.max_columns = None
+    logger.debug("Input data head:\n%s", input_data.head())
+    
+    # Filter data based on provided date range
+    start_date = create_utc_datetime(training_data_start_date, 0)
+    end_date = create_utc_datetime(training_data_end_date, 23)
+    
+    # Filter the input data to the specified date range
+    train_data = input_data[(input_data.index >= start_date) & (input_data.index <= end_date)]
+    
+    logger.info("Training data starting hour: %s", train_data.head(1).index)
+    logger.info("Training data ending hour: %s", train_data.tail(1).index)
+    logger.info("Training data filtered from %s to %s", training_data_start_date, training_data_end_date)
+    
+    # Write everything into a new version directory; it is only served once published,
+    # so forecasts keep using the current version while this one is being written
+    version, version_path = create_version(custom_name)
+    logger.info("Training version %s of model '%s' in %s (%s profile)", version, custom_name, version_path, training_profile)
+    
+    try:
+        if training_profile == "full":
+            # Persist the training dataset file used for training alongside the model artifacts
+            training_data_path = version_path / "training_data.csv"
             try:
-                # Get forecast for remaining hours
-                forecast_df = _forecast_24_hours(custom_name, to_forecast_data)
-                
-                # Extract forecast values for hours that exist in test_data
-                forecasts = []
-                for timestamp in test_data.index:
-                    hour = timestamp.hour
-                    
-                    try:
-                        if timestamp in forecast_df.index and 'forecast' in forecast_df.columns:
-                            forecast_value = forecast_df.loc[timestamp, 'forecast']
-                            if pd.notna(forecast_value):
-                                forecasts.append({
-                                    "hour": hour,
-                                    "forecast": float(forecast_value)
-                                })
-                            else:
-                                logger.warning(f"Forecast value is NaN for {custom_name} at hour {hour}")
-                                forecasts.append({
-                                    "hour": hour,
-                                    "forecast": None
-                                })
-                        else:
-                            logger.warning(f"Forecast timestamp for hour {hour} not found in forecast_df for {custom_name}")
-                            forecasts.append({
-                                "hour": hour,
-                                "forecast": None
-                            })
-                    except Exception as e:
-                        logger.error(f"Error accessing forecast value for {custom_name} at hour {hour}: {e}")
-                        forecasts.append({
-                            "hour": hour,
-                            "forecast": None
-                        })
-                
-                model_forecasts.append({
-                    "custom_name": custom_name,
-                    "forecasts": forecasts
-                })
-                
-                logger.info(f"Completed real-time forecast for model: {custom_name}")
-                
-            except FileNotFoundError:
-                error_msg = f"Model files not found for: {custom_name}"
-                logger.error(error_msg)
-                # Add empty forecast with error indicator for available hours
-                model_forecasts.append({
-                    "custom_name": custom_name,
-                    "forecasts": [{"hour": ts.hour, "forecast": None} for ts in test_data.index],
-                    "error": "Model not found"
-                })
+                # Copy the physical CSV file instead of re-saving the DataFrame
+                shutil.copy(data_path, training_data_path)
+                logger.info("Training data file copied to %s", training_data_path)
             except Exception as e:
-                error_msg = f"Error generating forecast for {custom_name}: {str(e)}"
-                logger.error(error_msg)
-                # Add empty forecast with error indicator for available hours
-                model_forecasts.append({
-                    "custom_name": custom_name,
-                    "forecasts": [{"hour": ts.hour, "forecast": None} for ts in test_data.index],
-                    "error": str(e)
-                })
+                logger.error("Failed to save training data snapshot: %s", e)
+                raise
+        
+        # Store PredictionJob for later use
+        dictionary_path = version_path / "pj.pkl"
+        with open(dictionary_path, "wb") as file:
+            pickle.dump(pj, file, protocol=pickle.HIGHEST_PROTOCOL)
         
-        logger.info(f"Completed real-time forecasts for all {len(custom_names)} models")
+        logger.info("PredictionJob saved to %s", dictionary_path)
         
+        # Save training metadata to JSON file
+        metadata = {
+            "model": model,
+            "custom_name": custom_name,
+            "version": version,
+            "series_id": series_id,
+            "training_data_start_date": training_data_start_date,
+            "training_data_end_date": training_data_end_date,
+            "hyperparameters": hyperparams_dict,
+            "training_profile": training_profile,
+            "trained_at": datetime.now(timezone.utc).isoformat()
+        }
+        
+        metadata_path = version_path / "training_metadata.json"
+        with open(metadata_path, "w") as file:
+            json.dump(metadata, file, indent=4)
+        
+        logger.info("Training metadata saved to %s", metadata_path)
+        
+        # Train the model
+        logger.info("Starting model training for %s with custom name '%s'", model, custom_name)
+        # Waits while running jobs hold the memory it needs; xgb_quantile fits one model per quantile
+        model_count = len(pj["quantiles"]) if model == "xgb_quantile" else 1
+        with memory_budget.admit("training", len(train_data), train_data.shape[1], model_count) as job_memory:
+            training_started = time.perf_counter()
+            with training_jobs_in_flight.track_in_progress(), cpu_budget.reserve(TRAINING_THREADS, "training") as threads:
+                # openstef passes the model kwargs on to the regressor; n_jobs caps its threads
+                pj["model_kwargs"] = with_thread_budget(hyperparams_dict, threads)
+                if training_profile == "lean":
+                    trained_model, model_specs, datasets = _fit_lean(pj, train_data)
+                    with open(version_path / MODEL_FILE, "wb") as file:
+                        pickle.dump((trained_model, model_specs), file, protocol=pickle.HIGHEST_PROTOCOL)
+                else:
+                    from openstef.pipeline.train_model import train_model_pipeline
+                
+                    # openstef saves the model, its report and figures to MLflow
+                    trained_model = model_specs = None
+                    datasets = train_model_pipeline(
+                        pj,
+                        train_data,
+                        check_old_model_age=False,
+                        mlflow_tracking_uri=str(version_path / "mlflow_trained_models"),
+                        artifact_folder=str(version_path / "mlflow_artifacts"),
+                    )
+        
+        # Complete the metadata with the outcome, for the model catalogue
+        metadata["training_duration_seconds"] = round(time.perf_counter() - training_started, 3)
+        metadata["training_threads"] = threads
+        metadata["memory"] = job_memory.summary()
+        metadata["metrics"] = _training_metrics(datasets)
+        with open(metadata_path, "w") as file:
+            json.dump(metadata, file, indent=4)
+        
+        # Export the booster for the fast forecast path; without it the model is served through MLflow
+        try:
+            export_native_model(version_path, pj, datasets, trained_model, model_specs)
+        except Exception as e:
+            logger.warning("Native export of model '%s' failed, forecasts use the openstef pipeline: %s", custom_name, e)
+    except BaseException:
+        discard_version(custom_name, version)
+        raise
+    
+    # Atomically switch forecasts to the new version; the previous one is kept for rollback
+    publish_version(custom_name, version)
+    invalidate_model(custom_name)
+    # Imported here: the scheduler module imports this one
+    from services.forecast_scheduler import forecast_scheduler
+    if custom_name in forecast_scheduler.model_names:
+        # Precomputed forecasts came from the version that was just replaced
+        forecast_scheduler.request_refresh()
+    try:
+        record_model(custom_name)
+    except Exception as e:
+        # The model is published either way; the catalogue catches up on the next sync
+        logger.warning("Could not update the model catalogue for %s: %s", custom_name, e)
+    
+    logger.info("Model training completed successfully for '%s'", custom_name)
+    return "Training completed successfully"
+
+
+def _fit_lean(pj: Any, train_data: pd.DataFrame) -> Tuple[Any, Any, Tuple[pd.DataFrame, pd.DataFrame, pd.DataFrame]]:
+    """
+    Fit a model with the steps of openstef's `train_model_pipeline`, without its report,
+    figures and MLflow logging
+    
+    Args:
+        pj: Prediction job
+        train_data: Raw training input data
+        
+    Returns:
+        Tuple of (model, model_specs, (train, validation, test)), the datasets holding
+        the model's `forecast` like with `save_train_forecasts`
+    """
+    from openstef.pipeline.train_model import (
+        DEFAULT_TRAIN_HORIZONS_HOURS,
+        train_pipeline_step_compute_features,
+        train_pipeline_step_load_model,
+        train_pipeline_step_split_data,
+        train_pipeline_step_train_model,
+    )
+    
+    # Default model specs of the prediction job; no previous model is loaded
+    _, model_specs, _ = train_pipeline_step_load_model(pj, serializer=None, ignore_existing_models=True)
+    horizons = DEFAULT_TRAIN_HORIZONS_HOURS
+    if pj["train_horizons_minutes"] is not None:
+        horizons = [horizon_minutes / 60 for horizon_minutes in pj["train_horizons_minutes"]]
+    
+    data_with_features = train_pipeline_step_compute_features(
+        pj=pj, model_specs=model_specs, input_data=train_data, horizons=horizons
+    )
+    train, validation, test, _ = train_pipeline_step_split_data(
+        data_with_features=data_with_features, pj=pj, test_fraction=0.0
+    )
+    trained_model = train_pipeline_step_train_model(
+        pj=pj, model_specs=model_specs, train_data=train, validation_data=validation
+    )
+    model_specs.feature_names = list(train.columns)
+    
+    for data in (train, validation, test):
+        if not data.empty:
+            data["forecast"] = trained_model.predict(data.iloc[:, 1:-1])
+    return trained_model, model_specs, (train, validation, test)
+
+
+def _training_metrics(datasets: Optional[Tuple[pd.DataFrame, ...]]) -> Dict[str, float]:
+    """
+    RMSE and MAE of the training forecasts on the validation and test sets
+    
+    Args:
+        datasets: (train, validation, test) frames returned by `train_model_pipeline`;
+            with `save_train_forecasts` they hold the `forecast` next to the `load`
+    """
+    metrics = {}
+    if not datasets or len(datasets) != 3:
+        return metrics
+    for name, data in zip(("train", "validation", "test"), datasets):
+        if not isinstance(data, pd.DataFrame) or not {"load", "forecast"} <= set(data.columns):
+            continue
+        errors = (data["forecast"] - data["load"]).dropna()
+        if errors.empty:
+            continue
+        metrics[f"{name}_rmse"] = round(float(np.sqrt((errors ** 2).mean())), 4)
+        metrics[f"{name}_mae"] = round(float(errors.abs().mean()), 4)
+    return metrics
+
+
+def _data_version(series_id: Optional[str] = None) -> Optional[Tuple[int, int]]:
+    """Version of the series' data file, part of the key of coalesced forecasts"""
+    try:
+        return get_master_data_version(series_data_path(series_id))
+    except OSError:
+        return None
+
+
+async def _run_backtest(custom_names: List[str], date: str, series_id: str) -> Dict[str, Any]:
+    """Compute a 24-hour backtest, see `ModelService.forecast_from_mulitple_models`"""
+    context = await run_in_worker(_prepare_backtest, date, series_id)
+    
+    all_forecasts = []
+    
+    # Loop through each model sequentially; the pipelines run in the worker pool
+    for custom_name in custom_names:
+        model_result = await run_in_worker(_backtest_model_result, custom_name, context)
+        all_forecasts.append(model_result)
+    
+    logger.info("Completed forecasts for all %s models", len(custom_names))
+    return {
+        "all_forecasts": all_forecasts,
+        "actual_loads": context["actual_loads"]
+    }
+
+
+async def _run_realtime_forecast(
+    custom_names: List[str], 
+    date: str, 
+    holiday: int, 
+    holiday_type: int, 
+    nation_event: int,
+    series_id: str
+) -> Dict[str, Any]:
+    """Compute a real-time forecast, see `ModelService.generate_realtime_forecast`"""
+    context = await _prepare_realtime_forecast(custom_names, date, holiday, holiday_type, nation_event, series_id)
+    
+    # Generate forecasts for each model; the pipelines run in the worker pool
+    model_forecasts = []
+    for custom_name in custom_names:
+        model_forecasts.append(await run_in_worker(_realtime_model_result, custom_name, context))
+    
+    logger.info("Completed real-time forecasts for all %s models", len(custom_names))
+    
+    return {
+        "current_hour": context["current_hour"],
+        "historical_actual": context["historical_actual"],
+        "historical_forecasted": context["historical_forecasted"],
+        "model_forecasts": model_forecasts
+    }
+
+
+async def _prepare_realtime_forecast(
+    custom_names: List[str], 
+    date: str, 
+    holiday: int, 
+    holiday_type: int, 
+    nation_event: int,
+    series_id: str = DEFAULT_SERIES_ID
+) -> Dict[str, Any]:
+    """
+    Validate a real-time forecast request and prepare the data shared by all models
+    
+    Returns:
+        Dict with current_hour, historical_actual, historical_forecasted, the prepared
+        to_forecast_data and forecast_hours (timestamps to report forecasts for)
+        
+    Raises:
+        ValueError: If date is not today's date in Dhaka timezone or no model is selected
+    """
+    # Get current Dhaka date and hour
+    dhaka_tz = timezone(timedelta(hours=6))
+    current_dhaka_datetime = datetime.now(dhaka_tz)
+    current_dhaka_date = current_dhaka_datetime.strftime('%Y-%m-%d')
+    current_hour = current_dhaka_datetime.hour
+    
+    logger.info("Current Dhaka time: %s, Date: %s, Hour: %s", current_dhaka_datetime, current_dhaka_date, current_hour)
+    
+    # Validate that the selected date is today's date in Dhaka timezone
+    if date != current_dhaka_date:
+        error_msg = (
+            f"Real-time forecasting only works for the current date. "
+            f"Selected date: {date}, Current Dhaka date: {current_dhaka_date}. "
+            f"Please select today's date or use the 'Backtest Models' feature for historical dates."
+        )
+        logger.error(error_msg)
+        raise ValueError(error_msg)
+    
+    # Check if it's too late in the day (hour 23)
+    if current_hour == 23:
+        logger.warning("Current hour is 23. Only one hour remaining to forecast.")
+    
+    # Validate that models list is not empty
+    if not custom_names:
+        error_msg = "At least one model must be selected for forecasting."
+        logger.error(error_msg)
+        raise ValueError(error_msg)
+    
+    # Start the weather fetch now so it runs concurrently with loading the data.
+    # It is served from the prefetch cache in the common case and bounded by a timeout otherwise.
+    date_obj = datetime.strptime(date, '%Y-%m-%d')
+    weather_task = asyncio.create_task(get_weather_for_date_async(date_obj))
+    
+    # Load input data with error handling
+    data_path = series_data_path(series_id)
+    try:
+        with forecast_stage_seconds.time(stage="data_load"):
+            input_data = await asyncio.to_thread(get_master_data, data_path)
+    except FileNotFoundError:
+        weather_task.cancel()
+        error_msg = f"Training data file not found: {data_path}"
+        logger.error(error_msg)
+        raise FileNotFoundError(error_msg)
+    except Exception as e:
+        weather_task.cancel()
+        error_msg = f"Error loading training data: {e}"
+        logger.error(error_msg)
+        raise Exception(error_msg)
+    
+    # Input preparation time, excluding the wait for weather which is its own stage
+    preparation_started = time.perf_counter()
+    weather_wait = 0.0
+    
+    # Hourly grid of the hours that already passed (hour 0 to current_hour - 1)
+    past_index = hourly_index(date, 0, current_hour - 1)
+    
+    # Extract historical actual load, skipping hours without a value
+    historical_actual = [
+        {"hour": ts.hour, "load": load}
+        for ts, load in zip(past_index, _values_on_grid(input_data['load'], past_index))
+        if load is not None
+    ]
+    
+    logger.info("Extracted %s historical actual load values (hours 0-%s)", len(historical_actual), current_hour-1)
+    
+    # Extract historical forecasted load, skipping hours without a value
+    historical_forecasted = []
+    if 'forecasted_load' in input_data.columns:
+        historical_forecasted = [
+            {"hour": ts.hour, "load": load}
+            for ts, load in zip(past_index, _values_on_grid(input_data['forecasted_load'], past_index))
+            if load is not None
+        ]
+    
+    logger.info("Extracted %s historical forecasted load values (hours 0-%s)", len(historical_forecasted), current_hour-1)
+    
+    # Prepare data for forecasting (current_hour to 23)
+    forecast_index = hourly_index(date, current_hour, 23)
+    
+    # Filter to get only timestamps within the forecast period that exist in the data
+    test_data = input_data[(input_data.index >= forecast_index[0]) & (input_data.index <= forecast_index[-1])]
+    
+    logger.info("Test data contains %s hours from hour %s to 23 for date %s", len(test_data), current_hour, date)
+    
+    # Check if we need to create missing timestamps
+    missing_index = forecast_index.difference(test_data.index)
+    missing_hours = missing_index.hour.tolist()
+    
+    if not missing_hours:
+        # All rows exist already, weather is not needed
+        weather_task.cancel()
+    else:
+        logger.info("Missing %s hours in forecast period: %s", len(missing_hours), missing_hours)
+        logger.info("Creating missing rows with weather data for the day...")
+        
+        # Weather for the entire day; falls back to cached, last known or default values
+        weather_wait_started = time.perf_counter()
+        weather_data = await weather_task
+        weather_wait = time.perf_counter() - weather_wait_started
+        logger.info("Using weather data for %s hours", len(weather_data))
+        
+        # Create all missing rows at once with weather data and NaN for load
+        weather_df = pd.DataFrame(weather_data).reindex(columns=WEATHER_COLUMNS).fillna(0.0)
+        new_rows = weather_df.iloc[missing_hours].set_index(missing_index)
+        new_rows['load'] = np.nan
+        new_rows['is_holiday'] = holiday
+        new_rows['holiday_type'] = holiday_type
+        new_rows['national_event_type'] = nation_event
+        new_rows['forecasted_load'] = np.nan
+        new_rows = new_rows[MASTER_COLUMNS]
+        
+        # Concatenate new rows with input_data (this is the only full copy of the master data)
+        input_data = pd.concat([input_data, new_rows])
+        input_data = input_data.sort_index()  # Sort by timestamp
+        logger.info("Added %s new rows to input_data", len(new_rows))
+        
+        # Re-filter to get updated test_data
+        test_data = input_data[(input_data.index >= forecast_index[0]) & (input_data.index <= forecast_index[-1])]
+        logger.info("Updated test data now contains %s hours", len(test_data))
+    
+    if len(test_data) > 0:
+        logger.info("Forecast period starting hour: %s", test_data.head(1).index[0])
+        logger.info("Forecast period ending hour: %s", test_data.tail(1).index[0])
+    
+    # Prepare data to make the forecast - set load values to NaN for the forecast period
+    # and drop all data points after the last test_data timestamp
+    last_test_timestamp = test_data.index[-1] if len(test_data) > 0 else None
+    to_forecast_data = prepare_forecast_input(input_data, test_data.index, until=last_test_timestamp)
+    if last_test_timestamp is not None:
+        logger.info("Prepared forecast data up to %s", last_test_timestamp)
+    forecast_stage_seconds.observe(time.perf_counter() - preparation_started - weather_wait, stage="input_preparation")
+    
+    return {
+        "current_hour": current_hour,
+        "historical_actual": historical_actual,
+        "historical_forecasted": historical_forecasted,
+        "to_forecast_data": to_forecast_data,
+        "forecast_hours": test_data.index[~test_data.index.duplicated(keep='first')]
+    }
+
+
+def _realtime_model_result(custom_name: str, context: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Run one model's real-time forecast and format it, reporting failures in an "error" key
+    
+    Args:
+        custom_name: Name of the trained model
+        context: Output of `_prepare_realtime_forecast`
+        
+    Returns:
+        Dict with custom_name and forecasts, plus error if the model failed
+    """
+    logger.info("Generating real-time forecast for model: %s", custom_name)
+    forecast_hours = context["forecast_hours"]
+    
+    try:
+        # Get forecast for remaining hours
+        forecast_df = _forecast_24_hours(custom_name, context["to_forecast_data"])
+        
+        # Extract forecast values for hours that exist in test_data with a single reindex
+        with forecast_stage_seconds.time(stage="result_formatting"):
+            forecast_values = _extract_forecasts(forecast_df, forecast_hours, custom_name)
+            forecasts = [
+                {"hour": ts.hour, "forecast": forecast_value}
+                for ts, forecast_value in zip(forecast_hours, forecast_values)
+            ]
+        
+        logger.info("Completed real-time forecast for model: %s", custom_name)
+        return {
+            "custom_name": custom_name,
+            "forecasts": forecasts
+        }
+        
+    except FileNotFoundError:
+        error_msg = f"Model files not found for: {custom_name}"
+        logger.error(error_msg)
+        # Add empty forecast with error indicator for available hours
+        return {
+            "custom_name": custom_name,
+            "forecasts": [{"hour": ts.hour, "forecast": None} for ts in forecast_hours],
+            "error": "Model not found"
+        }
+    except Exception as e:
+        error_msg = f"Error generating forecast for {custom_name}: {str(e)}"
+        logger.error(error_msg)
+        # Add empty forecast with error indicator for available hours
         return {
-            "current_hour": current_hour,
-            "historical_actual": historical_actual,
-            "historical_forecasted": historical_forecasted,
-            "model_forecasts": model_forecasts
+            "custom_name": custom_name,
+            "forecasts": [{"hour": ts.hour, "forecast": None} for ts in forecast_hours],
+            "error": str(e)
         }
 
+
+def _prepare_backtest(date: str, series_id: str = DEFAULT_SERIES_ID) -> Dict[str, Any]:
+    """
+    Prepare the data shared by all models of a 24-hour backtest
+    
+    Args:
+        date: Date string in format 'YYYY-MM-DD'
+        series_id: Load series to forecast
+        
+    Returns:
+        Dict with the prepared to_forecast_data, the day's UTC grid (day_index), its
+        Dhaka timestamp labels (day_timestamps) and the actual_loads of the day
+    """
+    # Load the shared, de-duplicated master data; it is not copied per request
+    with forecast_stage_seconds.time(stage="data_load"):
+        input_data = get_master_data(series_data_path(series_id))
+    preparation_started = time.perf_counter()
+    
+    # Get the index of the hour before the forecast period starts (robust to missing timestamps)
+    get_training_data_last_index(input_data, date)
+    
+    # Get the test data for the forecast date (only available timestamps)
+    test_data = get_test_data_for_date(input_data, date)
+    
+    # Prepare data to make the forecast - set load values to NaN for the 24 hours
+    # and drop all data points after the last test_data timestamp
+    last_test_timestamp = test_data.index[-1] if len(test_data) > 0 else None
+    to_forecast_data = prepare_forecast_input(input_data, test_data.index, until=last_test_timestamp)
+    if last_test_timestamp is not None:
+        logger.info("Dropped data points after %s", last_test_timestamp)
+    
+    # Hourly grid of the forecast day and its Dhaka timestamps, built once for all models
+    day_index = hourly_index(date)
+    day_timestamps = [ts.isoformat() for ts in hourly_index(date, to_timezone=DHAKA_TZ)]
+    
+    # Extract actual load data for the 24 hours (None where not available)
+    actual_loads = [
+        {"timestamp": timestamp, "load": load}
+        for timestamp, load in zip(day_timestamps, _values_on_grid(input_data['load'], day_index))
+    ]
+    forecast_stage_seconds.observe(time.perf_counter() - preparation_started, stage="input_preparation")
+    
+    return {
+        "to_forecast_data": to_forecast_data,
+        "day_index": day_index,
+        "day_timestamps": day_timestamps,
+        "actual_loads": actual_loads
+    }
+
+
+def _backtest_model_result(custom_name: str, context: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Run one model's 24-hour backtest forecast and format it
+    
+    Args:
+        custom_name: Name of the trained model
+        context: Output of `_prepare_backtest`
+        
+    Returns:
+        Dict with custom_name and model_forecasts
+    """
+    logger.info("Starting forecast for model: %s", custom_name)
+    
+    # Get 24-hour forecasts from this model
+    forecast_df = _forecast_24_hours(custom_name, context["to_forecast_data"])
+    
+    # Extract the forecasts for all 24 hours with a single reindex
+    with forecast_stage_seconds.time(stage="result_formatting"):
+        forecast_values = _extract_forecasts(forecast_df, context["day_index"], custom_name)
+        model_forecasts = [
+            {"timestamp": timestamp, "forecast": forecast_value}
+            for timestamp, forecast_value in zip(context["day_timestamps"], forecast_values)
+        ]
+    
+    logger.info("Completed forecast for model: %s", custom_name)
+    
+    # Store the model name and its 24-hour forecasts
+    return {
+        "custom_name": custom_name,
+        "model_forecasts": model_forecasts
+    }
+
+
+async def _stream_model_results(
+    custom_names: List[str], 
+    model_func: Callable[[str, Dict[str, Any]], Dict[str, Any]], 
+    context: Dict[str, Any]
+) -> AsyncIterator[Tuple[str, Dict[str, Any]]]:
+    """
+    Run model_func for all models concurrently in the worker pool and yield results as they finish
+    
+    Yields:
+        ("model", result) or ("model_error", {"custom_name", "error"}) per model, then a
+        ("summary", {"completed", "failed", "elapsed_seconds"}) event. Results carrying an
+        "error" key count as failed.
+    """
+    started = time.perf_counter()
+    
+    async def run_model(custom_name: str):
+        try:
+            return custom_name, await run_in_worker(model_func, custom_name, context), None
+        except Exception as e:
+            logger.error("Error generating forecast for %s: %s", custom_name, e)
+            return custom_name, None, e
+    
+    tasks = [asyncio.ensure_future(run_model(custom_name)) for custom_name in custom_names]
+    completed, failed = [], []
+    try:
+        for next_done in asyncio.as_completed(tasks):
+            custom_name, result, error = await next_done
+            if error is not None:
+                failed.append(custom_name)
+                yield "model_error", {"custom_name": custom_name, "error": str(error)}
+                continue
+            (failed if "error" in result else completed).append(custom_name)
+            yield "model", result
+    finally:
+        # Stop waiting for remaining models if the client went away
+        for task in tasks:
+            task.cancel()
+    
+    yield "summary", {
+        "completed": completed,
+        "failed": failed,
+        "elapsed_seconds": round(time.perf_counter() - started, 3)
+    }
+
+
 def _forecast_24_hours(custom_name: str, to_forecast_data: pd.DataFrame) -> pd.DataFrame:
     """
     Generate 24-hour forecast for a given model using pre-prepared data with NaN values
@@ -700,26 +1047,97 @@ def _forecast_24_hours(custom_name: str, to_forecast_data: pd.DataFrame) -> pd.D
         
     Returns:
         DataFrame containing forecast results for 24 hours
+        
+    Raises:
+        MemoryBudgetExceeded: If the forecast does not fit in the memory left for jobs
     """
-    # Load the prediction job configuration
-    dictionary_path = f"./{PARENT_DIR}/{custom_name}/pj.pkl"
-    with open(dictionary_path, "rb") as file:
-        pj = pickle.load(file)
-    
-    # Set up MLflow tracking URI
-    mlflow_tracking_uri = f"{PARENT_DIR}/{custom_name}/mlflow_trained_models"
-    
-    # Create forecast pipeline
-    forecast = create_forecast_pipeline(
-        pj,
-        to_forecast_data,
-        mlflow_tracking_uri,
-    )
+    # Waits while running jobs hold the memory the feature engineering needs
+    with memory_budget.admit("forecast", len(to_forecast_data), to_forecast_data.shape[1]):
+        return _run_forecast(custom_name, to_forecast_data)
+
+
+def _run_forecast(custom_name: str, to_forecast_data: pd.DataFrame) -> pd.DataFrame:
+    """Forecast with the native booster if possible, else the openstef pipeline, see `_forecast_24_hours`"""
+    from openstef.pipeline.create_forecast import create_forecast_pipeline_core
     
-    logger.info(f"Forecast results for {custom_name}:\n{forecast}")
+    # Fast path: the natively exported booster, loaded in milliseconds and predicted in place
+    if NATIVE_PREDICT_ENABLED:
+        try:
+            native = get_native_model(custom_name)
+            if native is not None:
+                with cpu_budget.reserve(FORECAST_THREADS, "forecast", exact=True):
+                    forecast = native.forecast(to_forecast_data)
+                logger.debug("Native forecast results for %s:\n%s", custom_name, forecast)
+                return forecast
+        except FileNotFoundError:
+            raise
+        except Exception as e:
+            logger.warning("Native forecast of %s failed, falling back to the openstef pipeline: %s", custom_name, e)
+    
+    # Prediction job and model, deserialized once and kept in memory
+    pj, model, model_specs = get_model(custom_name)
+    
+    # Create forecast pipeline (openstef validation, feature engineering and prediction)
+    with forecast_stage_seconds.time(stage="prediction"), cpu_budget.reserve(FORECAST_THREADS, "forecast", exact=True):
+        forecast = create_forecast_pipeline_core(pj, to_forecast_data, model, model_specs)
+    
+    # Whole frames are only rendered when debug logging is on
+    logger.debug("Forecast results for %s:\n%s", custom_name, forecast)
     
     return forecast
 
+def warm_up_model(custom_name: str) -> None:
+    """
+    Load a model and run one forecast for the last 24 hours of the master data, so the
+    first real forecast does not pay for deserialization and first-call overheads
+    
+    Args:
+        custom_name: Name of the trained model
+    """
+    input_data = get_master_data(TRAINING_DATA_PATH)
+    to_forecast_data = prepare_forecast_input(input_data, input_data.index[-24:])
+    _forecast_24_hours(custom_name, to_forecast_data)
+
+
+def _values_on_grid(series: pd.Series, index: pd.DatetimeIndex) -> List[Optional[float]]:
+    """
+    Look up the values of a series on a time grid with a single reindex
+    
+    Args:
+        series: Series with a datetime index, duplicate timestamps are resolved to the first value
+        index: Time grid to extract
+        
+    Returns:
+        List of floats aligned with the grid, None where the value is missing or NaN
+    """
+    series = series[~series.index.duplicated(keep='first')]
+    values = series.reindex(index).astype(float)
+    return values.astype(object).where(values.notna(), None).tolist()
+
+
+def _extract_forecasts(forecast_df: pd.DataFrame, index: pd.DatetimeIndex, custom_name: str) -> List[Optional[float]]:
+    """
+    Extract the 'forecast' column of a forecast result on a time grid
+    
+    Args:
+        forecast_df: Forecast pipeline output
+        index: Time grid to extract
+        custom_name: Name of the model, used for logging
+        
+    Returns:
+        List of forecast values aligned with the grid, None where no valid forecast exists
+    """
+    if 'forecast' not in forecast_df.columns:
+        logger.warning("No forecast column in forecast_df for %s", custom_name)
+        return [None] * len(index)
+    
+    forecast_values = _values_on_grid(forecast_df['forecast'], index)
+    missing = [ts for ts, value in zip(index, forecast_values) if value is None]
+    if missing:
+        logger.warning("Forecast missing or NaN for %s at %s timestamps: %s", custom_name, len(missing), [str(ts) for ts in missing])
+    return forecast_values
+
+
 def calculate_previous_hr_of_forecast(date: str, hour: int) -> datetime:
     # Create UTC datetime from date and hour parameters
     # Handle hour adjustment logic: if hour > 0, subtract 1; if hour == 0, go to previous date at hour 23
@@ -757,7 +1175,7 @@ def get_training_data_last_index(input_data: pd.DataFrame, date: str) -> int:
     # Check if the exact timestamp exists
     if previous_hour in input_data.index:
         training_data_last_index = input_data.index.get_loc(previous_hour)
-        logger.info(f"Found training data ending at: {previous_hour}")
+        logger.info("Found training data ending at: %s", previous_hour)
         return training_data_last_index
     
     # Exact timestamp not found - use searchsorted to find closest position
@@ -765,7 +1183,7 @@ def get_training_data_last_index(input_data: pd.DataFrame, date: str) -> int:
     
     if insert_pos == 0:
         # Requested date is before all available data
-        logger.error(f"Forecast date {date} is before available training data")
+        logger.error("Forecast date %s is before available training data", date)
         raise ValueError(
             f"No training data available before {date}. "
             f"Earliest available data: {input_data.index.min().strftime('%Y-%m-%d')}. "
@@ -773,15 +1191,15 @@ def get_training_data_last_index(input_data: pd.DataFrame, date: str) -> int:
         )
     elif insert_pos >= len(input_data):
         # Requested date is after all available data - use last available index
-        logger.warning(f"Previous hour {previous_hour} is after all data. Using last available timestamp.")
+        logger.warning("Previous hour %s is after all data. Using last available timestamp.", previous_hour)
         training_data_last_index = len(input_data) - 1
     else:
         # Use the index just before the insertion point
         training_data_last_index = insert_pos - 1
         actual_timestamp = input_data.index[training_data_last_index]
         logger.warning(
-            f"Previous hour {previous_hour} not found in data. "
-            f"Using closest earlier timestamp: {actual_timestamp}"
+            "Previous hour %s not found in data. Using closest earlier timestamp: %s",
+            previous_hour, actual_timestamp
         )
     
     return training_data_last_index
@@ -809,11 +1227,11 @@ def get_test_data_for_date(input_data: pd.DataFrame, date: str) -> pd.DataFrame:
     test_data = input_data[(input_data.index >= forecast_start) & (input_data.index <= forecast_end)]
     
     # Log information about data availability
-    logger.info(f"Test data contains {len(test_data)} hours out of 24 possible for date {date}")
+    logger.info("Test data contains %s hours out of 24 possible for date %s", len(test_data), date)
     
     if len(test_data) > 0:
-        logger.info(f"Test data starting hour: {test_data.head(1).index[0]}")
-        logger.info(f"Test data ending hour: {test_data.tail(1).index[0]}")
+        logger.info("Test data starting hour: %s", test_data.head(1).index[0])
+        logger.info("Test data ending hour: %s", test_data.tail(1).index[0])
         
         # Log any missing hours for debugging
         expected_hours = set(range(24))
@@ -821,9 +1239,9 @@ def get_test_data_for_date(input_data: pd.DataFrame, date: str) -> pd.DataFrame:
         missing_hours = expected_hours - available_hours
         
         if missing_hours:
-            logger.warning(f"Missing hours in test data: {sorted(missing_hours)}")
+            logger.warning("Missing hours in test data: %s", sorted(missing_hours))
     else:
-        logger.warning(f"No data found for forecast date {date}")
+        logger.warning("No data found for forecast date %s", date)
     
     return test_data
 
@@ -839,6 +1257,6 @@ def get_current_dhaka_hour() -> int:
     dhaka_tz = timezone(timedelta(hours=6))
     current_dhaka_time = datetime.now(dhaka_tz)
     current_hour = current_dhaka_time.hour
-    logger.info(f"Current Dhaka time: {current_dhaka_time}, Hour: {current_hour}")
+    logger.info("Current Dhaka time: %s, Hour: %s", current_dhaka_time, current_hour)
     return current_hour
 
@@ -0,0 +1,226 @@
+"""Versioned storage of trained models with atomic publishing and rollback"""
+import logging
+import os
+import shutil
+import time
+import uuid
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+PARENT_DIR = "trained_models"
+
+# Each training writes a new trained_models/<name>/versions/<version>/ directory. The
+# CURRENT file names the version that is served; it is replaced atomically, so readers
+# see either the old or the new version, never a mix. Models trained before versioning
+# keep their files directly in trained_models/<name>/ and are served from there.
+CURRENT_FILE = "CURRENT"
+VERSIONS_DIR = "versions"
+# Present in a version directory until the version is published
+STAGING_MARKER = ".staging"
+# Pickled (model, model_specs) of versions trained with the lean profile; versions
+# trained with the full profile hold an MLflow store instead
+MODEL_FILE = "model.pkl"
+
+# Published versions kept per model: the current one plus older ones for rollback
+MODEL_VERSIONS_KEPT = max(2, int(os.getenv("MODEL_VERSIONS_KEPT", "2")))
+# Unpublished versions older than this are left over from crashed trainings and removed
+STAGING_TTL_SECONDS = 24 * 3600
+
+
+def model_root(custom_name: str) -> Path:
+    """Directory of a model holding its versions and CURRENT pointer"""
+    return Path(PARENT_DIR) / custom_name
+
+
+def current_version(custom_name: str) -> Optional[str]:
+    """Version served for a model, None if it is unversioned (legacy) or not published yet"""
+    try:
+        return (model_root(custom_name) / CURRENT_FILE).read_text().strip() or None
+    except FileNotFoundError:
+        return None
+
+
+def version_dir(custom_name: str, version: Optional[str] = None) -> Path:
+    """
+    Directory holding the artifacts (pj.pkl, training_metadata.json, MLflow files) of a model
+
+    Args:
+        custom_name: Name of the trained model
+        version: Version to look up, None for the served version
+
+    Returns:
+        The version directory, or the model directory itself for unversioned models
+    """
+    version = version or current_version(custom_name)
+    if version is None:
+        return model_root(custom_name)
+    return model_root(custom_name) / VERSIONS_DIR / version
+
+
+def served_version_key(custom_name: str) -> str:
+    """
+    Identifier of the served version, changing whenever another version is published
+
+    Raises:
+        FileNotFoundError: If the model has no servable version
+    """
+    version = current_version(custom_name)
+    if version is not None:
+        return version
+    # Unversioned model: its pj.pkl is rewritten on retraining
+    stat = os.stat(model_root(custom_name) / "pj.pkl")
+    return f"legacy-{stat.st_mtime_ns}-{stat.st_size}"
+
+
+def prediction_job_id(series_id: str, custom_name: str) -> str:
+    """
+    openstef prediction job id of a model, unique per series and model name
+
+    openstef names the model's MLflow experiment and its report folder after this id.
+    Models trained before it was derived keep the id stored in their pj.pkl.
+    """
+    return f"{series_id}.{custom_name}"
+
+
+def trained_model_names() -> List[str]:
+    """Names of the models with a servable version"""
+    root = Path(PARENT_DIR)
+    if not root.is_dir():
+        return []
+    return [
+        d.name for d in root.iterdir()
+        if d.is_dir() and ((d / CURRENT_FILE).exists() or (d / "pj.pkl").exists())
+    ]
+
+
+def create_version(custom_name: str) -> Tuple[str, Path]:
+    """
+    Create the directory of a new, unpublished model version
+
+    Training writes all artifacts into this directory (they stay where they were
+    written: MLflow records absolute artifact paths) and then calls `publish_version`.
+
+    Returns:
+        Tuple of (version, directory)
+    """
+    version = f"{datetime.now(timezone.utc).strftime('%Y%m%dT%H%M%S%fZ')}-{uuid.uuid4().hex[:6]}"
+    directory = model_root(custom_name) / VERSIONS_DIR / version
+    directory.mkdir(parents=True)
+    (directory / STAGING_MARKER).touch()
+    logger.info("Created version %s of model %s", version, custom_name)
+    return version, directory
+
+
+def publish_version(custom_name: str, version: str) -> Optional[str]:
+    """
+    Atomically make a version the served version of a model and prune old versions
+
+    Args:
+        custom_name: Name of the trained model
+        version: Version created by `create_version`
+
+    Returns:
+        The previously served version, None if there was none
+    """
+    previous = current_version(custom_name)
+    (version_dir(custom_name, version) / STAGING_MARKER).unlink(missing_ok=True)
+    _write_current(custom_name, version)
+    logger.info("Published version %s of model %s (previous: %s)", version, custom_name, previous)
+    _prune_versions(custom_name, previous)
+    return previous
+
+
+def discard_version(custom_name: str, version: str) -> None:
+    """Remove an unpublished version, e.g. after its training failed"""
+    shutil.rmtree(version_dir(custom_name, version), ignore_errors=True)
+    logger.info("Discarded version %s of model %s", version, custom_name)
+
+
+def list_versions(custom_name: str) -> List[Dict[str, Any]]:
+    """
+    Published versions of a model, newest first
+
+    Returns:
+        List of {"version", "current"} dicts; empty for unversioned models
+    """
+    current = current_version(custom_name)
+    return [
+        {"version": version, "current": version == current}
+        for version in reversed(_published_versions(custom_name))
+    ]
+
+
+def rollback_model(custom_name: str, version: Optional[str] = None) -> str:
+    """
+    Serve an earlier published version of a model again
+
+    Args:
+        custom_name: Name of the trained model
+        version: Version to serve, None for the newest version older than the current one
+
+    Returns:
+        The version now served
+
+    Raises:
+        FileNotFoundError: If the model has no versions
+        ValueError: If the version is unknown or there is no older version
+    """
+    published = _published_versions(custom_name)
+    current = current_version(custom_name)
+    if current is None or not published:
+        raise FileNotFoundError(f"Model '{custom_name}' has no published versions")
+    if version is None:
+        older = [v for v in published if v < current]
+        if not older:
+            raise ValueError(f"Model '{custom_name}' has no version older than {current}")
+        version = older[-1]
+    elif version not in published:
+        raise ValueError(f"Unknown version '{version}' of model '{custom_name}'")
+
+    _write_current(custom_name, version)
+    logger.info("Rolled back model %s from version %s to %s", custom_name, current, version)
+    return version
+
+
+def _write_current(custom_name: str, version: str) -> None:
+    """Point CURRENT at a version; os.replace makes the switch atomic, also on Windows"""
+    current_path = model_root(custom_name) / CURRENT_FILE
+    tmp_path = current_path.with_name(f"{CURRENT_FILE}.{os.getpid()}.{uuid.uuid4().hex}.tmp")
+    tmp_path.write_text(version)
+    os.replace(tmp_path, current_path)
+
+
+def _published_versions(custom_name: str) -> List[str]:
+    """Published versions of a model, oldest first (version names sort by creation time)"""
+    versions = model_root(custom_name) / VERSIONS_DIR
+    if not versions.is_dir():
+        return []
+    return sorted(d.name for d in versions.iterdir() if d.is_dir() and not (d / STAGING_MARKER).exists())
+
+
+def _prune_versions(custom_name: str, previous: Optional[str] = None) -> None:
+    """
+    Remove published versions beyond MODEL_VERSIONS_KEPT and stale unpublished ones
+
+    The current and the previously served version are always kept, also when the previous
+    one is older than the others after a rollback; the remaining slots go to the newest.
+    """
+    published = _published_versions(custom_name)
+    kept = {version for version in (current_version(custom_name), previous) if version is not None}
+    for version in reversed(published):
+        if len(kept) >= MODEL_VERSIONS_KEPT:
+            break
+        kept.add(version)
+    for version in published:
+        if version not in kept:
+            shutil.rmtree(version_dir(custom_name, version), ignore_errors=True)
+            logger.info("Removed old version %s of model %s", version, custom_name)
+
+    versions = model_root(custom_name) / VERSIONS_DIR
+    for marker in versions.glob(f"*/{STAGING_MARKER}"):
+        if time.time() - marker.stat().st_mtime > STAGING_TTL_SECONDS:
+            shutil.rmtree(marker.parent, ignore_errors=True)
+            logger.info("Removed abandoned version %s of model %s", marker.parent.name, custom_name)
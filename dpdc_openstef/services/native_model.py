@@ -0,0 +1,246 @@
+"""Native booster export of trained models and a fast forecast path that bypasses MLflow"""
+import json
+import logging
+import os
+import pickle
+import time
+from datetime import datetime, timezone
+from io import StringIO
+from pathlib import Path
+from typing import Any, Dict, Optional, Sequence
+
+import numpy as np
+import pandas as pd
+
+from services.metrics import forecast_stage_seconds
+from services.worker_pool import FORECAST_THREADS
+
+logger = logging.getLogger(__name__)
+
+# Set to 0 to always forecast through openstef's MLflow model
+NATIVE_PREDICT_ENABLED = os.getenv("NATIVE_PREDICT", "1") == "1"
+
+# Subdirectory of a model version holding the exported booster and its config
+NATIVE_DIR = "native"
+CONFIG_FILE = "native_model.json"
+# Rows of the validation set on which the exported booster must reproduce the model
+PARITY_ROWS = 200
+
+
+class NativeModel:
+    """A trained model's booster loaded from its native file, with what is needed to forecast"""
+
+    def __init__(self, pj: Any, config: Dict[str, Any], booster: Any):
+        self.pj = pj
+        self.config = config
+        self.booster = booster
+        self.feature_names = config["feature_names"]
+
+    def predict(self, features: pd.DataFrame) -> np.ndarray:
+        """Predict from a frame holding (at least) the model's features"""
+        values = features[self.feature_names]
+        if self.config["format"] == "xgboost-ubj":
+            best_iteration = self.config.get("best_iteration")
+            iteration_range = (0, best_iteration + 1) if best_iteration is not None else (0, 0)
+            return self.booster.inplace_predict(values, iteration_range=iteration_range)
+        return self.booster.predict(values, num_threads=FORECAST_THREADS)
+
+    @property
+    def feature_importance_dataframe(self) -> Optional[pd.DataFrame]:
+        """Feature importance of the trained model, weighting openstef's completeness check"""
+        importance = self.config.get("feature_importance")
+        if importance is None:
+            return None
+        return pd.read_json(StringIO(json.dumps(importance)), orient="split")
+
+    def forecast(self, input_data: pd.DataFrame) -> pd.DataFrame:
+        """
+        Forecast the hours without load in `input_data`
+
+        Mirrors openstef's `create_forecast_pipeline_core` (validation, feature engineering,
+        completeness check) and then predicts with the booster directly. Only the
+        `forecast` column is produced (no confidence intervals).
+
+        Raises:
+            ValueError: If the prediction job uses a custom data preparation or too little
+                valid data is left; the caller falls back to the full pipeline, which
+                handles these cases
+        """
+        from openstef.feature_engineering.feature_applicator import OperationalPredictFeatureApplicator
+        from openstef.pipeline.utils import generate_forecast_datetime_range
+        from openstef.validation import validation
+
+        if self.pj.get("data_prep_class"):
+            raise ValueError("custom data preparation is not supported by the native forecast path")
+
+        with forecast_stage_seconds.time(stage="feature_engineering"):
+            validated = validation.validate(
+                self.pj["id"],
+                input_data,
+                self.pj["flatliner_threshold_minutes"],
+                self.pj["resolution_minutes"],
+                detect_non_zero_flatliner=self.pj["detect_non_zero_flatliner"],
+            )
+            with_features = OperationalPredictFeatureApplicator(
+                horizons=self.config["horizons"],
+                feature_names=self.feature_names,
+                feature_modules=self.config.get("feature_modules") or [],
+            ).add_features(validated, pj=self.pj)
+            if not validation.is_data_sufficient(
+                with_features, self.pj["completeness_threshold"], self.pj["minimal_table_length"], self
+            ):
+                raise ValueError("insufficient data for the native forecast path")
+            forecast_start, forecast_end = generate_forecast_datetime_range(with_features)
+            forecast_input = with_features[forecast_start:forecast_end].drop(columns="load")
+
+        with forecast_stage_seconds.time(stage="prediction"):
+            values = self.predict(forecast_input)
+        return pd.DataFrame({"forecast": values}, index=forecast_input.index)
+
+
+def export_native_model(
+    version_path: Path,
+    pj: Any,
+    datasets: Optional[Sequence[pd.DataFrame]] = None,
+    model: Any = None,
+    model_specs: Any = None
+) -> Optional[Path]:
+    """
+    Write the booster of a freshly trained model in its native format next to the MLflow model
+
+    xgboost boosters are saved as UBJSON, lightgbm boosters as text, together with the
+    feature list and the settings needed to forecast. When the validation set is
+    available the exported booster must reproduce the model's predictions on it,
+    otherwise nothing is exported. Other model types are not exported; they are always
+    served through MLflow.
+
+    Args:
+        version_path: Directory of the model version
+        pj: Prediction job the model was trained with
+        datasets: (train, validation, test) frames returned by `train_model_pipeline`
+        model: The trained model, None to load it from the version's MLflow store
+        model_specs: Model specifications of `model`
+
+    Returns:
+        The native model directory, or None if the model was not exported
+    """
+    started = time.perf_counter()
+    if model is None:
+        from openstef.model.serializer import MLflowSerializer
+
+        model, model_specs = MLflowSerializer(mlflow_tracking_uri=str(version_path / "mlflow_trained_models")).load_model(
+            experiment_name=str(pj["id"])
+        )
+    booster, config = _native_booster(model)
+    if booster is None:
+        logger.info("Model type %s has no native export; forecasts use the openstef pipeline", type(model).__name__)
+        return None
+
+    config.update(
+        horizons=[pj["resolution_minutes"] / 60.0],
+        feature_modules=list(getattr(model_specs, "feature_modules", None) or []),
+        quantiles=list(pj["quantiles"]) if pj.get("quantiles") is not None else None,
+        standard_deviation=_frame_to_json(getattr(model, "standard_deviation", None)),
+        feature_importance=_frame_to_json(_feature_importance(model)),
+        exported_at=datetime.now(timezone.utc).isoformat(),
+    )
+
+    directory = version_path / NATIVE_DIR
+    directory.mkdir(exist_ok=True)
+    booster.save_model(str(directory / config["file"]))
+    with open(directory / CONFIG_FILE, "w") as file:
+        json.dump(config, file, indent=4)
+
+    sample = _parity_sample(datasets, config["feature_names"])
+    if sample is not None:
+        native = load_native_model(version_path)
+        if not np.allclose(native.predict(sample), model.predict(sample), rtol=1e-5, atol=1e-6):
+            logger.warning("Native export of %s does not reproduce the model; forecasts use the openstef pipeline", version_path)
+            (directory / CONFIG_FILE).unlink()
+            return None
+
+    logger.info("Native %s model exported to %s in %.2fs", config["format"], directory, time.perf_counter() - started)
+    return directory
+
+
+def load_native_model(version_path: Path) -> Optional["NativeModel"]:
+    """
+    Load the native booster of a model version
+
+    Returns:
+        The loaded model, or None if the version has no native export
+    """
+    directory = Path(version_path) / NATIVE_DIR
+    try:
+        with open(directory / CONFIG_FILE) as file:
+            config = json.load(file)
+    except FileNotFoundError:
+        return None
+
+    if config["format"] == "xgboost-ubj":
+        import xgboost
+
+        booster = xgboost.Booster()
+        booster.load_model(str(directory / config["file"]))
+        # Loaded boosters use all cores; keep to the forecast share of the CPU budget
+        booster.set_param({"nthread": FORECAST_THREADS})
+    else:
+        import lightgbm
+
+        booster = lightgbm.Booster(model_file=str(directory / config["file"]))
+
+    with open(Path(version_path) / "pj.pkl", "rb") as file:
+        pj = pickle.load(file)
+    return NativeModel(pj, config, booster)
+
+
+def _native_booster(model: Any):
+    """Return the booster of an xgboost or lightgbm model and the start of its config, or (None, None)"""
+    try:
+        import xgboost
+
+        if isinstance(model, xgboost.XGBModel):
+            booster = model.get_booster()
+            return booster, {
+                "format": "xgboost-ubj",
+                "file": "model.ubj",
+                "feature_names": list(booster.feature_names),
+                # XGBRegressor.predict stops at the best iteration after early stopping
+                "best_iteration": getattr(model, "best_iteration", None),
+            }
+    except ImportError:
+        pass
+    try:
+        import lightgbm
+
+        if isinstance(model, lightgbm.LGBMModel):
+            # Saving keeps only the trees up to the best iteration, like LGBMRegressor.predict
+            booster = model.booster_
+            return booster, {"format": "lightgbm-text", "file": "model.txt", "feature_names": list(booster.feature_name())}
+    except ImportError:
+        pass
+    return None, None
+
+
+def _feature_importance(model: Any) -> Optional[pd.DataFrame]:
+    """The feature importance openstef weights input completeness with, if the model has one"""
+    try:
+        return model.feature_importance_dataframe
+    except Exception:
+        return None
+
+
+def _frame_to_json(frame: Any) -> Optional[Dict[str, Any]]:
+    """A DataFrame as JSON-serializable 'split' dict, None for anything else"""
+    if isinstance(frame, pd.DataFrame):
+        return json.loads(frame.to_json(orient="split"))
+    return None
+
+
+def _parity_sample(datasets: Optional[Sequence[pd.DataFrame]], feature_names: Sequence[str]) -> Optional[pd.DataFrame]:
+    """Feature rows of the validation set to compare native and model predictions on"""
+    if not datasets or len(datasets) != 3 or not isinstance(datasets[1], pd.DataFrame):
+        return None
+    if not set(feature_names) <= set(datasets[1].columns):
+        return None
+    return datasets[1][list(feature_names)].head(PARITY_ROWS)
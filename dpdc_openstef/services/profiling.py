@@ -0,0 +1,171 @@
+"""Opt-in cProfile profiling of single requests for administrators"""
+import asyncio
+import contextvars
+import cProfile
+import hmac
+import json
+import logging
+import os
+import pstats
+import selectors
+import threading
+import uuid
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+# Profiling is only available when enabled and an admin token is configured
+PROFILING_ENABLED = os.getenv("PROFILING_ENABLED", "0") == "1"
+PROFILING_ADMIN_TOKEN = os.getenv("PROFILING_ADMIN_TOKEN", "")
+PROFILE_DIR = Path("logs/profiles")
+# Number of functions in the summary, sorted by cumulative time
+PROFILE_TOP_N = 25
+
+# Event loop machinery and idle waiting for I/O, left out of summaries
+_LOOP_FILES = (os.path.dirname(asyncio.__file__), selectors.__file__)
+_IDLE_BUILTINS = ("select.", "_overlapped.")
+
+# Endpoints that may be profiled
+PROFILED_ROUTES = {"/api/generate-forecast", "/api/forecast-multiple", "/api/train"}
+
+# Profile of the request being handled in the current context, if any
+_current_profile: contextvars.ContextVar[Optional["RequestProfile"]] = contextvars.ContextVar(
+    "current_profile", default=None
+)
+# Only one request is profiled at a time: cProfile cannot tell concurrent requests apart
+_active_lock = threading.Lock()
+
+
+def is_profiling_authorized(token: Optional[str]) -> bool:
+    """Whether profiling is enabled and token matches the configured admin token"""
+    if not PROFILING_ENABLED or not PROFILING_ADMIN_TOKEN or not token:
+        return False
+    return hmac.compare_digest(token, PROFILING_ADMIN_TOKEN)
+
+
+def current_profile() -> Optional["RequestProfile"]:
+    """Return the profile of the request being handled, or None if it is not profiled"""
+    return _current_profile.get()
+
+
+class RequestProfile:
+    """
+    cProfile profile of one request, covering the event loop thread and every call the
+    request runs in the forecast worker pool.
+
+    Use as a context manager around the request handling. While it is active, other
+    coroutines running on the event loop are captured as well.
+    """
+
+    def __init__(self, route: str):
+        self.profile_id = uuid.uuid4().hex[:12]
+        self.route = route
+        self.started_at = datetime.now(timezone.utc)
+        self._profiles: List[cProfile.Profile] = []
+        self._lock = threading.Lock()
+        self._loop_profile: Optional[cProfile.Profile] = None
+        self._token: Optional[contextvars.Token] = None
+
+    def __enter__(self) -> "RequestProfile":
+        if not _active_lock.acquire(blocking=False):
+            raise RuntimeError("Another request is being profiled")
+        self._token = _current_profile.set(self)
+        self._loop_profile = cProfile.Profile()
+        try:
+            self._loop_profile.enable()
+        except ValueError:
+            _current_profile.reset(self._token)
+            _active_lock.release()
+            raise RuntimeError("Another profiler is already active in this process")
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self._loop_profile.disable()
+        self._add(self._loop_profile)
+        _current_profile.reset(self._token)
+        _active_lock.release()
+
+    def wrap(self, func: Callable[..., Any]) -> Callable[..., Any]:
+        """Wrap func so that its execution on another thread is added to this profile"""
+        def profiled(*args: Any, **kwargs: Any) -> Any:
+            profile = cProfile.Profile()
+            try:
+                profile.enable()
+            except ValueError:
+                # Python 3.12+ allows only one active profiler per process
+                return func(*args, **kwargs)
+            try:
+                return func(*args, **kwargs)
+            finally:
+                profile.disable()
+                self._add(profile)
+        return profiled
+
+    def save(self) -> Path:
+        """
+        Store the merged profile (.prof, readable with pstats or snakeviz) and its
+        summary (.json) under `PROFILE_DIR`
+
+        Returns:
+            Path of the .prof file
+        """
+        PROFILE_DIR.mkdir(parents=True, exist_ok=True)
+        route_name = self.route.strip("/").replace("/", "_")
+        base = PROFILE_DIR / f"{self.started_at:%Y%m%dT%H%M%S}_{route_name}_{self.profile_id}"
+
+        stats = self._stats()
+        stats.dump_stats(str(base.with_suffix(".prof")))
+        with open(base.with_suffix(".json"), "w") as file:
+            json.dump(self.summary(stats), file, indent=4)
+
+        logger.info("Profile of %s stored at %s.prof", self.route, base)
+        return base.with_suffix(".prof")
+
+    def summary(self, stats: Optional[pstats.Stats] = None, top_n: int = PROFILE_TOP_N) -> Dict[str, Any]:
+        """Return the top functions by cumulative time (without event loop idle time) and the profile metadata"""
+        stats = stats or self._stats()
+        rows = [
+            item for item in stats.stats.items()
+            if not item[0][0].startswith(_LOOP_FILES) and not any(marker in item[0][2] for marker in _IDLE_BUILTINS)
+        ]
+        rows = sorted(rows, key=lambda item: item[1][3], reverse=True)[:top_n]
+        return {
+            "profile_id": self.profile_id,
+            "route": self.route,
+            "started_at": self.started_at.isoformat(),
+            "total_time": round(stats.total_tt, 6),
+            "top_cumulative": [
+                {
+                    "function": f"{filename}:{line}({name})",
+                    "calls": calls,
+                    "total_time": round(total_time, 6),
+                    "cumulative_time": round(cumulative_time, 6),
+                }
+                for (filename, line, name), (_, calls, total_time, cumulative_time, _) in rows
+            ],
+        }
+
+    def _add(self, profile: cProfile.Profile) -> None:
+        with self._lock:
+            self._profiles.append(profile)
+
+    def _stats(self) -> pstats.Stats:
+        with self._lock:
+            profiles = list(self._profiles)
+        stats = pstats.Stats(profiles[0])
+        for profile in profiles[1:]:
+            stats.add(profile)
+        return stats
+
+
+def load_profile_summary(profile_id: str) -> Optional[Dict[str, Any]]:
+    """Return the stored summary of a profile, or None if it does not exist"""
+    if not profile_id.isalnum():
+        return None
+    matches = list(PROFILE_DIR.glob(f"*_{profile_id}.json"))
+    if not matches:
+        return None
+    with open(matches[0]) as file:
+        return json.load(file)
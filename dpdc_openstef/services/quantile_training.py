@@ -0,0 +1,146 @@
+"""Quantile regressors that fit their per-quantile models concurrently"""
+import logging
+import time
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from typing import Optional, Tuple
+
+import xgboost as xgb
+from sklearn.utils.validation import check_X_y
+
+import openstef.metrics.metrics as metrics
+from openstef.model.objective import XGBQuantileRegressorObjective
+from openstef.model.regressors.custom_regressor import CustomOpenstfRegressor
+from openstef.model.regressors.xgb_quantile import DEFAULT_QUANTILES, XGBQuantileOpenstfRegressor
+
+from services.worker_pool import TRAINING_THREADS
+
+logger = logging.getLogger(__name__)
+
+
+class ParallelXGBQuantileOpenstfRegressor(XGBQuantileOpenstfRegressor, CustomOpenstfRegressor):
+    """
+    openstef's xgb_quantile regressor, fitting the boosters of all quantiles at the same time
+
+    openstef trains one booster per quantile, one after another. Here they train in
+    threads (xgboost releases the GIL while building trees), each with an equal share
+    of the regressor's thread budget `n_jobs`, so the fits do not oversubscribe the
+    cores. Trained models are identical to openstef's and predict the same way.
+    """
+
+    def __init__(
+        self,
+        quantiles: Tuple[float, ...] = DEFAULT_QUANTILES,
+        gamma: float = 0.0,
+        colsample_bytree: float = 1.0,
+        subsample: float = 1.0,
+        min_child_weight: int = 1,
+        max_depth: int = 6,
+        learning_rate: float = 0.3,
+        alpha: float = 0.0,
+        max_delta_step: int = 0,
+        n_jobs: Optional[int] = None,
+    ):
+        """
+        Args:
+            quantiles, gamma, ..., max_delta_step: See `XGBQuantileOpenstfRegressor`
+            n_jobs: Threads for the whole fit, shared by the quantile models; None for
+                TRAINING_THREADS
+        """
+        super().__init__(
+            quantiles=quantiles,
+            gamma=gamma,
+            colsample_bytree=colsample_bytree,
+            subsample=subsample,
+            min_child_weight=min_child_weight,
+            max_depth=max_depth,
+            learning_rate=learning_rate,
+            alpha=alpha,
+            max_delta_step=max_delta_step,
+        )
+        self.n_jobs = n_jobs
+
+    @staticmethod
+    def valid_kwargs() -> list:
+        # The model kwargs openstef passes to xgb_quantile (so the same request trains the
+        # same model), except early_stopping_rounds, which the constructor does not take
+        return ["quantiles", "gamma", "colsample_bytree", "subsample", "min_child_weight", "max_depth", "n_jobs"]
+
+    @staticmethod
+    def objective():
+        return XGBQuantileRegressorObjective
+
+    def set_params(self, **params) -> "ParallelXGBQuantileOpenstfRegressor":
+        """Set parameters; a new `n_jobs` also applies to predictions of the fitted quantile models"""
+        super().set_params(**params)
+        if params.get("n_jobs") and getattr(self, "estimators_", None):
+            for booster in self.estimators_.values():
+                booster.set_param({"nthread": params["n_jobs"]})
+        return self
+
+    def fit(self, x, y, **kwargs) -> "ParallelXGBQuantileOpenstfRegressor":
+        """Fit one booster per quantile, concurrently; same arguments as `XGBQuantileOpenstfRegressor.fit`"""
+        early_stopping_rounds = kwargs.get("early_stopping_rounds", None)
+        eval_set = kwargs.get("eval_set", None)
+
+        check_X_y(x, y, force_all_finite="allow-nan")
+
+        parallel_fits, threads_per_fit = quantile_fit_plan(len(self.quantiles), self.n_jobs)
+        xgb_regressor_params = {
+            key: value
+            for key, value in self.get_params().items()
+            if key in xgb.XGBRegressor().get_params().keys() and key != "n_jobs"
+        }
+        xgb_regressor_params["nthread"] = threads_per_fit
+
+        def fit_quantile(quantile: float) -> xgb.Booster:
+            # Every fit gets its own DMatrix: xgboost builds its histogram cache into the
+            # matrix on first use, which must not happen from several threads at once
+            dtrain = xgb.DMatrix(x.copy(deep=True), label=y.copy(deep=True), nthread=threads_per_fit)
+            watchlist = ()
+            if eval_set:
+                dval = xgb.DMatrix(
+                    eval_set[1][0].copy(deep=True), label=eval_set[1][1].copy(deep=True), nthread=threads_per_fit
+                )
+                watchlist = [(dtrain, "train"), (dval, "validation")]
+            return xgb.train(
+                params=xgb_regressor_params,
+                dtrain=dtrain,
+                evals=watchlist,
+                num_boost_round=100,
+                obj=partial(metrics.xgb_quantile_obj, quantile=quantile),
+                feval=partial(metrics.xgb_quantile_eval, quantile=quantile),
+                verbose_eval=False,
+                early_stopping_rounds=early_stopping_rounds,
+            )
+
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=parallel_fits, thread_name_prefix="quantile-fit") as pool:
+            quantile_models = dict(zip(self.quantiles, pool.map(fit_quantile, self.quantiles)))
+        logger.info(
+            "Fitted %s quantile models in %.2fs (%s at a time, %s threads each)",
+            len(quantile_models), time.perf_counter() - started, parallel_fits, threads_per_fit,
+        )
+
+        # Same fitted state as XGBQuantileOpenstfRegressor.fit
+        self.feature_importances_ = self.get_feature_importances_from_booster(quantile_models[0.5])
+        self._Booster = quantile_models[0.5]
+        self.estimators_ = quantile_models
+        self.is_fitted_ = True
+        return self
+
+
+def quantile_fit_plan(quantile_count: int, n_jobs: Optional[int] = None) -> Tuple[int, int]:
+    """
+    Split a thread budget over concurrent quantile fits
+
+    Args:
+        quantile_count: Number of quantile models to fit
+        n_jobs: Threads available to the whole fit, None for TRAINING_THREADS
+
+    Returns:
+        Tuple of (fits running at the same time, threads per fit)
+    """
+    budget = n_jobs if n_jobs and n_jobs > 0 else TRAINING_THREADS
+    parallel_fits = max(1, min(quantile_count, budget))
+    return parallel_fits, max(1, budget // parallel_fits)
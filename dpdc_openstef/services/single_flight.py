@@ -0,0 +1,58 @@
+"""Coalescing of identical concurrent computations (single-flight)"""
+import asyncio
+import logging
+from typing import Any, Awaitable, Callable, Dict, Hashable
+
+from services.metrics import cache_requests
+
+logger = logging.getLogger(__name__)
+
+
+class SingleFlight:
+    """
+    Shares one in-flight computation between concurrent callers with the same key.
+
+    The first caller for a key starts the computation; callers arriving while it runs
+    await the same task and receive the same result (or exception). The key is released
+    as soon as the computation finishes, so later calls compute afresh.
+    """
+
+    def __init__(self, name: str):
+        self.name = name
+        self._inflight: Dict[Hashable, asyncio.Task] = {}
+
+    async def run(self, key: Hashable, func: Callable[[], Awaitable[Any]]) -> Any:
+        """
+        Run func() for key, or join the computation already running for key.
+
+        A caller that is cancelled stops waiting without cancelling the shared
+        computation, which other callers may still be waiting for.
+
+        Args:
+            key: Hashable identity of the computation
+            func: Coroutine function producing the result
+
+        Returns:
+            The result of the shared computation
+        """
+        task = self._inflight.get(key)
+        if task is None:
+            task = asyncio.ensure_future(func())
+            self._inflight[key] = task
+            task.add_done_callback(lambda done: self._release(key, done))
+            cache_requests.inc(cache=f"{self.name}_single_flight", result="miss")
+        else:
+            cache_requests.inc(cache=f"{self.name}_single_flight", result="hit")
+            logger.info("Joining in-flight %s computation for %s", self.name, key)
+        return await asyncio.shield(task)
+
+    def in_flight(self) -> int:
+        """Number of computations currently running"""
+        return len(self._inflight)
+
+    def _release(self, key: Hashable, task: asyncio.Task) -> None:
+        """Forget a finished computation and mark its exception as retrieved"""
+        if self._inflight.get(key) is task:
+            del self._inflight[key]
+        if not task.cancelled():
+            task.exception()
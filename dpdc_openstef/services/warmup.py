@@ -0,0 +1,97 @@
+"""Background warm-up of the application after the server starts accepting requests"""
+import asyncio
+import importlib
+import logging
+import os
+import time
+from datetime import datetime, timezone
+from typing import Any, Dict, List
+
+from services.forecast_scheduler import DHAKA_TZ, PRODUCTION_MODELS
+from services.master_data import get_master_data
+from services.model_cache import get_model
+from services.model_service import TRAINING_DATA_PATH, warm_up_model
+from services.weather_service import get_weather_for_date_async
+
+logger = logging.getLogger(__name__)
+
+# Set to 0 to skip the warm-up, e.g. for `uvicorn --reload` during development
+WARMUP_ENABLED = os.getenv("WARMUP_ENABLED", "1") != "0"
+# Comma-separated names of the models to load and warm up, defaults to the production models
+WARMUP_MODELS = [
+    name.strip() for name in os.getenv("WARMUP_MODELS", ",".join(PRODUCTION_MODELS)).split(",") if name.strip()
+]
+
+# Heavy modules that are otherwise imported on the first training, forecast or weather fetch
+HEAVY_MODULES = [
+    "openstef.pipeline.create_forecast",
+    "openstef.pipeline.train_model",
+    "meteostat",
+]
+
+# Progress of the warm-up, reported by the readiness endpoint
+_status: Dict[str, Any] = {
+    "state": "pending",
+    "steps": {},
+    "errors": [],
+    "started_at": None,
+    "finished_at": None,
+}
+
+
+def get_warmup_status() -> Dict[str, Any]:
+    """Return the warm-up progress: state ('pending', 'running' or 'ready'), step timings and errors"""
+    return _status
+
+
+def is_ready() -> bool:
+    """Whether the warm-up has finished and the worker should receive traffic"""
+    return _status["state"] == "ready"
+
+
+async def run_warmup(model_names: List[str] = WARMUP_MODELS) -> None:
+    """
+    Warm up the worker in the background: import heavy modules, load the master data,
+    prefetch today's weather, load the given models and run one dummy forecast per model.
+
+    Failing steps are logged and recorded but do not stop the warm-up; the worker is
+    reported ready once all steps ran.
+
+    Args:
+        model_names: Names of the models to load and warm up
+    """
+    _status.update(state="running", started_at=datetime.now(timezone.utc).isoformat())
+    if not WARMUP_ENABLED:
+        logger.info("Warm-up disabled")
+    else:
+        for module in HEAVY_MODULES:
+            await _run_step(f"import {module}", importlib.import_module, module)
+
+        await _run_step("master data", get_master_data, TRAINING_DATA_PATH)
+        await _run_step("weather", get_weather_for_date_async, datetime.now(DHAKA_TZ))
+
+        for name in model_names:
+            if await _run_step(f"load model {name}", get_model, name):
+                await _run_step(f"dummy forecast {name}", warm_up_model, name)
+
+    _status.update(state="ready", finished_at=datetime.now(timezone.utc).isoformat())
+    logger.info("Warm-up finished with %s error(s)", len(_status['errors']))
+
+
+async def _run_step(name: str, func, *args) -> bool:
+    """Run one warm-up step (in a worker thread unless it is a coroutine function), record it and return whether it succeeded"""
+    started = time.perf_counter()
+    try:
+        if asyncio.iscoroutinefunction(func):
+            await func(*args)
+        else:
+            await asyncio.to_thread(func, *args)
+        return True
+    except Exception as e:
+        logger.warning("Warm-up step '%s' failed: %s", name, e)
+        _status["errors"].append({"step": name, "error": str(e)})
+        return False
+    finally:
+        elapsed = round(time.perf_counter() - started, 3)
+        _status["steps"][name] = elapsed
+        logger.info("Warm-up step '%s' took %ss", name, elapsed)
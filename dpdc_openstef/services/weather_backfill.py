@@ -0,0 +1,151 @@
+"""Background job for backfilling weather columns of the master dataset"""
+import logging
+import os
+import uuid
+from datetime import datetime, timezone
+from typing import Any, Dict, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from services.master_data import (
+    MASTER_COLUMNS,
+    master_data_lock,
+    read_master_data,
+    update_master_rows,
+    write_master_data,
+)
+from services.weather_service import WEATHER_COLUMNS, WeatherService, get_weather_for_range
+
+logger = logging.getLogger(__name__)
+
+# Maximum number of days a single backfill job may cover
+MAX_BACKFILL_DAYS = 366
+
+# Time a finished job's status is kept for polling
+BACKFILL_JOB_TTL_SECONDS = float(os.getenv("BACKFILL_JOB_TTL_SECONDS", "3600"))
+
+# Status of submitted backfill jobs, keyed by job id
+_jobs: Dict[str, Dict[str, Any]] = {}
+
+
+def create_backfill_job(start_date: str, end_date: str) -> str:
+    """
+    Validate a backfill range and register a pending job for it.
+
+    Args:
+        start_date: First day to backfill in format 'YYYY-MM-DD'
+        end_date: Last day to backfill in format 'YYYY-MM-DD'
+
+    Returns:
+        Id of the registered job
+
+    Raises:
+        ValueError: If the dates are malformed or the range is invalid
+    """
+    start = datetime.strptime(start_date, '%Y-%m-%d')
+    end = datetime.strptime(end_date, '%Y-%m-%d')
+    if end < start:
+        raise ValueError("End date cannot be before start date.")
+    if (end - start).days >= MAX_BACKFILL_DAYS:
+        raise ValueError(f"Backfill range cannot exceed {MAX_BACKFILL_DAYS} days.")
+
+    _evict_finished_jobs()
+    job_id = uuid.uuid4().hex
+    _jobs[job_id] = {
+        "job_id": job_id,
+        "status": "pending",
+        "start_date": start_date,
+        "end_date": end_date,
+        "rows_updated": 0,
+        "rows_created": 0,
+        "error": None,
+        "submitted_at": datetime.now(timezone.utc).isoformat(),
+        "finished_at": None,
+    }
+    return job_id
+
+
+def get_backfill_job(job_id: str) -> Optional[Dict[str, Any]]:
+    """Return the status of a backfill job, or None if it is unknown or expired"""
+    _evict_finished_jobs()
+    return _jobs.get(job_id)
+
+
+def _evict_finished_jobs() -> None:
+    """Drop jobs that finished more than BACKFILL_JOB_TTL_SECONDS ago"""
+    cutoff = datetime.now(timezone.utc).timestamp() - BACKFILL_JOB_TTL_SECONDS
+    for job_id, job in list(_jobs.items()):
+        if job["finished_at"] is not None and datetime.fromisoformat(job["finished_at"]).timestamp() < cutoff:
+            del _jobs[job_id]
+
+
+def run_backfill_job(job_id: str) -> None:
+    """
+    Execute a registered backfill job. Intended to run as a background task.
+
+    Args:
+        job_id: Id returned by `create_backfill_job`
+    """
+    job = _jobs[job_id]
+    job["status"] = "running"
+    try:
+        start = datetime.strptime(job["start_date"], '%Y-%m-%d')
+        end = datetime.strptime(job["end_date"], '%Y-%m-%d')
+        rows_updated, rows_created = backfill_weather(start, end)
+        job.update(status="completed", rows_updated=rows_updated, rows_created=rows_created)
+    except Exception as e:
+        logger.error("Weather backfill job %s failed: %s", job_id, e, exc_info=True)
+        job.update(status="failed", error=str(e))
+    finally:
+        job["finished_at"] = datetime.now(timezone.utc).isoformat()
+
+
+def backfill_weather(start_date: datetime, end_date: datetime) -> Tuple[int, int]:
+    """
+    Fetch weather for a date range in one request and upsert it into the master dataset.
+
+    Existing rows get their weather columns overwritten; hours that are missing from the
+    master dataset are created with NaN load and zero holiday flags. Hours for which
+    Meteostat returned no observation at all are left untouched.
+
+    Args:
+        start_date: First day of the range (inclusive)
+        end_date: Last day of the range (inclusive)
+
+    Returns:
+        Tuple of (rows_updated, rows_created)
+    """
+    fetched = get_weather_for_range(start_date, end_date)
+    fetched = fetched.dropna(how='all')
+    if fetched.empty:
+        logger.warning("No weather data available from %s to %s", start_date.date(), end_date.date())
+        return 0, 0
+
+    weather = WeatherService.to_master_layout(fetched)
+    # Meteostat timestamps are naive UTC, the master data index is UTC-aware
+    weather.index = weather.index.tz_localize('UTC')
+
+    with master_data_lock:
+        master = read_master_data()
+        master = master[master.index.notna() & ~master.index.duplicated(keep='first')]
+
+        existing = weather.index.isin(master.index)
+        rows_updated = int(existing.sum())
+        rows_created = len(weather) - rows_updated
+
+        update_master_rows(master, weather.loc[existing, WEATHER_COLUMNS])
+
+        if rows_created:
+            new_rows = pd.DataFrame(np.nan, index=weather.index[~existing], columns=MASTER_COLUMNS)
+            new_rows[['is_holiday', 'holiday_type', 'national_event_type']] = 0
+            new_rows[WEATHER_COLUMNS] = weather.loc[~existing, WEATHER_COLUMNS]
+            master = pd.concat([master, new_rows.reindex(columns=master.columns)]).sort_index()
+
+        write_master_data(master)
+
+    logger.info(
+        "Weather backfill from %s to %s done. Updated: %s, Created: %s",
+        start_date.date(), end_date.date(), rows_updated, rows_created
+    )
+    return rows_updated, rows_created
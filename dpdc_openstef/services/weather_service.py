@@ -1,12 +1,33 @@
 """Weather Service for fetching weather data from Meteostat"""
+import asyncio
 import logging
-from datetime import datetime, timedelta
-from typing import Dict, List, Optional
+import os
+import threading
+import time
+from collections import OrderedDict
+from datetime import date as date_type, datetime, timedelta, timezone
+from typing import Dict, List, Optional, Tuple
 import pandas as pd
-from meteostat import Point, Hourly
+
+from services.metrics import cache_requests, forecast_stage_seconds
 
 logger = logging.getLogger(__name__)
 
+# Weather columns of the master dataset, in file order
+WEATHER_COLUMNS = ['temp', 'dwpt', 'rhum', 'prcp', 'wdir', 'wspd', 'pres', 'coco']
+
+DHAKA_TZ = timezone(timedelta(hours=6))
+
+# Deadline for a weather fetch on the request path before falling back to cached values
+WEATHER_FETCH_TIMEOUT_SECONDS = float(os.getenv("WEATHER_FETCH_TIMEOUT_SECONDS", "3"))
+# Age after which a cached day of weather is refreshed
+WEATHER_CACHE_TTL_SECONDS = float(os.getenv("WEATHER_CACHE_TTL_SECONDS", "1800"))
+# Days of weather kept in the cache, least recently used first out; backtests over long
+# ranges would otherwise add one day per date for the life of the process
+WEATHER_CACHE_DAYS = int(os.getenv("WEATHER_CACHE_DAYS", "64"))
+# Interval of the background prefetch of today's and tomorrow's weather
+WEATHER_PREFETCH_INTERVAL_SECONDS = float(os.getenv("WEATHER_PREFETCH_INTERVAL_SECONDS", "900"))
+
 
 class WeatherService:
     """Service for fetching weather data from Meteostat"""
@@ -18,8 +39,21 @@ class WeatherService:
     
     def __init__(self):
         """Initialize the weather service with Dhaka location"""
-        self.location = Point(self.DHAKA_LAT, self.DHAKA_LON, self.DHAKA_ALT)
-        logger.info(f"Weather service initialized for Dhaka (lat={self.DHAKA_LAT}, lon={self.DHAKA_LON})")
+        # Meteostat is imported on the first fetch, see `location`
+        self._location = None
+        # Successfully fetched days, keyed by date: (monotonic fetch time, hourly weather),
+        # the most recently used last
+        self._cache: "OrderedDict[date_type, Tuple[float, List[Dict[str, float]]]]" = OrderedDict()
+        self._cache_lock = threading.Lock()
+        logger.info("Weather service initialized for Dhaka (lat=%s, lon=%s)", self.DHAKA_LAT, self.DHAKA_LON)
+    
+    @property
+    def location(self):
+        """Meteostat Point of Dhaka, created (and meteostat imported) on first use"""
+        if self._location is None:
+            from meteostat import Point
+            self._location = Point(self.DHAKA_LAT, self.DHAKA_LON, self.DHAKA_ALT)
+        return self._location
     
     def get_hourly_weather_data(self, date: datetime) -> List[Dict[str, float]]:
         """
@@ -41,52 +75,191 @@ class WeatherService:
                 - coco: Weather condition code
         """
         try:
-            # Ensure we're working with a date at midnight
-            start_date = date.replace(hour=0, minute=0, second=0, microsecond=0)
-            # End date is the next day at midnight (to get full 24 hours)
-            end_date = start_date + timedelta(days=1)
-            
-            logger.info(f"Fetching weather data for Dhaka from {start_date} to {end_date}")
-            
-            # Fetch hourly data from Meteostat
-            data = Hourly(self.location, start_date, end_date)
-            df = data.fetch()
-            
-            if df.empty:
-                logger.warning(f"No weather data found for date {date.date()}. Using default values.")
+            weather_data = self._fetch_hourly_weather_data(date)
+            if weather_data is None:
+                logger.warning("No weather data found for date %s. Using default values.", date.date())
                 return self._get_default_weather_data()
-            
-            # Convert DataFrame to list of dictionaries
-            weather_data = []
-            for hour in range(24):
-                hour_timestamp = start_date + timedelta(hours=hour)
-                
-                # Try to find data for this specific hour
-                if hour_timestamp in df.index:
-                    row = df.loc[hour_timestamp]
-                    weather_data.append({
-                        'temp': float(row['temp']) if pd.notna(row['temp']) else 0.0,
-                        'dwpt': float(row['dwpt']) if pd.notna(row['dwpt']) else 0.0,
-                        'rhum': float(row['rhum']) if pd.notna(row['rhum']) else 0.0,
-                        'prcp': float(row['prcp']) if pd.notna(row['prcp']) else 0.0,
-                        'wdir': float(row['wdir']) if pd.notna(row['wdir']) else 0.0,
-                        'wspd': float(row['wspd']) if pd.notna(row['wspd']) else 0.0,
-                        'pres': float(row['pres']) if pd.notna(row['pres']) else 0.0,
-                        'coco': int(row['coco']) if pd.notna(row['coco']) else 0
-                    })
-                else:
-                    # If data for this hour is missing, use zeros
-                    logger.warning(f"Missing weather data for hour {hour} on {date.date()}")
-                    weather_data.append(self._get_default_hour_weather())
-            
-            logger.info(f"Successfully fetched weather data for {len(weather_data)} hours")
             return weather_data
             
         except Exception as e:
-            logger.error(f"Error fetching weather data for date {date.date()}: {str(e)}")
+            logger.error("Error fetching weather data for date %s: %s", date.date(), e)
             logger.exception(e)
             return self._get_default_weather_data()
     
+    async def get_hourly_weather_data_async(
+        self, 
+        date: datetime, 
+        timeout: float = WEATHER_FETCH_TIMEOUT_SECONDS
+    ) -> List[Dict[str, float]]:
+        """
+        Non-blocking variant of `get_hourly_weather_data` for the request path.
+        
+        A fresh cached day is returned immediately. Otherwise Meteostat is queried in a
+        worker thread under a strict deadline; if that times out or fails, the cached
+        (possibly stale) values for the date, the last known day before it, or default
+        values are returned, in that order. A timed out fetch keeps running in the
+        background and still fills the cache when it completes.
+        
+        Args:
+            date: The target date (datetime object)
+            timeout: Maximum number of seconds to wait for Meteostat
+            
+        Returns:
+            List of dictionaries containing hourly weather data for 24 hours
+        """
+        cached = self.get_cached_weather(date, max_age=WEATHER_CACHE_TTL_SECONDS)
+        if cached is not None:
+            cache_requests.inc(cache="weather", result="hit")
+            logger.debug("Using cached weather data for %s", date.date())
+            return cached
+        cache_requests.inc(cache="weather", result="miss")
+        
+        try:
+            weather_data = await asyncio.wait_for(
+                asyncio.to_thread(self._fetch_hourly_weather_data, date), 
+                timeout=timeout
+            )
+            if weather_data is not None:
+                return weather_data
+            logger.warning("No weather data found for date %s. Falling back to last known values.", date.date())
+        except asyncio.TimeoutError:
+            logger.warning("Weather fetch for %s exceeded %ss. Falling back to last known values.", date.date(), timeout)
+        except Exception as e:
+            logger.error("Error fetching weather data for date %s: %s", date.date(), e)
+        
+        return self._get_fallback_weather_data(date)
+    
+    def get_cached_weather(self, date: datetime, max_age: Optional[float] = None) -> Optional[List[Dict[str, float]]]:
+        """
+        Return cached weather for a date, or None if it is not cached or older than max_age.
+        
+        Args:
+            date: The target date (datetime object)
+            max_age: Maximum age in seconds, None to accept any age
+        """
+        with self._cache_lock:
+            entry = self._cache.get(date.date())
+            if entry is not None:
+                self._cache.move_to_end(date.date())
+        if entry is None:
+            return None
+        fetched_at, weather_data = entry
+        if max_age is not None and time.monotonic() - fetched_at > max_age:
+            return None
+        return weather_data
+    
+    def prefetch_weather(self, days_ahead: int = 1) -> None:
+        """
+        Warm the cache with today's weather (Dhaka date) and the next `days_ahead` days.
+        
+        All days are fetched with a single Meteostat request.
+        
+        Args:
+            days_ahead: Number of days after today to prefetch
+        """
+        today = datetime.now(DHAKA_TZ).replace(tzinfo=None, hour=0, minute=0, second=0, microsecond=0)
+        last_day = today + timedelta(days=days_ahead)
+        df = self.get_weather_for_range(today, last_day)
+        
+        for day, day_df in df.groupby(df.index.date):
+            if day_df.dropna(how='all').empty:
+                logger.debug("No weather data available yet for %s", day)
+                continue
+            self._store(day, self.to_master_layout(day_df).to_dict(orient='records'))
+        logger.info("Prefetched weather data from %s to %s", today.date(), last_day.date())
+    
+    def _fetch_hourly_weather_data(self, date: datetime) -> Optional[List[Dict[str, float]]]:
+        """
+        Fetch one day of weather data and store it in the cache.
+        
+        Returns:
+            Hourly weather for 24 hours, or None if Meteostat has no data for the date
+        """
+        # Ensure we're working with a date at midnight
+        start_date = date.replace(hour=0, minute=0, second=0, microsecond=0)
+        df = self.get_weather_for_range(start_date, start_date)
+        
+        if df.dropna(how='all').empty:
+            return None
+        
+        missing_hours = df.index[df.isna().all(axis=1)].hour.tolist()
+        if missing_hours:
+            # If data for an hour is missing, use zeros
+            logger.warning("Missing weather data for hours %s on %s", missing_hours, date.date())
+        
+        weather_data = self.to_master_layout(df).to_dict(orient='records')
+        self._store(start_date.date(), weather_data)
+        logger.info("Successfully fetched weather data for %s hours", len(weather_data))
+        return weather_data
+    
+    def _store(self, day: date_type, weather_data: List[Dict[str, float]]) -> None:
+        """Store one day of weather data in the cache, evicting the least recently used days beyond WEATHER_CACHE_DAYS"""
+        with self._cache_lock:
+            self._cache[day] = (time.monotonic(), weather_data)
+            self._cache.move_to_end(day)
+            while len(self._cache) > max(1, WEATHER_CACHE_DAYS):
+                self._cache.popitem(last=False)
+    
+    def _get_fallback_weather_data(self, date: datetime) -> List[Dict[str, float]]:
+        """Return cached weather for the date regardless of age, else the last known earlier day, else defaults"""
+        with self._cache_lock:
+            known_days = [day for day in self._cache if day <= date.date()]
+            if known_days:
+                day = max(known_days)
+                self._cache.move_to_end(day)
+                logger.info("Using last known weather data from %s for %s", day, date.date())
+                return self._cache[day][1]
+        
+        logger.warning("No cached weather data available for %s. Using default values.", date.date())
+        return self._get_default_weather_data()
+    
+    def get_weather_for_range(self, start_date: datetime, end_date: datetime) -> pd.DataFrame:
+        """
+        Fetch hourly weather data for a whole date range with a single Meteostat request.
+        
+        Args:
+            start_date: First day of the range (inclusive)
+            end_date: Last day of the range (inclusive, all 24 hours are fetched)
+            
+        Returns:
+            DataFrame indexed by every naive hourly timestamp of the range with
+            `WEATHER_COLUMNS` as columns. Hours without observations are NaN.
+            
+        Raises:
+            ValueError: If end_date is before start_date
+        """
+        start = start_date.replace(hour=0, minute=0, second=0, microsecond=0, tzinfo=None)
+        end = end_date.replace(hour=23, minute=0, second=0, microsecond=0, tzinfo=None)
+        if end < start:
+            raise ValueError(f"End date {end_date.date()} is before start date {start_date.date()}")
+        
+        from meteostat import Hourly
+        
+        logger.info("Fetching weather data for Dhaka from %s to %s", start, end)
+        df = Hourly(self.location, start, end).fetch()
+        
+        # Align to the full hourly grid so missing hours show up as NaN rows
+        hourly_index = pd.date_range(start, end, freq='h')
+        return df.reindex(index=hourly_index, columns=WEATHER_COLUMNS)
+    
+    @staticmethod
+    def to_master_layout(df: pd.DataFrame) -> pd.DataFrame:
+        """
+        Convert fetched weather data to the master-data column layout.
+        
+        Missing values are replaced with the same defaults as `_get_default_hour_weather`
+        and `coco` is cast to an integer condition code.
+        
+        Args:
+            df: Frame as returned by `get_weather_for_range`
+            
+        Returns:
+            DataFrame with `WEATHER_COLUMNS` and the same index
+        """
+        converted = df.reindex(columns=WEATHER_COLUMNS).astype(float).fillna(0.0)
+        converted['coco'] = converted['coco'].astype(int)
+        return converted
+    
     def _get_default_hour_weather(self) -> Dict[str, float]:
         """Return default weather values for a single hour"""
         return {
@@ -105,8 +278,19 @@ class WeatherService:
         return [self._get_default_hour_weather() for _ in range(24)]
 
 
-# Create a singleton instance
-weather_service = WeatherService()
+# Singleton instance, created on first use
+_weather_service: Optional[WeatherService] = None
+_weather_service_lock = threading.Lock()
+
+
+def get_weather_service() -> WeatherService:
+    """Return the shared WeatherService, creating it on first use"""
+    global _weather_service
+    if _weather_service is None:
+        with _weather_service_lock:
+            if _weather_service is None:
+                _weather_service = WeatherService()
+    return _weather_service
 
 
 def get_weather_for_date(date: datetime) -> List[Dict[str, float]]:
@@ -119,5 +303,48 @@ def get_weather_for_date(date: datetime) -> List[Dict[str, float]]:
     Returns:
         List of dictionaries containing hourly weather data for 24 hours
     """
-    return weather_service.get_hourly_weather_data(date)
+    return get_weather_service().get_hourly_weather_data(date)
+
+
+async def get_weather_for_date_async(date: datetime) -> List[Dict[str, float]]:
+    """
+    Convenience function to get weather data for a date without blocking the event loop.
+    
+    Args:
+        date: The target date (datetime object)
+        
+    Returns:
+        List of dictionaries containing hourly weather data for 24 hours
+    """
+    with forecast_stage_seconds.time(stage="weather_fetch"):
+        return await get_weather_service().get_hourly_weather_data_async(date)
+
 
+async def run_weather_prefetch(interval_seconds: float = WEATHER_PREFETCH_INTERVAL_SECONDS) -> None:
+    """
+    Periodically prefetch today's and tomorrow's weather so the realtime forecast path
+    is normally served from the cache. Runs until cancelled.
+    
+    Args:
+        interval_seconds: Seconds between two prefetches
+    """
+    while True:
+        try:
+            await asyncio.to_thread(get_weather_service().prefetch_weather)
+        except Exception as e:
+            logger.error("Weather prefetch failed: %s", e)
+        await asyncio.sleep(interval_seconds)
+
+
+def get_weather_for_range(start_date: datetime, end_date: datetime) -> pd.DataFrame:
+    """
+    Convenience function to get weather data for a range of dates in one fetch.
+    
+    Args:
+        start_date: First day of the range (inclusive)
+        end_date: Last day of the range (inclusive)
+        
+    Returns:
+        DataFrame with hourly weather data, NaN for hours without observations
+    """
+    return get_weather_service().get_weather_for_range(start_date, end_date)
@@ -0,0 +1,102 @@
+"""Shared thread pools for CPU-heavy forecasting and training work"""
+import asyncio
+import contextvars
+import functools
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable
+
+from services.cpu_budget import cpu_budget
+from services.metrics import Gauge
+from services.profiling import current_profile
+
+# Number of model pipelines that may run at the same time
+FORECAST_WORKERS = int(os.getenv("FORECAST_WORKERS", str(min(4, cpu_budget.total))))
+
+# Number of models that may train at the same time; kept apart so training never starves forecasts
+TRAINING_WORKERS = int(os.getenv("TRAINING_WORKERS", str(min(2, cpu_budget.total))))
+
+# xgboost/lightgbm threads of one training and of one forecast, shares of the CPU budget
+TRAINING_THREADS = int(os.getenv("TRAINING_THREADS", str(max(1, cpu_budget.total // TRAINING_WORKERS))))
+FORECAST_THREADS = int(os.getenv("FORECAST_THREADS", str(max(1, cpu_budget.total // FORECAST_WORKERS))))
+
+_executor = ThreadPoolExecutor(max_workers=FORECAST_WORKERS, thread_name_prefix="forecast")
+_training_executor = ThreadPoolExecutor(max_workers=TRAINING_WORKERS, thread_name_prefix="training")
+
+# Calls submitted to the pool that have not started yet, and calls currently running
+_counts = {"queued": 0, "active": 0}
+_counts_lock = threading.Lock()
+
+Gauge("forecast_pool_queue_depth", "Forecast worker pool calls waiting for a thread", callback=lambda: _counts["queued"])
+Gauge("forecast_pool_active", "Forecast worker pool calls currently running", callback=lambda: _counts["active"])
+
+
+async def run_in_worker(func: Callable[..., Any], *args: Any, **kwargs: Any) -> Any:
+    """
+    Run a blocking function in the forecast worker pool without blocking the event loop.
+
+    The caller's context variables are propagated to the worker thread.
+
+    Args:
+        func: Function to call
+        *args: Positional arguments for func
+        **kwargs: Keyword arguments for func
+
+    Returns:
+        The return value of func
+    """
+    loop = asyncio.get_running_loop()
+    profile = current_profile()
+    if profile is not None:
+        func = profile.wrap(func)
+    context = contextvars.copy_context()
+    call = functools.partial(context.run, func, *args, **kwargs)
+    # Tracks whether the call left the queue, so a call cancelled while queued is not counted forever
+    state = {"started": False, "cancelled": False}
+    with _counts_lock:
+        _counts["queued"] += 1
+    try:
+        return await loop.run_in_executor(_executor, _tracked, call, state)
+    finally:
+        with _counts_lock:
+            if not state["started"]:
+                state["cancelled"] = True
+                _counts["queued"] -= 1
+
+
+async def run_in_training_worker(func: Callable[..., Any], *args: Any, **kwargs: Any) -> Any:
+    """
+    Run a model training function in the training pool without blocking the event loop.
+
+    Like `run_in_worker`, the caller's context variables are propagated to the thread.
+
+    Args:
+        func: Function to call
+        *args: Positional arguments for func
+        **kwargs: Keyword arguments for func
+
+    Returns:
+        The return value of func
+    """
+    loop = asyncio.get_running_loop()
+    profile = current_profile()
+    if profile is not None:
+        func = profile.wrap(func)
+    context = contextvars.copy_context()
+    return await loop.run_in_executor(_training_executor, functools.partial(context.run, func, *args, **kwargs))
+
+
+def _tracked(call: Callable[[], Any], state: dict) -> Any:
+    """Run call on a pool thread, moving it from the queued to the active count"""
+    with _counts_lock:
+        if state["cancelled"]:
+            return None
+        state["started"] = True
+        _counts["queued"] -= 1
+        _counts["active"] += 1
+    try:
+        return call()
+    finally:
+        with _counts_lock:
+            _counts["active"] -= 1
@@ -34,3 +34,60 @@ function initializeCommonDropdowns() {
     populateNationEventDropdown('nation_event');
 }
 
+
+/**
+ * POST a form to a Server-Sent Events endpoint and invoke a callback for every event
+ * @param {string} url - The streaming endpoint
+ * @param {FormData} formData - The form data to send
+ * @param {function(string, object)} onEvent - Called with the event name and parsed data
+ * @returns {Promise} Resolves when the stream ends, rejects with the server's error message
+ */
+async function postEventStream(url, formData, onEvent) {
+    const response = await fetch(url, {
+        method: 'POST',
+        body: formData
+    });
+
+    if (!response.ok) {
+        let message = `HTTP error! status: ${response.status}`;
+        try {
+            const errorData = await response.json();
+            message = errorData.error || message;
+        } catch (parseError) {
+            // Keep the generic message
+        }
+        throw new Error(message);
+    }
+
+    const reader = response.body.getReader();
+    const decoder = new TextDecoder();
+    let buffer = '';
+
+    while (true) {
+        const { done, value } = await reader.read();
+        if (done) {
+            break;
+        }
+        buffer += decoder.decode(value, { stream: true });
+
+        // Events are separated by a blank line
+        let separatorIdx;
+        while ((separatorIdx = buffer.indexOf('\n\n')) !== -1) {
+            const rawEvent = buffer.slice(0, separatorIdx);
+            buffer = buffer.slice(separatorIdx + 2);
+
+            let eventName = 'message';
+            const dataLines = [];
+            rawEvent.split('\n').forEach(line => {
+                if (line.startsWith('event:')) {
+                    eventName = line.slice(6).trim();
+                } else if (line.startsWith('data:')) {
+                    dataLines.push(line.slice(5).trim());
+                }
+            });
+            if (dataLines.length > 0) {
+                onEvent(eventName, JSON.parse(dataLines.join('\n')));
+            }
+        }
+    }
+}
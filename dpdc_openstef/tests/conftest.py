@@ -0,0 +1,5 @@
+"""Test configuration: import the app's packages from the dpdc_openstef directory"""
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
@@ -0,0 +1,74 @@
+"""Tests of the weather backfill and data input upserts into the master CSV"""
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from routes import data_input
+from services import weather_backfill
+from services.master_data import MASTER_COLUMNS, MASTER_DATA_PATH, read_master_data
+from services.weather_service import WEATHER_COLUMNS
+
+
+@pytest.fixture
+def master_csv(tmp_path, monkeypatch):
+    """Master CSV of 2025-01-01 00:00-02:00 UTC whose weather columns parse as int64"""
+    monkeypatch.chdir(tmp_path)
+    MASTER_DATA_PATH.parent.mkdir(parents=True)
+    index = pd.date_range("2025-01-01 00:00", periods=3, freq="h", tz="UTC", name="date_time")
+    master = pd.DataFrame({column: np.arange(3, dtype=np.int64) for column in MASTER_COLUMNS}, index=index)
+    master.to_csv(MASTER_DATA_PATH)
+    assert (read_master_data(MASTER_DATA_PATH)[WEATHER_COLUMNS].dtypes == np.int64).all()
+    return MASTER_DATA_PATH
+
+
+def test_backfill_writes_float_weather_into_integer_columns(master_csv, monkeypatch):
+    # 01:00-03:00 UTC: two existing hours and one new hour
+    index = pd.date_range("2025-01-01 01:00", periods=3, freq="h", name="time")
+    fetched = pd.DataFrame({column: [15.3, 16.0, 17.5] for column in WEATHER_COLUMNS}, index=index)
+    monkeypatch.setattr(weather_backfill, "get_weather_for_range", lambda start, end: fetched)
+
+    assert weather_backfill.backfill_weather(datetime(2025, 1, 1), datetime(2025, 1, 1)) == (2, 1)
+
+    master = read_master_data(master_csv)
+    assert len(master) == 4
+    assert master["temp"].tolist() == [0.0, 15.3, 16.0, 17.5]
+    # coco is an integer condition code
+    assert master["coco"].tolist()[1:] == [15, 16, 17]
+    # Columns the backfill does not touch keep their values
+    assert master["load"].tolist()[:3] == [0, 1, 2]
+
+
+def test_data_input_keeps_whole_numbers_integer(master_csv):
+    weather = [{column: 20.5 if column == "temp" else 30 for column in WEATHER_COLUMNS} for _ in range(24)]
+    data = [{"timestamp": "2025-01-01 01:00:00+00:00", "load": 812.5, "forecasted_load": 800}]
+
+    assert data_input._apply_hourly_data(data, weather, 1, 2, 0) == (1, 0)
+
+    master = read_master_data(master_csv)
+    row = master.loc[pd.Timestamp("2025-01-01 01:00", tz="UTC")]
+    assert row["load"] == 812.5
+    assert row["temp"] == 20.5
+    assert row["is_holiday"] == 1
+    # Whole numbers do not turn the integer columns into floats
+    assert master["rhum"].dtype == np.int64
+    assert master["forecasted_load"].tolist() == [0, 800, 2]
+
+
+def test_data_input_keeps_rows_with_unparseable_timestamps(master_csv):
+    with open(master_csv, "a") as file:
+        file.write("not a time," + ",".join("1" for _ in MASTER_COLUMNS) + "\n")
+    weather = [{column: 25 for column in WEATHER_COLUMNS} for _ in range(24)]
+    data = [
+        {"timestamp": "2025-01-01 02:00:00+00:00", "load": 900, "forecasted_load": 910},
+        {"timestamp": "2025-01-01 03:00:00+00:00", "load": 950, "forecasted_load": 960},
+    ]
+
+    assert data_input._apply_hourly_data(data, weather, 0, 0, 0) == (1, 1)
+
+    with open(master_csv) as file:
+        lines = file.read().splitlines()
+    assert len(lines) == 1 + 4 + 1
+    assert lines[-1].startswith("not a time,")
+    assert lines[3].startswith("2025-01-01 02:00:00+00:00,900,")
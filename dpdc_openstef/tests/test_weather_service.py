@@ -0,0 +1,20 @@
+"""Tests of the per-day weather cache"""
+from datetime import date, datetime, timedelta
+
+from services import weather_service
+from services.weather_service import WeatherService
+
+
+def test_weather_cache_evicts_least_recently_used_days(monkeypatch):
+    monkeypatch.setattr(weather_service, "WEATHER_CACHE_DAYS", 3)
+    service = WeatherService()
+    first = date(2025, 1, 1)
+    for offset in range(3):
+        service._store(first + timedelta(days=offset), [{"temp": float(offset)}])
+
+    # Reading the first day makes the second one the least recently used
+    assert service.get_cached_weather(datetime(2025, 1, 1)) == [{"temp": 0.0}]
+    service._store(date(2025, 1, 4), [{"temp": 3.0}])
+
+    assert list(service._cache) == [date(2025, 1, 3), date(2025, 1, 1), date(2025, 1, 4)]
+    assert service.get_cached_weather(datetime(2025, 1, 2)) is None
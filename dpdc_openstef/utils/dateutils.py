@@ -1,6 +1,8 @@
 """Date utility functions for the application"""
 from datetime import datetime, timezone
 
+import pandas as pd
+
 
 def create_utc_datetime(date_str: str, hour_int: int, to_timezone: timezone = timezone.utc) -> datetime:
     """
@@ -16,3 +18,19 @@ def create_utc_datetime(date_str: str, hour_int: int, to_timezone: timezone = ti
     dt_naive = datetime.strptime(date_str, '%Y-%m-%d')
     dt_aware_utc = dt_naive.replace(hour=hour_int, minute=0, second=0, microsecond=0, tzinfo=to_timezone)
     return dt_aware_utc
+
+
+def hourly_index(date_str: str, start_hour: int = 0, end_hour: int = 23, to_timezone: timezone = timezone.utc) -> pd.DatetimeIndex:
+    """
+    Create the hourly time grid of a day in one vectorized call
+    
+    Args:
+        date_str: Date string in format 'YYYY-MM-DD'
+        start_hour: First hour of the grid (0-23)
+        end_hour: Last hour of the grid, inclusive (0-23). The grid is empty if it is before start_hour
+        to_timezone: timezone of the date
+    Returns:
+        pd.DatetimeIndex: Hourly timestamps from start_hour to end_hour of the given date
+    """
+    start = create_utc_datetime(date_str, start_hour, to_timezone)
+    return pd.date_range(start, periods=max(end_hour - start_hour + 1, 0), freq='h')
@@ -1,48 +1,206 @@
 """Centralized logging configuration for the application"""
+import atexit
 import logging
+import logging.handlers
+import os
+import queue
 import sys
+import threading
+import time
 from pathlib import Path
-from typing import Optional
+from typing import Dict, Optional, Tuple
 
+# Size at which the log file is rotated, and number of rotated files kept
+LOG_MAX_BYTES = int(os.getenv("LOG_MAX_BYTES", str(10 * 1024 * 1024)))
+LOG_BACKUP_COUNT = int(os.getenv("LOG_BACKUP_COUNT", "5"))
+# Per-logger rate limits as "logger=N,...": at most N records per call site and window.
+# A logger name also covers its children; ERROR and above are never limited. Off by
+# default, so per-request audit lines are never dropped; limit noisy loggers explicitly.
+LOG_RATE_LIMITS = os.getenv("LOG_RATE_LIMITS", "")
+LOG_RATE_LIMIT_WINDOW_SECONDS = float(os.getenv("LOG_RATE_LIMIT_WINDOW_SECONDS", "60"))
 
-def setup_logging(log_level: str = "INFO", log_file: Optional[str] = None):
+LOG_FORMAT = '%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+
+# Background thread writing queued records to the real handlers
+_listener: Optional[logging.handlers.QueueListener] = None
+_rate_limit_filter: Optional["RateLimitFilter"] = None
+
+
+class RateLimitFilter(logging.Filter):
+    """
+    Drops repetitive log records, such as per-hour warnings inside loops.
+
+    Records are counted per call site (logger, file and line), so the limit also holds
+    for messages whose arguments differ. When the window of a call site that dropped
+    records closes, a summary record reports how many were suppressed.
+    """
+
+    def __init__(self, limits: Dict[str, int], window_seconds: float = LOG_RATE_LIMIT_WINDOW_SECONDS):
+        super().__init__()
+        self.limits = limits
+        self.window_seconds = window_seconds
+        # Per call site: (window start, records let through, records suppressed)
+        self._windows: Dict[Tuple[str, str, int], Tuple[float, int, int]] = {}
+        self._lock = threading.Lock()
+        self._closed = threading.Event()
+        if limits:
+            # Reports the windows that closed without a later record from their call site
+            threading.Thread(target=self._sweep, name="log-rate-limit", daemon=True).start()
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if record.levelno >= logging.ERROR or getattr(record, "rate_limit_summary", False):
+            return True
+        limit = self._limit_for(record.name)
+        if limit is None:
+            return True
+
+        key = (record.name, record.pathname, record.lineno)
+        now = time.monotonic()
+        closed = []
+        with self._lock:
+            started, passed, suppressed = self._windows.get(key, (now, 0, 0))
+            if now - started >= self.window_seconds:
+                if suppressed:
+                    closed.append((key, suppressed))
+                started, passed, suppressed = now, 0, 0
+            if passed >= limit:
+                self._windows[key] = (started, passed, suppressed + 1)
+                allowed = False
+            else:
+                self._windows[key] = (started, passed + 1, suppressed)
+                allowed = True
+
+        # Logged outside the lock, the summaries pass through this filter again
+        self._report(closed)
+        return allowed
+
+    def close(self) -> None:
+        """Stop the sweeper thread after reporting the pending suppressed counts"""
+        self._closed.set()
+        self._report(self._close_windows(float("inf")))
+
+    def _sweep(self) -> None:
+        while not self._closed.wait(self.window_seconds):
+            self._report(self._close_windows(time.monotonic()))
+
+    def _close_windows(self, now: float):
+        """Remove the windows that closed before now, returning those that suppressed records"""
+        closed = []
+        with self._lock:
+            for key, (started, _, suppressed) in list(self._windows.items()):
+                if now - started >= self.window_seconds:
+                    del self._windows[key]
+                    if suppressed:
+                        closed.append((key, suppressed))
+        return closed
+
+    def _report(self, closed) -> None:
+        for (name, pathname, lineno), suppressed in closed:
+            logging.getLogger(name).warning(
+                "%s records logged at %s:%s were suppressed in the last %.0fs",
+                suppressed, os.path.basename(pathname), lineno, self.window_seconds,
+                extra={"rate_limit_summary": True},
+            )
+
+    def _limit_for(self, name: str) -> Optional[int]:
+        """Limit of the most specific configured logger that name belongs to"""
+        while name:
+            if name in self.limits:
+                return self.limits[name]
+            name = name.rpartition(".")[0]
+        return None
+
+
+class _DeferredQueueHandler(logging.handlers.QueueHandler):
+    """Queue handler that leaves message formatting to the listener thread"""
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        # Records stay in this process, so they are queued as they are and formatted
+        # (including %-style arguments) off the request path
+        return record
+
+
+def parse_rate_limits(spec: str) -> Dict[str, int]:
+    """Parse "logger=N,..." into {logger: N}, ignoring malformed entries"""
+    limits = {}
+    for item in spec.split(","):
+        name, _, value = item.partition("=")
+        if name.strip() and value.strip().isdigit():
+            limits[name.strip()] = int(value)
+    return limits
+
+
+def setup_logging(
+    log_level: str = "INFO",
+    log_file: Optional[str] = None,
+    max_bytes: int = LOG_MAX_BYTES,
+    backup_count: int = LOG_BACKUP_COUNT
+):
     """
     Configure logging for the entire application.
     Call this once at app startup.
-    
+
+    Log calls only put the record on a queue; a background listener thread formats it
+    and writes it to stdout and the size-rotated log file. Repetitive records are
+    rate limited per call site according to `LOG_RATE_LIMITS`.
+
     Args:
         log_level: Logging level (DEBUG, INFO, WARNING, ERROR, CRITICAL)
         log_file: Optional file path to write logs to
-    
+        max_bytes: Size in bytes at which the log file is rotated
+        backup_count: Number of rotated log files to keep
+
     Example:
         setup_logging(log_level="INFO", log_file="logs/app.log")
     """
+    global _listener, _rate_limit_filter
+    if _rate_limit_filter is not None:
+        atexit.unregister(_rate_limit_filter.close)
+        _rate_limit_filter.close()
+    if _listener is not None:
+        atexit.unregister(_listener.stop)
+        _listener.stop()
+
     # Create logs directory if logging to file
     if log_file:
         Path(log_file).parent.mkdir(parents=True, exist_ok=True)
-    
-    # Create handlers
+
+    # Create the handlers that do the actual I/O, on the listener thread
+    formatter = logging.Formatter(LOG_FORMAT)
     handlers = [logging.StreamHandler(sys.stdout)]
     if log_file:
-        handlers.append(logging.FileHandler(log_file, encoding='utf-8'))
-    
+        handlers.append(logging.handlers.RotatingFileHandler(
+            log_file, maxBytes=max_bytes, backupCount=backup_count, encoding='utf-8'
+        ))
+    for handler in handlers:
+        handler.setFormatter(formatter)
+
+    log_queue = queue.SimpleQueue()
+    queue_handler = _DeferredQueueHandler(log_queue)
+    _rate_limit_filter = RateLimitFilter(parse_rate_limits(LOG_RATE_LIMITS))
+    queue_handler.addFilter(_rate_limit_filter)
+
     # Configure root logger
     logging.basicConfig(
         level=getattr(logging, log_level.upper()),
-        format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
-        handlers=handlers,
+        handlers=[queue_handler],
         force=True  # Override any existing configuration
     )
-    
+
+    _listener = logging.handlers.QueueListener(log_queue, *handlers, respect_handler_level=True)
+    _listener.start()
+    atexit.register(_listener.stop)
+    # Registered after the listener, so it runs first and its summaries are still written
+    atexit.register(_rate_limit_filter.close)
+
     # Optionally set different levels for specific modules
     # Reduce noise from uvicorn access logs
     logging.getLogger('uvicorn.access').setLevel(logging.WARNING)
-    
+
     # Example: Set debug level for specific module
     # logging.getLogger('services.model_service').setLevel(logging.DEBUG)
-    
+
     logger = logging.getLogger(__name__)
-    logger.info(f"Logging configured with level: {log_level}")
+    logger.info("Logging configured with level: %s", log_level)
     if log_file:
-        logger.info(f"Logging to file: {log_file}")
-
+        logger.info("Logging to file: %s", log_file)
@@ -0,0 +1,50 @@
+"""Server-Sent Events helpers for streaming API responses"""
+import json
+import logging
+from typing import Any, AsyncIterator, Dict, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Headers that keep proxies from buffering the event stream
+SSE_HEADERS = {"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+
+
+def format_sse(event: str, data: Dict[str, Any]) -> str:
+    """
+    Format one Server-Sent Event
+    
+    Args:
+        event: Event name
+        data: JSON-serialisable payload
+        
+    Returns:
+        The event in text/event-stream wire format
+    """
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+
+async def stream_events(
+    events: AsyncIterator[Tuple[str, Dict[str, Any]]],
+    first: Optional[Tuple[str, Dict[str, Any]]] = None
+) -> AsyncIterator[str]:
+    """
+    Encode (event, data) tuples as Server-Sent Events
+    
+    Errors raised once the stream has started cannot change the HTTP status any more,
+    so they are reported as a final "error" event.
+    
+    Args:
+        events: Async iterator of (event, data) tuples
+        first: Event already taken from `events`, e.g. to validate the request up front
+        
+    Yields:
+        Encoded events
+    """
+    if first is not None:
+        yield format_sse(*first)
+    try:
+        async for event, data in events:
+            yield format_sse(event, data)
+    except Exception as e:
+        logger.error("Error while streaming events: %s", e, exc_info=True)
+        yield format_sse("error", {"error": str(e)})
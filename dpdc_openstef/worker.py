@@ -0,0 +1,144 @@
+"""
+Worker process that executes queued training and forecast jobs
+
+Pulls jobs from the SQLite queue (services/job_queue.py) filled by the /api/jobs
+routes, runs them with ModelService and writes the results back. Workers keep no
+state besides their model and data caches, so any number of them can run next to
+the web server to add compute; each runs one job at a time.
+
+Usage (from the dpdc_openstef directory):
+    python worker.py
+    python worker.py --poll-interval 0.5 --worker-id trainer-1
+"""
+import argparse
+import asyncio
+import logging
+import os
+import re
+import signal
+import socket
+import threading
+import time
+from typing import Any, Dict
+
+from services.job_queue import (
+    JOB_HEARTBEAT_TIMEOUT_SECONDS,
+    claim_next_job,
+    complete_job,
+    fail_job,
+    heartbeat,
+    requeue_stale_jobs,
+)
+from services.model_service import ModelService
+from utils.logger import setup_logging
+
+logger = logging.getLogger(__name__)
+
+# ModelService method run for each job kind, called with the job payload as keyword arguments
+JOB_HANDLERS = {
+    "train": ModelService.train_model_with_hyperparams,
+    "backtest": ModelService.forecast_from_mulitple_models,
+    "realtime": ModelService.generate_realtime_forecast,
+}
+
+
+class Worker:
+    """Claims and executes queued jobs one at a time until stopped"""
+
+    def __init__(self, worker_id: str, poll_interval: float = 1.0):
+        self.worker_id = worker_id
+        self.poll_interval = poll_interval
+        self._stopping = asyncio.Event()
+
+    def stop(self) -> None:
+        """Stop after the current job has finished"""
+        logger.info("Worker %s stopping after the current job", self.worker_id)
+        self._stopping.set()
+
+    async def run(self) -> None:
+        """Poll the queue and execute jobs until `stop` is called"""
+        logger.info("Worker %s started", self.worker_id)
+        last_requeue = 0.0
+        while not self._stopping.is_set():
+            # Any worker may recover the jobs of crashed workers
+            if time.monotonic() - last_requeue > JOB_HEARTBEAT_TIMEOUT_SECONDS / 2:
+                await asyncio.to_thread(requeue_stale_jobs)
+                last_requeue = time.monotonic()
+
+            job = await asyncio.to_thread(claim_next_job, self.worker_id)
+            if job is None:
+                try:
+                    await asyncio.wait_for(self._stopping.wait(), timeout=self.poll_interval)
+                except asyncio.TimeoutError:
+                    pass
+                continue
+            await self.execute(job)
+        logger.info("Worker %s stopped", self.worker_id)
+
+    async def execute(self, job: Dict[str, Any]) -> None:
+        """Run one claimed job and store its result or error"""
+        job_id, kind = job["job_id"], job["kind"]
+        logger.info("Worker %s running %s job %s (attempt %s)", self.worker_id, kind, job_id, job["attempts"])
+        started = time.perf_counter()
+
+        # Heartbeats from a thread, so they continue while a job blocks the event loop
+        finished = threading.Event()
+        beats = threading.Thread(target=_send_heartbeats, args=(job_id, self.worker_id, finished), daemon=True)
+        beats.start()
+        try:
+            result = await JOB_HANDLERS[kind](**job["payload"])
+            if await asyncio.to_thread(complete_job, job_id, self.worker_id, result):
+                logger.info("Job %s completed in %.2fs", job_id, time.perf_counter() - started)
+            else:
+                logger.warning("Job %s finished after it was handed to another worker; result discarded", job_id)
+        except Exception as e:
+            logger.error("Job %s failed: %s", job_id, e, exc_info=True)
+            if not await asyncio.to_thread(fail_job, job_id, self.worker_id, str(e)):
+                logger.warning("Job %s failed after it was handed to another worker; error discarded", job_id)
+        finally:
+            finished.set()
+            beats.join()
+
+
+def _send_heartbeats(job_id: str, worker_id: str, finished: threading.Event) -> None:
+    """Send a heartbeat for a job every third of the heartbeat timeout until it finished"""
+    while not finished.wait(JOB_HEARTBEAT_TIMEOUT_SECONDS / 3):
+        try:
+            if not heartbeat(job_id, worker_id):
+                logger.warning("Job %s is no longer assigned to worker %s", job_id, worker_id)
+                return
+        except Exception as e:
+            logger.warning("Heartbeat of job %s failed: %s", job_id, e)
+
+
+def worker_log_file(worker_id: str) -> str:
+    """Log file of a worker; each worker rotates its own file"""
+    return f"logs/worker-{re.sub(r'[^A-Za-z0-9_.-]', '_', worker_id)}.log"
+
+
+def parse_args(argv=None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Execute queued training and forecast jobs")
+    parser.add_argument("--worker-id", default=f"{socket.gethostname()}-{os.getpid()}",
+                        help="Name of this worker in the job status (default: host-pid)")
+    parser.add_argument("--poll-interval", type=float, default=1.0, help="Seconds between polls of an empty queue")
+    parser.add_argument("--log-level", default="INFO", help="Logging level")
+    return parser.parse_args(argv)
+
+
+async def main(argv=None) -> None:
+    args = parse_args(argv)
+    setup_logging(log_level=args.log_level, log_file=worker_log_file(args.worker_id))
+
+    worker = Worker(args.worker_id, args.poll_interval)
+    loop = asyncio.get_running_loop()
+    for signum in (signal.SIGINT, signal.SIGTERM):
+        try:
+            loop.add_signal_handler(signum, worker.stop)
+        except (NotImplementedError, RuntimeError):
+            # Windows: Ctrl+C raises KeyboardInterrupt instead
+            pass
+    await worker.run()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())